@@ -13,19 +13,33 @@ Usage:
     # Process a domain with GSW
     python gsw_pipeline.py process --domain family --limit 10
 
+    # Rule-based bulk pass (no LLM calls)
+    python gsw_pipeline.py process --domain family --backend rules
+
     # Generate analysis reports
     python gsw_pipeline.py analyze
 
+    # Merge duplicate actors across a domain workspace
+    python gsw_pipeline.py dedupe --domain family --dry-run
+
     # Run full pipeline
     python gsw_pipeline.py full --input ../corpus.jsonl --domain family
+
+    # Record LLM responses once, then replay them offline
+    GSW_CASSETTE_DIR=data/cassettes GSW_CASSETTE_MODE=record python gsw_pipeline.py process -d family -l 20
+    GSW_CASSETTE_DIR=data/cassettes python gsw_pipeline.py process -d family -l 20 -c
 """
 
 import argparse
 import json
+import os
 import sys
+import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Iterator, Optional, List, Union
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -34,9 +48,22 @@ sys.path.insert(0, str(PROJECT_ROOT))
 from src.logic.gsw_schema import GlobalWorkspace, ChunkExtraction
 from src.gsw.legal_operator import LegalOperator, chunk_legal_text
 from src.gsw.legal_spacetime import LegalSpacetime
-from src.gsw.legal_reconciler import LegalReconciler
+from src.gsw.legal_reconciler import LegalReconciler, VectorReconciler
+from src.gsw.rule_based_operator import RuleBasedOperator
+from src.gsw.triage import DocumentTriage
 from src.gsw.workspace import WorkspaceManager
 from src.gsw.legal_summary import LegalSummary
+from src.gsw.adaptive_chunking import ChunkSizeStore
+from src.gsw.cascade import ModelCascade
+from src.gsw.decision_cache import DecisionCache
+from src.gsw.dedupe import MATCH_THRESHOLD, EntityDeduplicator
+from src.gsw.llm_client import circuit_breakers
+from src.gsw.map_reduce import RECONCILE_MODES, MapReduceReconciler
+from src.gsw.reflexion import REFLEXION_MODES, ReflexionPolicy
+from src.gsw.telemetry import (
+    TelemetryLedger, cached_share, format_summary, percentile, set_ledger,
+    summarize_ledger, telemetry_context
+)
 
 
 # ============================================================================
@@ -47,6 +74,10 @@ DEFAULT_INPUT = PROJECT_ROOT.parent / "corpus.jsonl"
 DOMAINS_DIR = PROJECT_ROOT / "data" / "processed" / "domains"
 WORKSPACES_DIR = PROJECT_ROOT / "data" / "processed" / "workspaces"
 REPORTS_DIR = PROJECT_ROOT / "reports" / "domain_analysis"
+TELEMETRY_FILE = PROJECT_ROOT / "data" / "processed" / "telemetry" / "llm_calls.jsonl"
+
+# Documents at or below this length are eligible for multi-document packing
+PACK_MAX_CHARS = 3000
 
 
 # ============================================================================
@@ -86,7 +117,22 @@ def run_gsw_processing(
     limit: Optional[int] = None,
     batch_size: int = 10,
     calibration: bool = False,
-    resume: bool = False
+    resume: bool = False,
+    stream: bool = False,
+    pack_size: int = 0,
+    domains_dir: Path = DOMAINS_DIR,
+    workspaces_dir: Path = WORKSPACES_DIR,
+    stage_timings: Optional[Dict[str, List[float]]] = None,
+    ledger_path: Optional[Path] = TELEMETRY_FILE,
+    reflexion: str = "off",
+    reflexion_rate: float = 0.1,
+    backend: str = "llm",
+    triage: bool = False,
+    cascade: Optional[List[str]] = None,
+    output_format: Optional[str] = None,
+    reconcile_mode: str = "sequential",
+    workers: Optional[int] = None,
+    vectors: bool = False
 ) -> GlobalWorkspace:
     """
     Run GSW processing on a domain.
@@ -97,43 +143,114 @@ def run_gsw_processing(
         batch_size: Documents per batch
         calibration: If True, don't save results (test mode)
         resume: Resume from checkpoint
+        stream: Stream operator completions and parse them incrementally
+        pack_size: Bundle up to this many short documents into one operator
+            call (0 or 1 disables packing)
+        domains_dir: Directory holding the domain JSONL files
+        workspaces_dir: Directory for workspace and checkpoint files
+        stage_timings: If given, per-call wall time (seconds) of each stage
+            is appended under "operator", "spacetime" and "reconcile"
+        ledger_path: Telemetry ledger for LLM calls (None keeps the
+            currently active ledger)
+        reflexion: Review policy - "off", "sampled", "triggered" or "always"
+        reflexion_rate: Sample rate for the "sampled" policy
+        backend: "llm" for the LLM operator, or "rules" for the deterministic
+            rule-based operator (no API calls, no spacetime LLM pass)
+        triage: Route each document to skip / rules / cheap model / full
+            model before extraction (LLM backend only)
+        cascade: Models to try cheapest-first, escalating when an
+            extraction fails validation (default: GSW_MODEL_CASCADE)
+        output_format: Operator output format, "json" or "toon" (default:
+            GSW_OPERATOR_FORMAT, "json")
+        reconcile_mode: "sequential", or "map_reduce" to reconcile each
+            document into a local workspace in a worker process and merge
+            the local workspaces in parallel at every checkpoint
+        workers: Worker processes for map_reduce (default: CPU count)
+        vectors: Match and retrieve entities through actor embeddings in an
+            approximate nearest-neighbour index, persisted next to the
+            workspace (sequential reconciliation only)
     """
     print("=" * 60)
     print(f"PHASE 2: GSW Processing - {domain.title()}")
     print("=" * 60)
 
     # Paths
-    domain_file = DOMAINS_DIR / f"{domain.lower()}.jsonl"
-    workspace_file = WORKSPACES_DIR / f"{domain.lower()}_workspace.json"
-    state_file = WORKSPACES_DIR / f"{domain.lower()}_state.json"
+    domain_file = domains_dir / f"{domain.lower()}.jsonl"
+    workspace_file = workspaces_dir / f"{domain.lower()}_workspace.json"
+    state_file = workspaces_dir / f"{domain.lower()}_state.json"
 
     if not domain_file.exists():
         print(f"[Error] Domain file not found: {domain_file}")
         print("Run domain extraction first: python gsw_pipeline.py extract")
         sys.exit(1)
 
+    if ledger_path is not None:
+        set_ledger(TelemetryLedger(ledger_path))
+
     # Initialize components
     print("[Init] Loading components...")
 
-    try:
-        operator = LegalOperator()
-        print("  - LegalOperator: OK")
-    except Exception as e:
-        print(f"  - LegalOperator: FAILED ({e})")
-        print("  Using mock operator for testing")
+    if backend == "rules":
         operator = None
+    else:
+        try:
+            operator = LegalOperator(
+                stream=stream,
+                reflexion=ReflexionPolicy(mode=reflexion, sample_rate=reflexion_rate),
+                cascade=ModelCascade(cascade) if cascade else None,
+                output_format=output_format,
+                chunk_sizes=_chunk_size_store(workspaces_dir, calibration)
+            )
+            print(f"  - LegalOperator: OK{' (streaming)' if stream else ''}"
+                  f"{' (TOON output)' if operator.output_format == 'toon' else ''}")
+            if operator.cascade:
+                print(f"  - Model cascade: {' -> '.join(operator.cascade.models)}")
+        except Exception as e:
+            print(f"  - LegalOperator: FAILED ({e})")
+            print("  Falling back to the rule-based operator")
+            operator = None
+
+    vector_store = None
+    if vectors:
+        vector_store = VectorReconciler(
+            index_path=None if calibration else workspaces_dir / f"{domain.lower()}_vectors.json"
+        )
+        print(f"  - VectorReconciler: OK ({vector_store.embedding_model}, "
+              f"{len(vector_store.index)} actors indexed)")
 
-    try:
-        spacetime = LegalSpacetime()
-        print("  - LegalSpacetime: OK")
-    except:
+    if operator is None:
+        # Deterministic bulk pass: no LLM anywhere in the loop
+        operator = RuleBasedOperator()
         spacetime = None
-
-    reconciler = LegalReconciler()
+        reconciler = LegalReconciler(use_openrouter=False, vector_store=vector_store)
+        print("  - RuleBasedOperator: OK")
+    else:
+        try:
+            spacetime = LegalSpacetime()
+            print("  - LegalSpacetime: OK")
+        except:
+            spacetime = None
+        reconciler = LegalReconciler(
+            vector_store=vector_store,
+            decision_cache=_decision_cache(workspaces_dir, domain, calibration)
+        )
     print("  - LegalReconciler: OK")
 
+    # Map-reduce buffers extractions per document; sequential reconciles in place
+    map_reduce = MapReduceReconciler(workers) if reconcile_mode == "map_reduce" else None
+    integrator = map_reduce or reconciler
+    if map_reduce:
+        print(f"  - Map-reduce reconciliation: {map_reduce.workers} workers")
+
+    document_triage = None
+    rule_operator = None
+    if triage and isinstance(operator, LegalOperator):
+        document_triage = DocumentTriage(full_model=operator.model)
+        rule_operator = RuleBasedOperator()
+        print(f"  - DocumentTriage: OK (cheap model: {document_triage.cheap_model})")
+
     # Load or create workspace
-    WORKSPACES_DIR.mkdir(parents=True, exist_ok=True)
+    workspaces_dir.mkdir(parents=True, exist_ok=True)
 
     if resume and workspace_file.exists():
         manager = WorkspaceManager.load(workspace_file)
@@ -159,6 +276,9 @@ def run_gsw_processing(
 
     processed = 0
     errors = 0
+    pending: List[Dict[str, Any]] = []   # Short documents waiting to be packed
+    packed_calls = 0
+    packed_docs = 0
 
     with open(domain_file, 'r', encoding='utf-8') as f:
         for line_num, line in enumerate(f):
@@ -167,57 +287,168 @@ def run_gsw_processing(
                 continue
 
             # Check limit
-            if limit and processed >= limit:
+            if limit and processed + len(pending) >= limit:
                 break
 
             try:
                 doc = json.loads(line)
 
                 # Extract with Operator
-                if operator:
-                    text = doc.get('text', '')[:30000]
-                    citation = doc.get('citation', '')
-
-                    extraction = operator.extract(
-                        text=text,
-                        situation=f"Legal case: {citation}",
-                        background_context=f"Domain: {domain}, Type: {doc.get('type', '')}",
-                        document_id=doc.get('version_id', str(line_num))
-                    )
-
-                    # Add spatio-temporal links
-                    if spacetime and extraction.actors:
-                        links = spacetime.link_entities(extraction, text)
-                        extraction.spatio_temporal_links.extend(links)
-
-                    # Reconcile with workspace
-                    extraction, log = reconciler.reconcile(
-                        extraction, workspace, text
-                    )
-
+                text = doc.get('text', '')[:30000]
+                citation = doc.get('citation', '')
+                request = {
+                    "text": text,
+                    "situation": f"Legal case: {citation}",
+                    "background_context": f"Domain: {domain}, Type: {doc.get('type', '')}",
+                    "document_id": doc.get('version_id', str(line_num)),
+                    "line_num": line_num
+                }
+
+                decision = document_triage.route(doc) if document_triage else None
+                model = decision.model if decision else None
+
+                if decision and decision.route == "skip":
                     processed += 1
-
-                    # Progress
-                    if processed % 10 == 0:
-                        print(f"  Processed: {processed} | Actors: {len(workspace.actors)} | "
-                              f"Questions: {len(workspace.questions)}", end='\r')
-
+                elif decision and decision.route == "rules":
+                    with telemetry_context(request["document_id"], domain):
+                        with _timed(stage_timings, "operator"):
+                            extraction = rule_operator.extract(
+                                text=text,
+                                situation=request["situation"],
+                                background_context=request["background_context"],
+                                document_id=request["document_id"]
+                            )
+                        _integrate_extraction(
+                            extraction, text, None, integrator, workspace, stage_timings
+                        )
+                    processed += 1
+                elif (
+                    pack_size > 1 and len(text) <= PACK_MAX_CHARS
+                    and (decision is None or decision.route == "cheap")
+                ):
+                    # With triage on, only cheap-routed documents share a pack
+                    pending.append(request)
+                    if len(pending) >= pack_size:
+                        # A failed pack is dropped, never retried with the next
+                        # document; only its documents not yet integrated are errors
+                        packed = len(pending)
+                        try:
+                            _process_packed(
+                                operator, spacetime, integrator, workspace, pending,
+                                domain, stage_timings,
+                                model=document_triage.cheap_model if document_triage else None
+                            )
+                            packed_calls += 1
+                            packed_docs += packed
+                        except Exception as e:
+                            print(f"\n  [Error] Packed batch: {e}")
+                        processed += packed - len(pending)
+                        errors += len(pending)
+                        pending = []
                 else:
-                    # Mock processing for testing without API
+                    with telemetry_context(request["document_id"], domain):
+                        with _timed(stage_timings, "operator"):
+                            extraction = operator.extract(
+                                text=text,
+                                situation=request["situation"],
+                                background_context=request["background_context"],
+                                document_id=request["document_id"],
+                                model=model
+                            )
+                        extraction = _review_extraction(
+                            operator, extraction, text, stage_timings
+                        )
+                        _integrate_extraction(
+                            extraction, text, spacetime, integrator, workspace,
+                            stage_timings
+                        )
                     processed += 1
-                    if processed % 100 == 0:
-                        print(f"  [Mock] Processed: {processed}", end='\r')
+
+                # Progress
+                if processed % 10 == 0:
+                    print(f"  Processed: {processed} | Actors: {len(workspace.actors)} | "
+                          f"Questions: {len(workspace.questions)}", end='\r')
 
             except Exception as e:
                 errors += 1
                 if errors <= 5:
                     print(f"\n  [Error] Line {line_num}: {e}")
 
-            # Save checkpoint every batch
-            if processed % batch_size == 0 and not calibration:
-                _save_checkpoint(manager, state_file, line_num, processed)
+            if map_reduce and processed % batch_size == 0:
+                # A failed flush keeps its documents buffered for the next one
+                try:
+                    with _timed(stage_timings, "reconcile"):
+                        map_reduce.flush(workspace)
+                except Exception as e:
+                    errors += 1
+                    if errors <= 5:
+                        print(f"\n  [Error] Map-reduce flush at line {line_num}: {e}")
+
+            # Save checkpoint every batch (never past a document still waiting
+            # to be packed or reconciled)
+            if processed % batch_size == 0 and not calibration and not (map_reduce and map_reduce.buffered):
+                checkpoint_line = pending[0]["line_num"] - 1 if pending else line_num
+                _save_checkpoint(manager, state_file, checkpoint_line, processed,
+                                 vector_store, reconciler.decision_cache)
+
+    if pending:
+        packed = len(pending)
+        try:
+            _process_packed(
+                operator, spacetime, integrator, workspace, pending,
+                domain, stage_timings,
+                model=document_triage.cheap_model if document_triage else None
+            )
+            packed_calls += 1
+            packed_docs += packed
+        except Exception as e:
+            print(f"\n  [Error] Packed batch: {e}")
+        processed += packed - len(pending)
+        errors += len(pending)
+        pending = []
+
+    if map_reduce:
+        try:
+            with _timed(stage_timings, "reconcile"):
+                map_reduce.flush(workspace)
+        except Exception as e:
+            errors += map_reduce.buffered
+            print(f"\n  [Error] Map-reduce flush: {e}")
 
     print(f"\n\n[Complete] Processed: {processed} | Errors: {errors}")
+    if packed_calls:
+        print(f"[Packing] {packed_docs} short documents in {packed_calls} operator calls")
+    if document_triage:
+        print(f"[Triage] {document_triage.summary()}")
+    if getattr(operator, "cascade", None):
+        print(f"[Cascade] {operator.cascade.summary()}")
+    for endpoint, breaker in circuit_breakers().items():
+        if breaker.stats["opened"]:
+            print(f"[Circuit] {endpoint}: opened {breaker.stats['opened']}x, "
+                  f"{breaker.stats['rejected']} calls short-circuited to fallbacks, "
+                  f"{breaker.stats['probes']} probes (now {breaker.state})")
+    if map_reduce:
+        print(f"[Map-reduce] {map_reduce.summary()}")
+    if reconciler.scope == "document" and reconciler.partitions.partitions:
+        print(f"[Partitions] {reconciler.partitions.summary()}")
+    if reconciler.question_index.stats["chunks"]:
+        print(f"[Questions] {reconciler.question_index.summary()}")
+    if reconciler.candidates.stats["queries"]:
+        print(f"[Candidates] {reconciler.candidates.summary()}")
+    if vector_store is not None:
+        print(f"[Vectors] {vector_store.summary()}")
+    if reconciler.tier_stats["chunks"]:
+        print(f"[Tiers] {reconciler.tier_summary()}")
+    if reconciler.decision_cache is not None and reconciler.decision_cache.stats["lookups"]:
+        print(f"[Decisions] {reconciler.decision_cache.summary()}")
+    chunk_sizes = getattr(operator, "chunk_sizes", None)
+    learned = chunk_sizes.sizes.get(domain) if chunk_sizes else None
+    if learned and learned["truncations"]:
+        chunk_sizes.save()
+        print(f"[Chunking] {learned['truncations']} truncated chunks split; "
+              f"{domain} chunk size now {learned['max_chars']} chars")
+    if operator.reflexion.mode != "off":
+        print(f"[Reflexion] {operator.reflexion.summary()}")
     print(f"[Workspace] Actors: {len(workspace.actors)} | "
           f"Questions: {len(workspace.questions)} | "
           f"Answered: {len(workspace.get_answered_questions())}")
@@ -225,22 +456,144 @@ def run_gsw_processing(
     # Save final state
     if not calibration:
         manager.save()
-        _save_checkpoint(manager, state_file, line_num, processed)
+        _save_checkpoint(manager, state_file, line_num, processed,
+                         vector_store, reconciler.decision_cache)
         print(f"[Saved] Workspace: {workspace_file}")
     else:
         print("[Calibration] Results NOT saved")
 
+    if ledger_path is not None:
+        print(f"[Telemetry] LLM calls logged to {ledger_path} (see: python gsw_pipeline.py costs)")
+
     return workspace
 
 
+def _chunk_size_store(workspaces_dir: Path, calibration: bool) -> Optional[ChunkSizeStore]:
+    """
+    Operator chunk-size store: persisted next to the workspaces so later
+    runs start at a size that does not truncate (in memory for calibration
+    runs; None if GSW_ADAPTIVE_CHUNKING=0).
+    """
+    store = ChunkSizeStore.from_env()
+    if store is None or store.path or calibration:
+        return store
+    return ChunkSizeStore(workspaces_dir / "chunk_sizes.json")
+
+
+def _decision_cache(workspaces_dir: Path, domain: str, calibration: bool) -> Optional[DecisionCache]:
+    """
+    Reconciliation decision cache: persisted next to the workspaces so later
+    runs reuse earlier LLM verdicts (in memory for calibration runs; None
+    if GSW_DECISION_CACHE=0).
+    """
+    cache = DecisionCache.from_env()
+    if cache is None or cache.path or calibration:
+        return cache
+    return DecisionCache(workspaces_dir / f"{domain.lower()}_decisions.json")
+
+
+@contextmanager
+def _timed(
+    stage_timings: Optional[Dict[str, List[float]]],
+    stage: str
+) -> Iterator[None]:
+    """Record the wall time of the enclosed block under a stage name."""
+    if stage_timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_timings.setdefault(stage, []).append(time.perf_counter() - started)
+
+
+def _review_extraction(
+    operator: LegalOperator,
+    extraction: ChunkExtraction,
+    text: str,
+    stage_timings: Optional[Dict[str, List[float]]] = None
+) -> ChunkExtraction:
+    """Run the operator's reflexion pass (the policy decides if it calls the LLM)."""
+    if operator.reflexion.mode == "off":
+        return extraction
+    with _timed(stage_timings, "review"):
+        return operator.review_extraction(extraction, text)
+
+
+def _integrate_extraction(
+    extraction: ChunkExtraction,
+    text: str,
+    spacetime: Optional[LegalSpacetime],
+    reconciler: Union[LegalReconciler, MapReduceReconciler],
+    workspace: GlobalWorkspace,
+    stage_timings: Optional[Dict[str, List[float]]] = None
+) -> None:
+    """Link and reconcile one extraction into the workspace."""
+    # Add spatio-temporal links
+    if spacetime and extraction.actors:
+        with _timed(stage_timings, "spacetime"):
+            links = spacetime.link_entities(extraction, text)
+        extraction.spatio_temporal_links.extend(links)
+
+    # Reconcile with workspace
+    with _timed(stage_timings, "reconcile"):
+        reconciler.reconcile(extraction, workspace, text)
+
+
+def _process_packed(
+    operator: LegalOperator,
+    spacetime: Optional[LegalSpacetime],
+    reconciler: Union[LegalReconciler, MapReduceReconciler],
+    workspace: GlobalWorkspace,
+    requests: List[Dict[str, Any]],
+    domain: Optional[str] = None,
+    stage_timings: Optional[Dict[str, List[float]]] = None,
+    model: Optional[str] = None
+) -> int:
+    """
+    Extract a pack of short documents in one call and integrate each result.
+
+    Each request is removed from the front of requests once its extraction
+    is integrated, so if this raises part-way the list holds only the
+    documents that never reached the workspace (and any the operator
+    returned no extraction for).
+
+    Returns:
+        Number of documents integrated
+    """
+    # The shared call is attributed to the domain only; per-document
+    # fallbacks and integration are attributed to their document
+    with telemetry_context(domain=domain), _timed(stage_timings, "operator"):
+        extractions = operator.extract_packed(list(requests), model=model)[:len(requests)]
+    for extraction in extractions:
+        request = requests[0]
+        with telemetry_context(request["document_id"], domain):
+            extraction = _review_extraction(
+                operator, extraction, request["text"], stage_timings
+            )
+            _integrate_extraction(
+                extraction, request["text"], spacetime, reconciler, workspace,
+                stage_timings
+            )
+        del requests[0]
+    return len(extractions)
+
+
 def _save_checkpoint(
     manager: WorkspaceManager,
     state_file: Path,
     line_num: int,
-    processed: int
+    processed: int,
+    vector_store: Optional[VectorReconciler] = None,
+    decision_cache: Optional[DecisionCache] = None
 ) -> None:
-    """Save processing checkpoint."""
+    """Save processing checkpoint (and the vector index and decision cache, if any)."""
     manager.save()
+    if vector_store is not None:
+        vector_store.save()
+    if decision_cache is not None:
+        decision_cache.save()
 
     state = {
         "last_line": line_num + 1,
@@ -305,14 +658,17 @@ def run_summaries(domain: str) -> None:
 
     print(f"[Loaded] {len(workspace.actors)} actors")
 
+    set_ledger(TelemetryLedger(TELEMETRY_FILE))
+
     try:
         summarizer = LegalSummary()
         print("[Generating] Entity summaries...")
 
-        summaries = summarizer.generate_all_summaries(
-            workspace,
-            actor_types=["person"]  # Only summarize people
-        )
+        with telemetry_context(domain=domain):
+            summaries = summarizer.generate_all_summaries(
+                workspace,
+                actor_types=["person"]  # Only summarize people
+            )
 
         print(f"[Complete] Generated {len(summaries)} summaries")
 
@@ -323,10 +679,308 @@ def run_summaries(domain: str) -> None:
         print(f"[Error] Summary generation failed: {e}")
 
 
+# ============================================================================
+# DEDUPLICATION
+# ============================================================================
+
+def run_dedupe(
+    domain: str,
+    threshold: float = MATCH_THRESHOLD,
+    dry_run: bool = False,
+    examples: int = 10
+) -> Dict[str, str]:
+    """
+    Merge duplicate actors across a domain workspace (offline batch pass).
+
+    Args:
+        domain: Domain whose workspace to deduplicate
+        threshold: Pair similarity needed to merge
+        dry_run: Report the merges without saving the workspace
+        examples: Merged groups to print
+
+    Returns:
+        Duplicate actor id -> id of the actor it was merged into
+    """
+    print("=" * 60)
+    print(f"ENTITY DEDUPLICATION - {domain.title()}")
+    print("=" * 60)
+
+    workspace_file = WORKSPACES_DIR / f"{domain.lower()}_workspace.json"
+
+    if not workspace_file.exists():
+        print(f"[Error] Workspace not found: {workspace_file}")
+        print("Run GSW processing first")
+        return {}
+
+    manager = WorkspaceManager.load(workspace_file)
+    workspace = manager.workspace
+    print(f"[Loaded] {len(workspace.actors)} actors")
+
+    names = {aid: a.name for aid, a in workspace.actors.items()}
+    deduplicator = EntityDeduplicator(threshold=threshold)
+    if dry_run:
+        merges = deduplicator.find_duplicates(workspace)
+    else:
+        merges = deduplicator.dedupe(workspace)
+    print(f"[Dedupe] {deduplicator.summary()}")
+
+    if merges and examples:
+        groups: Dict[str, List[str]] = {}
+        for duplicate_id, canonical_id in merges.items():
+            groups.setdefault(canonical_id, []).append(duplicate_id)
+        for canonical_id, duplicate_ids in list(groups.items())[:examples]:
+            merged = ", ".join(names.get(d, d) for d in duplicate_ids)
+            print(f"  {names.get(canonical_id, canonical_id)} <- {merged}")
+
+    if dry_run:
+        print("[Dry run] Workspace not saved")
+    else:
+        manager.save()
+        print(f"[Saved] {len(workspace.actors)} actors, "
+              f"{deduplicator.stats['references']} references rewritten")
+    return merges
+
+
+# ============================================================================
+# COSTS
+# ============================================================================
+
+def run_costs(
+    ledger_path: Path = TELEMETRY_FILE,
+    domain: Optional[str] = None,
+    top_documents: int = 10
+) -> Optional[Dict[str, Any]]:
+    """Summarize the LLM telemetry ledger (cost, tokens, latency)."""
+    print("=" * 60)
+    print(f"LLM COSTS{f' - {domain.title()}' if domain else ''}")
+    print("=" * 60)
+
+    records = TelemetryLedger(ledger_path).read()
+    if not records:
+        print(f"[Error] No telemetry recorded in {ledger_path}")
+        return None
+
+    summary = summarize_ledger(records, domain=domain)
+    print(format_summary(summary, top_documents=top_documents))
+    return summary
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+BENCH_DOMAIN = "bench"
+
+_BENCH_PARAGRAPHS = [
+    "The applicant and the respondent married on 10 June 2010 in Sydney and "
+    "separated on 1 March 2020.",
+    "The matrimonial home at 123 Smith Street, Parramatta was purchased in 2012 "
+    "for $650,000 and is currently valued at $1.2 million.",
+    "The Family Court of Australia made interim parenting orders on 15 March 2024.",
+    "The respondent filed an affidavit in response to the application for "
+    "property settlement.",
+    "The children shall live with the wife and spend supervised time with the husband.",
+]
+
+
+def _write_bench_domain(path: Path, docs: int, seed: int = 0) -> None:
+    """Write a synthetic domain file of legal-looking documents."""
+    import random
+    rng = random.Random(seed)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(docs):
+            paragraphs = [rng.choice(_BENCH_PARAGRAPHS) for _ in range(rng.randint(2, 12))]
+            doc = {
+                "version_id": f"bench_{i:05d}",
+                "citation": f"Applicant{i} & Respondent{i} [2024] FamCA {i + 1}",
+                "type": "decision",
+                "text": "\n\n".join(paragraphs)
+            }
+            f.write(json.dumps(doc) + "\n")
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_benchmark(
+    docs: int = 50,
+    latency: float = 0.05,
+    error_rate: float = 0.0,
+    truncation_rate: float = 0.0,
+    stream: bool = False,
+    pack_size: int = 0,
+    summaries: bool = True,
+    seed: int = 0,
+    reflexion: str = "off",
+    triage: bool = False,
+    cascade: Optional[List[str]] = None,
+    output_format: Optional[str] = None,
+    reconcile_mode: str = "sequential",
+    workers: Optional[int] = None,
+    vectors: bool = False
+) -> Dict[str, Any]:
+    """
+    Benchmark end-to-end throughput against a local stub LLM server.
+
+    Generates a synthetic domain file, points every component at a
+    StubLLMServer and runs GSW processing (plus entity summaries) over it.
+    Nothing is written outside a temporary directory and no API is called.
+
+    Args:
+        docs: Number of synthetic documents
+        latency: Stub response latency in seconds
+        error_rate: Fraction of stub requests answered with HTTP 429
+        truncation_rate: Fraction of operator completions cut short
+        stream: Stream operator completions
+        pack_size: Operator packing size (see run_gsw_processing)
+        summaries: Also time entity summary generation
+        seed: Seed for the synthetic corpus and stub error pattern
+        reflexion: Review policy (see run_gsw_processing)
+        triage: Route documents before extraction (see run_gsw_processing)
+        cascade: Operator model cascade (see run_gsw_processing)
+        output_format: Operator output format, "json" or "toon"
+        reconcile_mode: "sequential" or "map_reduce" (see run_gsw_processing)
+        workers: Worker processes for map_reduce
+        vectors: Use the actor vector index (see run_gsw_processing)
+
+    Returns:
+        Report dict with throughput, per-stage latency and peak RSS
+    """
+    from src.gsw.llm_stub import StubLLMServer
+
+    print("=" * 60)
+    print("BENCHMARK: GSW Processing against stub LLM")
+    print("=" * 60)
+    print(f"[Config] docs={docs} latency={latency}s 429-rate={error_rate} "
+          f"truncation-rate={truncation_rate} stream={stream} pack={pack_size}")
+
+    stage_timings: Dict[str, List[float]] = {}
+    overrides = {
+        "GSW_LLM_BASE_URL": None,
+        "OPENROUTER_API_KEY": os.getenv("OPENROUTER_API_KEY") or "stub-key",
+        "GSW_CASSETTE_DIR": None,
+    }
+    saved_env = {key: os.environ.get(key) for key in overrides}
+
+    with tempfile.TemporaryDirectory() as tmpdir, StubLLMServer(
+        latency=latency,
+        error_rate=error_rate,
+        truncation_rate=truncation_rate,
+        seed=seed
+    ) as stub:
+        tmp = Path(tmpdir)
+        _write_bench_domain(tmp / f"{BENCH_DOMAIN}.jsonl", docs, seed)
+
+        overrides["GSW_LLM_BASE_URL"] = stub.base_url
+        previous_ledger = set_ledger(TelemetryLedger(tmp / "llm_calls.jsonl"))
+        try:
+            for key, value in overrides.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+            started = time.perf_counter()
+            workspace = run_gsw_processing(
+                BENCH_DOMAIN, limit=docs, batch_size=docs + 1, calibration=True,
+                stream=stream, pack_size=pack_size,
+                domains_dir=tmp, workspaces_dir=tmp, stage_timings=stage_timings,
+                ledger_path=None, reflexion=reflexion, triage=triage,
+                cascade=cascade, output_format=output_format,
+                reconcile_mode=reconcile_mode, workers=workers, vectors=vectors
+            )
+            processing_time = time.perf_counter() - started
+
+            if summaries:
+                summarizer = LegalSummary()
+                people = [
+                    a for a in workspace.actors.values()
+                    if a.actor_type.value == "person"
+                ][:docs]
+                for actor in people:
+                    with _timed(stage_timings, "summary"):
+                        summarizer.generate_summary(actor, workspace)
+
+            telemetry = summarize_ledger(TelemetryLedger(tmp / "llm_calls.jsonl").read())
+        finally:
+            set_ledger(previous_ledger)
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+        stub_stats = dict(stub.stats)
+
+    report = {
+        "docs": docs,
+        "processing_seconds": round(processing_time, 3),
+        "docs_per_sec": round(docs / processing_time, 2) if processing_time > 0 else 0.0,
+        "stages": {
+            stage: {
+                "calls": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+            }
+            for stage, values in stage_timings.items()
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+        "stub": stub_stats,
+        "llm_calls": telemetry["total"],
+        "operator_tokens": {
+            key: telemetry["by_stage"].get("operator", {}).get(key, 0)
+            for key in ("prompt_tokens", "cached_tokens", "completion_tokens")
+        },
+        "workspace": {
+            "actors": len(workspace.actors),
+            "questions": len(workspace.questions),
+        },
+    }
+
+    print("\n" + "-" * 40)
+    print(f"[Throughput] {report['docs_per_sec']} docs/sec "
+          f"({docs} docs in {report['processing_seconds']}s)")
+    for stage, stats in report["stages"].items():
+        print(f"[Latency] {stage:<10} calls={stats['calls']:<5} "
+              f"p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms")
+    if report["peak_rss_mb"] is not None:
+        print(f"[Memory] Peak RSS: {report['peak_rss_mb']:.1f} MB")
+    print(f"[Stub] Requests: {stub_stats['requests']} | "
+          f"429s: {stub_stats['rate_limited']} | Truncated: {stub_stats['truncated']}")
+    print(f"[Telemetry] Calls: {telemetry['total']['calls']} | "
+          f"Retries: {telemetry['total']['retries']} | "
+          f"Coalesced: {telemetry['total']['coalesced']} | "
+          f"Failures: {telemetry['total']['failures']}")
+    print(f"[Tokens] Operator prompt: {report['operator_tokens']['prompt_tokens']} "
+          f"(cached: {report['operator_tokens']['cached_tokens']}) | "
+          f"completion: {report['operator_tokens']['completion_tokens']}")
+    print(f"[Prefix cache] {telemetry['total']['cached_tokens']} of "
+          f"{telemetry['total']['prompt_tokens']} prompt tokens cached "
+          f"({cached_share(telemetry['total']) * 100:.1f}%)")
+
+    return report
+
+
 # ============================================================================
 # CLI
 # ============================================================================
 
+def _parse_models(value: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated --cascade value."""
+    if not value:
+        return None
+    return [model.strip() for model in value.split(",") if model.strip()]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Legal GSW Pipeline",
@@ -344,6 +998,15 @@ Examples:
 
   # Run full pipeline
   python gsw_pipeline.py full --domain family --limit 100
+
+  # Merge duplicate actors across a domain workspace
+  python gsw_pipeline.py dedupe --domain family
+
+  # LLM cost per document / stage / domain
+  python gsw_pipeline.py costs --domain family
+
+  # Throughput benchmark against a local stub LLM
+  python gsw_pipeline.py bench --docs 200 --latency 0.05
         """
     )
 
@@ -372,6 +1035,28 @@ Examples:
                                 help="Calibration mode (don't save)")
     process_parser.add_argument("--resume", "-r", action="store_true",
                                 help="Resume from checkpoint")
+    process_parser.add_argument("--stream", action="store_true",
+                                help="Stream operator output (keeps partial results on truncation)")
+    process_parser.add_argument("--pack", type=int, default=0,
+                                help=f"Pack up to N documents under {PACK_MAX_CHARS} chars per operator call")
+    process_parser.add_argument("--reflexion", choices=REFLEXION_MODES, default="off",
+                                help="When to run the review pass (default: off)")
+    process_parser.add_argument("--reflexion-rate", type=float, default=0.1,
+                                help="Review sample rate for --reflexion sampled")
+    process_parser.add_argument("--backend", choices=["llm", "rules"], default="llm",
+                                help="Extraction backend: LLM operator or deterministic rules")
+    process_parser.add_argument("--triage", action="store_true",
+                                help="Route documents to skip / rules / cheap / full extraction")
+    process_parser.add_argument("--cascade",
+                                help="Comma-separated operator models, cheapest first")
+    process_parser.add_argument("--operator-format", choices=["json", "toon"],
+                                help="Operator output format (TOON uses fewer output tokens)")
+    process_parser.add_argument("--reconcile-mode", choices=RECONCILE_MODES, default="sequential",
+                                help="Reconcile in place, or per document in worker processes (map_reduce)")
+    process_parser.add_argument("--workers", type=int,
+                                help="Worker processes for map_reduce (default: CPU count)")
+    process_parser.add_argument("--vectors", action="store_true",
+                                help="Match entities through a persisted actor embedding index")
 
     # Analyze command
     analyze_parser = subparsers.add_parser("analyze", help="Generate analysis reports")
@@ -392,6 +1077,59 @@ Examples:
     full_parser.add_argument("--limit", "-l", type=int, default=10,
                              help="Documents to process")
 
+    # Dedupe command
+    dedupe_parser = subparsers.add_parser("dedupe", help="Merge duplicate actors in a domain workspace")
+    dedupe_parser.add_argument("--domain", "-d", required=True,
+                               help="Domain to deduplicate")
+    dedupe_parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD,
+                               help=f"Pair similarity needed to merge (default: {MATCH_THRESHOLD})")
+    dedupe_parser.add_argument("--dry-run", action="store_true",
+                               help="Report merges without saving")
+
+    # Costs command
+    costs_parser = subparsers.add_parser("costs", help="Summarize LLM cost/latency telemetry")
+    costs_parser.add_argument("--ledger", type=Path, default=TELEMETRY_FILE,
+                              help="Telemetry ledger (JSONL)")
+    costs_parser.add_argument("--domain", "-d",
+                              help="Only include calls for this domain")
+    costs_parser.add_argument("--top", type=int, default=10,
+                              help="Most expensive documents to list")
+
+    # Bench command
+    bench_parser = subparsers.add_parser("bench", help="Benchmark throughput against a stub LLM")
+    bench_parser.add_argument("--docs", type=int, default=50,
+                              help="Synthetic documents to process")
+    bench_parser.add_argument("--latency", type=float, default=0.05,
+                              help="Stub response latency in seconds")
+    bench_parser.add_argument("--error-rate", type=float, default=0.0,
+                              help="Fraction of stub requests answered with HTTP 429")
+    bench_parser.add_argument("--truncation-rate", type=float, default=0.0,
+                              help="Fraction of operator completions truncated")
+    bench_parser.add_argument("--stream", action="store_true",
+                              help="Stream operator output")
+    bench_parser.add_argument("--pack", type=int, default=0,
+                              help="Operator packing size")
+    bench_parser.add_argument("--no-summaries", action="store_true",
+                              help="Skip the summary stage")
+    bench_parser.add_argument("--reflexion", choices=REFLEXION_MODES, default="off",
+                              help="Review policy")
+    bench_parser.add_argument("--triage", action="store_true",
+                              help="Route documents before extraction")
+    bench_parser.add_argument("--cascade",
+                              help="Comma-separated operator models, cheapest first")
+    bench_parser.add_argument("--operator-format", choices=["json", "toon"],
+                              help="Operator output format")
+    bench_parser.add_argument("--reconcile-mode", choices=RECONCILE_MODES, default="sequential",
+                              help="Reconciliation mode")
+    bench_parser.add_argument("--workers", type=int,
+                              help="Worker processes for map_reduce")
+    bench_parser.add_argument("--vectors", action="store_true",
+                              help="Use the actor embedding index")
+    bench_parser.add_argument("--seed", type=int, default=0,
+                              help="Random seed")
+    bench_parser.add_argument("--output", "-o", type=Path,
+                              help="Write the report as JSON")
+
     args = parser.parse_args()
 
     if args.command == "extract":
@@ -402,7 +1140,13 @@ Examples:
     elif args.command == "process":
         run_gsw_processing(
             args.domain, args.limit, args.batch,
-            args.calibration, args.resume
+            args.calibration, args.resume, args.stream, args.pack,
+            reflexion=args.reflexion, reflexion_rate=args.reflexion_rate,
+            backend=args.backend, triage=args.triage,
+            cascade=_parse_models(args.cascade),
+            output_format=args.operator_format,
+            reconcile_mode=args.reconcile_mode, workers=args.workers,
+            vectors=args.vectors
         )
 
     elif args.command == "analyze":
@@ -411,6 +1155,35 @@ Examples:
     elif args.command == "summary":
         run_summaries(args.domain)
 
+    elif args.command == "dedupe":
+        run_dedupe(args.domain, args.threshold, args.dry_run)
+
+    elif args.command == "costs":
+        run_costs(args.ledger, args.domain, args.top)
+
+    elif args.command == "bench":
+        report = run_benchmark(
+            docs=args.docs,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            truncation_rate=args.truncation_rate,
+            stream=args.stream,
+            pack_size=args.pack,
+            summaries=not args.no_summaries,
+            seed=args.seed,
+            reflexion=args.reflexion,
+            triage=args.triage,
+            cascade=_parse_models(args.cascade),
+            output_format=args.operator_format,
+            reconcile_mode=args.reconcile_mode,
+            workers=args.workers,
+            vectors=args.vectors
+        )
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"[Saved] Report: {args.output}")
+
     elif args.command == "full":
         print("FULL PIPELINE")
         print("=" * 60)
@@ -9,14 +9,16 @@ from src.ingestion.gsw_operator import TheOperator
 from src.ingestion.reconciler import Reconciler
 from src.analysis.generate_report import generate_report
 from src.analysis.narrative_report import generate_narrative_report
+from src.gsw.reflexion import REFLEXION_MODES, ReflexionPolicy, case_triggers
 
 # Load environment variables
 dotenv.load_dotenv()
 
-async def run_ingestion_pilot(limit: int = 50, calibration_mode: bool = False, use_experiment: bool = False):
+async def run_ingestion_pilot(limit: int = 50, calibration_mode: bool = False, use_experiment: bool = False, reflexion: str = "triggered"):
     """
     Orchestrator for Phase 3 Ingestion.
     """
+    reflexion_policy = ReflexionPolicy(mode=reflexion)
     print(f"--- STARTING GSW INGESTION PILOT (Calibration: {calibration_mode}, Experiment: {use_experiment}) ---")
     
     # 1. Initialize Components
@@ -96,9 +98,13 @@ async def run_ingestion_pilot(limit: int = 50, calibration_mode: bool = False, u
                 local_case = await operator.extract_timeline(text_content, ontology_context)
                 
                 if local_case:
-                    # A.5. REFLEXION (Self-Correction)
-                    print("   -> Auditing & Refining extraction...")
-                    local_case = await operator.review_extraction(text_content, local_case)
+                    # A.5. REFLEXION (Self-Correction) - only when the policy says it is worth a call
+                    reasons = case_triggers(local_case)
+                    if reflexion_policy.should_review(reasons):
+                        print(f"   -> Auditing & Refining extraction ({', '.join(reasons) or reflexion_policy.mode})...")
+                        before = local_case.model_dump(exclude={"case_id"})
+                        local_case = await operator.review_extraction(text_content, local_case)
+                        reflexion_policy.record_outcome(reasons, local_case.model_dump(exclude={"case_id"}) != before)
 
                     # B. RECONCILER: Ingest
                     reconciler.ingest_chunk(local_case)
@@ -113,6 +119,7 @@ async def run_ingestion_pilot(limit: int = 50, calibration_mode: bool = False, u
                 print(f"   -> Error processing line {current_line_idx}: {e}")
 
     print("\n--- BATCH COMPLETE ---")
+    print(f"[Reflexion] {reflexion_policy.summary()}")
     
     # 4. Persistence & Analysis
     report_path = "LEGAL_LANDSCAPE_REPORT.md"
@@ -154,7 +161,8 @@ if __name__ == "__main__":
     parser.add_argument("--limit", type=int, default=10, help="Number of cases to process per batch")
     parser.add_argument("--calibration", action="store_true", help="Run in Calibration Mode (does not save progress state)")
     parser.add_argument("--experiment", action="store_true", help="Use Experimental Model (Gemini 3 Pro)")
+    parser.add_argument("--reflexion", choices=REFLEXION_MODES, default="triggered", help="When to run the review pass (default: triggered)")
     
     args = parser.parse_args()
     
-    asyncio.run(run_ingestion_pilot(limit=args.limit, calibration_mode=args.calibration, use_experiment=args.experiment))
+    asyncio.run(run_ingestion_pilot(limit=args.limit, calibration_mode=args.calibration, use_experiment=args.experiment, reflexion=args.reflexion))
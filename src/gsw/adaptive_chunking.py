@@ -0,0 +1,191 @@
+"""
+Adaptive Chunking - Re-extract Truncated Operator Chunks in Smaller Pieces
+
+A dense chunk can make the operator hit max_tokens. The JSON repair then
+keeps only the elements completed before the cut, and the rest of the
+chunk is silently lost. LegalOperator uses this module to:
+
+- detect truncation (finish_reason "length" or output cut off mid-element;
+  a repaired but complete response, e.g. a trailing comma, is not truncated)
+- split the chunk roughly in half (at paragraph or sentence breaks) with
+  chunk_legal_text and re-extract the parts
+  concurrently, recursively up to a maximum depth
+- merge the part extractions back into one ChunkExtraction, prefixing the
+  ids of each part so "actor_001" of one half does not collide with
+  "actor_001" of the other (the reconciler merges the real duplicates)
+- remember, per domain, a chunk size that did not truncate, so later
+  documents are split up front instead of paying for a truncated call
+
+Learned sizes are kept in a small JSON file:
+
+    {"family": {"max_chars": 12000, "truncations": 3, "successes": 41}}
+
+Configuration (environment):
+    GSW_ADAPTIVE_CHUNKING   Set to 0 to disable re-chunking (default: on)
+    GSW_CHUNK_SIZES         JSON file for learned sizes (default: in memory only)
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.logic.gsw_schema import ChunkExtraction
+
+
+DEFAULT_CHUNK_CHARS = 30000    # The operator's input limit
+MIN_CHUNK_CHARS = 2000         # Never split below this
+CHUNK_OVERLAP = 300            # Context shared by neighbouring parts
+MAX_SPLIT_DEPTH = 2            # Halvings per chunk (up to 4 parts)
+
+
+def extraction_truncated(extraction: ChunkExtraction) -> bool:
+    """True if the operator output was cut off (not merely repaired)."""
+    metadata = extraction.metadata or {}
+    return bool(
+        metadata.get("truncated")
+        or metadata.get("finish_reason") == "length"
+    )
+
+
+class ChunkSizeStore:
+    """
+    Per-domain maximum chunk size learned from truncated extractions.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        default_chars: int = DEFAULT_CHUNK_CHARS,
+        min_chars: int = MIN_CHUNK_CHARS
+    ):
+        """
+        Args:
+            path: JSON file to load from and save to (None keeps sizes in memory)
+            default_chars: Size used for domains without a learned size
+            min_chars: Smallest size the store will learn
+        """
+        self.path = Path(path) if path else None
+        self.default_chars = default_chars
+        self.min_chars = min_chars
+        self._lock = threading.Lock()
+        self.sizes: Dict[str, Dict[str, int]] = {}
+
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.sizes = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"[Chunking Warning] Ignoring unreadable {self.path}: {e}")
+
+    @classmethod
+    def from_env(cls) -> Optional["ChunkSizeStore"]:
+        """Store configured by GSW_CHUNK_SIZES (None if GSW_ADAPTIVE_CHUNKING=0)."""
+        if os.getenv("GSW_ADAPTIVE_CHUNKING", "1") == "0":
+            return None
+        path = os.getenv("GSW_CHUNK_SIZES")
+        return cls(Path(path) if path else None)
+
+    def size_for(self, domain: str) -> int:
+        """Largest chunk (chars) to send for a domain."""
+        with self._lock:
+            return self.sizes.get(domain, {}).get("max_chars", self.default_chars)
+
+    def record_truncation(self, domain: str, chunk_chars: int) -> int:
+        """
+        Learn from a chunk that truncated: later chunks stay below half its size.
+
+        Returns:
+            The domain's new maximum chunk size
+        """
+        with self._lock:
+            entry = self._entry(domain)
+            entry["max_chars"] = max(self.min_chars, min(entry["max_chars"], chunk_chars // 2))
+            entry["truncations"] += 1
+            self._save()
+            return entry["max_chars"]
+
+    def record_success(self, domain: str) -> None:
+        """Count a chunk that extracted without truncation (saved with the next truncation)."""
+        with self._lock:
+            self._entry(domain)["successes"] += 1
+
+    def save(self) -> None:
+        """Write the learned sizes (no-op for an in-memory store)."""
+        with self._lock:
+            self._save()
+
+    def _entry(self, domain: str) -> Dict[str, int]:
+        entry = self.sizes.setdefault(domain, {})
+        entry.setdefault("max_chars", self.default_chars)
+        entry.setdefault("truncations", 0)
+        entry.setdefault("successes", 0)
+        return entry
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.sizes, f, indent=2, sort_keys=True)
+        except OSError as e:
+            print(f"[Chunking Warning] Could not save {self.path}: {e}")
+
+
+def _prefixed(value: Optional[str], prefix: str) -> Optional[str]:
+    return f"{prefix}{value}" if value else value
+
+
+def merge_extractions(
+    parts: List[ChunkExtraction],
+    chunk_id: str,
+    document_id: str,
+    situation: str = ""
+) -> ChunkExtraction:
+    """
+    Combine the extractions of a split chunk into one.
+
+    Ids of part i are prefixed with "p{i}_" (references included) so the
+    parts cannot collide; elements keep their part's source_chunk_id.
+    """
+    merged = ChunkExtraction(
+        chunk_id=chunk_id,
+        source_document_id=document_id,
+        situation=situation or next((p.situation for p in parts if p.situation), ""),
+        model_used=next((p.model_used for p in parts if p.model_used), "")
+    )
+
+    for i, part in enumerate(parts, 1):
+        prefix = f"p{i}_"
+        for actor in part.actors:
+            actor.id = _prefixed(actor.id, prefix)
+            actor.spatio_temporal_link_ids = [_prefixed(x, prefix) for x in actor.spatio_temporal_link_ids]
+            merged.actors.append(actor)
+        for verb in part.verb_phrases:
+            verb.id = _prefixed(verb.id, prefix)
+            verb.agent_id = _prefixed(verb.agent_id, prefix)
+            verb.patient_ids = [_prefixed(x, prefix) for x in verb.patient_ids]
+            verb.temporal_id = _prefixed(verb.temporal_id, prefix)
+            verb.spatial_id = _prefixed(verb.spatial_id, prefix)
+            merged.verb_phrases.append(verb)
+        for question in part.questions:
+            question.id = _prefixed(question.id, prefix)
+            question.target_entity_id = _prefixed(question.target_entity_id, prefix)
+            question.answer_entity_id = _prefixed(question.answer_entity_id, prefix)
+            merged.questions.append(question)
+        for link in part.spatio_temporal_links:
+            link.id = _prefixed(link.id, prefix)
+            link.linked_entity_ids = [_prefixed(x, prefix) for x in link.linked_entity_ids]
+            merged.spatio_temporal_links.append(link)
+
+    merged.metadata.update({
+        "split_parts": len(parts),
+        "truncated": any(extraction_truncated(p) for p in parts),
+    })
+    errors = [p.metadata["error"] for p in parts if p.metadata.get("error")]
+    if errors:
+        merged.metadata["error"] = "; ".join(errors)[:200]
+    return merged
+
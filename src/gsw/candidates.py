@@ -0,0 +1,293 @@
+"""
+Candidate Retrieval - Pick the Workspace Actors Worth Showing the Reconciler
+
+LLM entity reconciliation can only match a new actor to an existing actor
+that is in its prompt. Sending the first N workspace actors means that in a
+large workspace the right match is almost never there. CandidateRetriever
+ranks existing actors for each new actor and returns the top k.
+
+Score signals (each 0..1):
+- name:      TF-IDF cosine of character n-grams over name + aliases
+- alias:     a name or alias of one equals a name or alias of the other
+- role:      Jaccard overlap of roles (legal terms such as "the husband"
+             count as their related roles)
+- document:  both actors come from the same source document
+
+Only actors sharing an n-gram, a name/alias key, a role or the document are
+scored, so the cost of a query depends on the overlap, not on the workspace
+size. N-grams that occur in more than MAX_POSTINGS actors are too common to
+narrow anything down and are not used to collect candidates. A role such as
+"husband" is held by an actor of nearly every document, so only its earliest
+MAX_ROLE_POOL holders are scored (on a role alone, earlier actors win ties).
+
+The index is kept in sync incrementally: actors added to the workspace since
+the last query are indexed on the next one, and the reconciler re-indexes
+actors it merges into.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.logic.gsw_schema import Actor, GlobalWorkspace
+
+
+NGRAM_SIZE = 3
+CANDIDATES_PER_ACTOR = 10      # Top k for each new actor
+MAX_CANDIDATES = 50            # Cap for one reconcile prompt
+MAX_POSTINGS = 2000            # Skip n-grams shared by more actors than this
+MAX_ROLE_POOL = 50             # Earliest holders of a role scored per query
+MIN_SCORE = 0.1                # Ignore candidates scoring below this
+
+SCORE_WEIGHTS = {
+    "name": 0.5,
+    "alias": 0.25,
+    "role": 0.15,
+    "document": 0.1,
+}
+
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> List[str]:
+    """Character n-grams of a normalized string, padded at word boundaries."""
+    normalized = re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+    if not normalized:
+        return []
+    padded = f" {normalized} "
+    if len(padded) <= n:
+        return [padded]
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+
+def actor_document_id(actor: Actor) -> str:
+    """Source document an actor was first extracted from ("" if unknown)."""
+    return (actor.metadata or {}).get("source_document_id", "")
+
+
+class CandidateRetriever:
+    """
+    Incremental n-gram / alias / role / document index over workspace actors.
+    """
+
+    def __init__(
+        self,
+        role_mappings: Optional[Dict[str, List[str]]] = None,
+        per_actor: int = CANDIDATES_PER_ACTOR,
+        max_candidates: int = MAX_CANDIDATES
+    ):
+        """
+        Args:
+            role_mappings: Legal terms -> related roles (e.g. "the wife" -> ["wife"])
+            per_actor: Candidates kept for each new actor
+            max_candidates: Candidates kept for one query in total
+        """
+        self.role_mappings = role_mappings or {}
+        self.per_actor = per_actor
+        self.max_candidates = max_candidates
+
+        self._grams: Dict[str, Counter] = {}          # actor id -> n-gram counts
+        self._postings: Dict[str, Set[str]] = {}      # n-gram -> actor ids
+        self._documents: Dict[str, Set[str]] = {}     # document id -> actor ids
+        self._indexed: Dict[str, str] = {}            # actor id -> document id
+        self._norms: Dict[str, Tuple[float, int]] = {}  # actor id -> (norm, index size)
+        self._roles: Dict[str, List[str]] = {}        # role -> earliest holders
+        self._order: Dict[str, int] = {}              # actor id -> first indexed position
+        self._workspace_id: Optional[int] = None
+
+        self.stats = {"queries": 0, "candidates": 0, "workspace_actors": 0}
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def index_actor(self, actor: Actor) -> None:
+        """Add an actor to the index, replacing any earlier entry for it."""
+        self.remove_actor(actor.id)
+        grams = Counter()
+        for text in [actor.name] + list(actor.aliases):
+            grams.update(char_ngrams(text))
+        self._grams[actor.id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(actor.id)
+
+        document_id = actor_document_id(actor)
+        self._indexed[actor.id] = document_id
+        if document_id:
+            self._documents.setdefault(document_id, set()).add(actor.id)
+
+        # Roles only grow, so a re-indexed actor keeps its place in the role pools
+        order = self._order.setdefault(actor.id, len(self._order))
+        for role in {r.lower() for r in actor.roles}:
+            holders = self._roles.setdefault(role, [])
+            if actor.id in holders:
+                continue
+            if len(holders) >= MAX_ROLE_POOL and order > self._order[holders[-1]]:
+                continue
+            holders.append(actor.id)
+            holders.sort(key=self._order.__getitem__)
+            del holders[MAX_ROLE_POOL:]
+
+    def remove_actor(self, actor_id: str) -> None:
+        """Drop an actor from the index (no-op if it is not indexed)."""
+        self._norms.pop(actor_id, None)
+        for gram in self._grams.pop(actor_id, ()):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(actor_id)
+                if not ids:
+                    del self._postings[gram]
+        document_id = self._indexed.pop(actor_id, "")
+        if document_id in self._documents:
+            self._documents[document_id].discard(actor_id)
+
+    def sync(self, workspace: GlobalWorkspace) -> None:
+        """Index workspace actors added since the last sync."""
+        if self._workspace_id != id(workspace):
+            self._grams, self._postings, self._documents, self._indexed = {}, {}, {}, {}
+            self._norms, self._roles, self._order = {}, {}, {}
+            self._workspace_id = id(workspace)
+        if len(self._indexed) == len(workspace.actors):
+            return
+        removed = [a for a in self._indexed if a not in workspace.actors]
+        for actor_id in removed:
+            self.remove_actor(actor_id)
+        if removed:
+            removed_ids = set(removed)
+            for holders in self._roles.values():
+                holders[:] = [a for a in holders if a not in removed_ids]
+        for actor_id, actor in workspace.actors.items():
+            if actor_id not in self._indexed:
+                self.index_actor(actor)
+
+    # ------------------------------------------------------------------
+    # Retrieval
+    # ------------------------------------------------------------------
+
+    def candidates(
+        self,
+        new_actors: List[Actor],
+        workspace: GlobalWorkspace,
+        document_id: str = ""
+    ) -> List[Actor]:
+        """
+        Existing actors most likely to match any of the new actors.
+
+        Args:
+            new_actors: Actors from the chunk being reconciled
+            workspace: Workspace to retrieve from
+            document_id: Source document of the chunk
+
+        Returns:
+            Up to max_candidates workspace actors, best first
+        """
+        best: Dict[str, float] = {}
+        for new_actor in new_actors:
+            for actor_id, score in self.rank(new_actor, workspace, document_id)[:self.per_actor]:
+                best[actor_id] = max(best.get(actor_id, 0.0), score)
+
+        ranked = sorted(best, key=lambda a: (-best[a], workspace.actor_order(a)))
+        selected = [workspace.actors[a] for a in ranked[:self.max_candidates]]
+
+        self.stats["queries"] += 1
+        self.stats["candidates"] += len(selected)
+        self.stats["workspace_actors"] += len(workspace.actors)
+        return selected
+
+    def rank(
+        self,
+        new_actor: Actor,
+        workspace: GlobalWorkspace,
+        document_id: str = ""
+    ) -> List[Tuple[str, float]]:
+        """Scored (actor id, score) pairs for one new actor, best first."""
+        self.sync(workspace)
+        query = Counter()
+        for text in [new_actor.name] + list(new_actor.aliases):
+            query.update(char_ngrams(text))
+        keys = [k.lower().strip() for k in [new_actor.name] + list(new_actor.aliases)]
+        roles = self._expanded_roles(new_actor)
+
+        total = max(len(self._grams), 1)
+        idf = {g: self._idf(g, total) for g in query}
+        query_norm = math.sqrt(sum((c * idf[g]) ** 2 for g, c in query.items())) or 1.0
+
+        # Dot products accumulated over the postings of the query's n-grams
+        dots: Dict[str, float] = {}
+        for gram, count in query.items():
+            ids = self._postings.get(gram, ())
+            if len(ids) > MAX_POSTINGS:
+                continue
+            weight = count * idf[gram] * idf[gram]
+            for actor_id in ids:
+                dots[actor_id] = dots.get(actor_id, 0.0) + weight * self._grams[actor_id][gram]
+
+        pool: Set[str] = set(dots)
+        alias_hits: Set[str] = set()
+        for key in keys:
+            alias_hits |= workspace.actor_ids_by_name(key)
+        pool |= alias_hits
+        for role in roles:
+            pool.update(self._roles.get(role, ()))
+        if document_id:
+            pool |= self._documents.get(document_id, set())
+
+        scored = []
+        for actor_id in pool:
+            actor = workspace.actors.get(actor_id)
+            if actor is None:
+                continue
+            grams = self._grams.get(actor_id, Counter())
+            dot = dots.get(actor_id, 0.0)
+            norm = self._norm(actor_id, grams, total)
+            existing_roles = {r.lower() for r in actor.roles}
+
+            signals = {
+                "name": dot / (query_norm * norm),
+                "alias": 1.0 if actor_id in alias_hits else 0.0,
+                "role": _jaccard(roles, existing_roles),
+                "document": 1.0 if document_id and actor_document_id(actor) == document_id else 0.0,
+            }
+            score = sum(SCORE_WEIGHTS[k] * v for k, v in signals.items())
+            if score >= MIN_SCORE:
+                scored.append((actor_id, round(score, 4)))
+
+        scored.sort(key=lambda item: (-item[1], workspace.actor_order(item[0])))
+        return scored
+
+    def summary(self) -> str:
+        """One-line summary of how much the candidates narrowed the prompts."""
+        queries = self.stats["queries"]
+        if not queries:
+            return "no LLM reconciliation queries"
+        sent = self.stats["candidates"] / queries
+        pool = self.stats["workspace_actors"] / queries
+        return (f"{queries} queries, {sent:.1f} candidates per prompt "
+                f"from {pool:.0f} workspace actors on average")
+
+    def _expanded_roles(self, actor: Actor) -> Set[str]:
+        """Lowercased roles plus the roles implied by legal terms in the names."""
+        roles = {r.lower() for r in actor.roles}
+        keys = {k.lower().strip() for k in [actor.name] + list(actor.aliases)}
+        for term, related_roles in self.role_mappings.items():
+            if term in keys:
+                roles.update(related_roles)
+        return roles
+
+    def _norm(self, actor_id: str, grams: Counter, total: int) -> float:
+        """TF-IDF vector norm of an actor, recomputed once the index grew by a quarter."""
+        cached = self._norms.get(actor_id)
+        if cached and total <= cached[1] * 1.25:
+            return cached[0]
+        norm = math.sqrt(sum((c * self._idf(g, total)) ** 2 for g, c in grams.items())) or 1.0
+        self._norms[actor_id] = (norm, total)
+        return norm
+
+    def _idf(self, gram: str, total: int) -> float:
+        return math.log((total + 1) / (len(self._postings.get(gram, ())) + 1)) + 1.0
+
+
+def _jaccard(a: Iterable[str], b: Iterable[str]) -> float:
+    a, b = set(a), set(b)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
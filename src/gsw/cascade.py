@@ -0,0 +1,134 @@
+"""
+Model Cascade - Cheap Model First, Escalate on Validation Failure
+
+LegalOperator can run an ordered list of models instead of a single one.
+Each extraction from a cheaper model is validated. If it is acceptable
+it is kept; otherwise the next model in the cascade is tried. The last
+model's output is always kept.
+
+Validation checks (no LLM involved):
+- error:              the call failed (HTTP error, timeout, ...)
+- parse_repaired:     the JSON needed repair or was truncated
+- too_few_actors:     fewer than min_actors actors
+- too_few_questions:  fewer than min_questions questions
+- dangling_reference: a verb phrase agent_id / patient_ids points to an
+                      actor that is not in the extraction
+
+This generalises the experimental -> production fallback of
+TheOperator.extract_timeline. Every LLM call made inside a cascade step is
+tagged with cascade_step in the telemetry ledger, so escalation rates
+and per-step cost show up in `gsw_pipeline.py costs`.
+
+Configuration (environment):
+    GSW_MODEL_CASCADE          Comma-separated models, cheapest first
+    GSW_CASCADE_MIN_ACTORS     Minimum actors (default: 1)
+    GSW_CASCADE_MIN_QUESTIONS  Minimum questions (default: 1)
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from src.logic.gsw_schema import ChunkExtraction
+
+
+DEFAULT_CASCADE = ["google/gemini-2.0-flash-lite-001", "google/gemini-2.0-flash-001"]
+
+
+def validate_extraction(
+    extraction: ChunkExtraction,
+    min_actors: int = 1,
+    min_questions: int = 1
+) -> List[str]:
+    """
+    Check an extraction for defects that warrant a stronger model.
+
+    Returns:
+        List of failure reasons (empty if the extraction is acceptable)
+    """
+    issues = []
+    metadata = extraction.metadata or {}
+
+    if metadata.get("error"):
+        issues.append("error")
+    if metadata.get("parse_repaired") or metadata.get("truncated"):
+        issues.append("parse_repaired")
+    if len(extraction.actors) < min_actors:
+        issues.append("too_few_actors")
+    if len(extraction.questions) < min_questions:
+        issues.append("too_few_questions")
+
+    actor_ids = {actor.id for actor in extraction.actors}
+    for verb in extraction.verb_phrases:
+        referenced = ([verb.agent_id] if verb.agent_id else []) + list(verb.patient_ids)
+        if any(ref not in actor_ids for ref in referenced):
+            issues.append("dangling_reference")
+            break
+
+    return issues
+
+
+class ModelCascade:
+    """
+    Ordered list of models with acceptance criteria and escalation stats.
+    """
+
+    def __init__(
+        self,
+        models: Optional[List[str]] = None,
+        min_actors: int = 1,
+        min_questions: int = 1
+    ):
+        """
+        Args:
+            models: Models to try in order, cheapest first
+            min_actors: Minimum actors for an extraction to be accepted
+            min_questions: Minimum questions for an extraction to be accepted
+        """
+        self.models = list(models or DEFAULT_CASCADE)
+        if not self.models:
+            raise ValueError("A model cascade needs at least one model")
+        self.min_actors = min_actors
+        self.min_questions = min_questions
+
+        self.stats: Dict[str, Any] = {
+            "extractions": 0,
+            "escalations": 0,
+            "accepted_by_model": {model: 0 for model in self.models},
+            "failures": {},
+        }
+
+    @classmethod
+    def from_env(cls) -> Optional["ModelCascade"]:
+        """Build a cascade from GSW_MODEL_CASCADE (None if unset)."""
+        models = [m.strip() for m in os.getenv("GSW_MODEL_CASCADE", "").split(",") if m.strip()]
+        if not models:
+            return None
+        return cls(
+            models=models,
+            min_actors=int(os.getenv("GSW_CASCADE_MIN_ACTORS", "1")),
+            min_questions=int(os.getenv("GSW_CASCADE_MIN_QUESTIONS", "1"))
+        )
+
+    def validate(self, extraction: ChunkExtraction) -> List[str]:
+        """Failure reasons for an extraction under this cascade's criteria."""
+        return validate_extraction(extraction, self.min_actors, self.min_questions)
+
+    def record(self, attempts: List[Dict[str, Any]]) -> None:
+        """Record the attempts of one cascaded extraction."""
+        self.stats["extractions"] += 1
+        self.stats["escalations"] += len(attempts) - 1
+        accepted = attempts[-1]["model"]
+        self.stats["accepted_by_model"][accepted] = self.stats["accepted_by_model"].get(accepted, 0) + 1
+        for attempt in attempts[:-1]:
+            for issue in attempt["issues"]:
+                self.stats["failures"][issue] = self.stats["failures"].get(issue, 0) + 1
+
+    def summary(self) -> str:
+        """One-line summary of which models ended up producing extractions."""
+        stats = self.stats
+        accepted = ", ".join(f"{m} {n}" for m, n in stats["accepted_by_model"].items())
+        line = f"extractions={stats['extractions']} escalations={stats['escalations']} (accepted: {accepted})"
+        if stats["failures"]:
+            failures = ", ".join(f"{k} {v}" for k, v in sorted(stats["failures"].items()))
+            line += f" (escalated on: {failures})"
+        return line
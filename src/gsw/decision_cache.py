@@ -0,0 +1,254 @@
+"""
+Decision Cache - Remember LLM Entity Reconciliation Verdicts
+
+The same pairings come up in chunk after chunk and document after document:
+"the Court" against "Family Court of Australia", "the ICL" against
+"Independent Children's Lawyer". Without a cache the LLM is asked each
+time. DecisionCache keeps the LLM's verdict for every pair it was shown:
+
+    new actor key  (type, normalized name, normalized aliases)
+      -> existing actor key  (type, normalized name)
+           -> verdict ("match" / "no_match"), confidence, and the existing
+              actor's aliases and roles when the verdict was made
+
+Before calling the LLM the reconciler looks up each new actor against its
+shortlisted candidates. An actor is resolved from the cache when one of its
+candidates has a cached match, or every candidate has a cached no-match;
+the LLM is only asked about the rest, and not at all if nothing is left.
+
+An entry is invalidated when its existing actor changed substantially since
+the verdict: it lost a role, or gained more aliases/roles than it had then
+(and more than MAX_NEW_FEATURES). A rename or retype changes the key, so
+the old verdict no longer applies. Aliases gained through the cached match
+itself are within these limits.
+
+Verdicts are persisted as JSON next to the workspaces, so later runs start
+warm. The cache holds at most max_pairs pairs; new actor keys not looked up
+for the longest time are evicted first.
+
+Configuration (environment):
+    GSW_DECISION_CACHE        Set to 0 to disable the cache (default: on)
+    GSW_DECISION_CACHE_FILE   JSON file for verdicts (default: in memory only)
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.logic.gsw_schema import Actor
+
+
+MIN_MATCH_CONFIDENCE = 0.8     # LLM matches less certain than this are asked again
+MAX_NEW_FEATURES = 2           # Aliases/roles an existing actor may gain before re-asking
+MAX_PAIRS = 200000             # Cached pairs kept (oldest new actor keys evicted)
+
+MATCH = "match"
+NO_MATCH = "no_match"
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def new_actor_key(actor: Actor) -> str:
+    """Cache key of a new actor: type, name and aliases, normalized."""
+    aliases = sorted({_normalize(a) for a in actor.aliases} - {""})
+    return "|".join([actor.actor_type.value, _normalize(actor.name), ",".join(aliases)])
+
+
+def existing_actor_key(actor: Actor) -> str:
+    """Signature of an existing actor: type and normalized name."""
+    return f"{actor.actor_type.value}|{_normalize(actor.name)}"
+
+
+def actor_features(actor: Actor) -> Set[str]:
+    """Aliases and roles a verdict was based on (compared for invalidation)."""
+    features = {_normalize(a) for a in actor.aliases}
+    features |= {f"role:{_normalize(r)}" for r in actor.roles}
+    features.discard("")
+    return features
+
+
+def changed_substantially(recorded: Set[str], current: Set[str]) -> bool:
+    """True if an existing actor drifted too far from when a verdict was made."""
+    lost_roles = any(f.startswith("role:") and f not in current for f in recorded)
+    gained = len(current - recorded)
+    return lost_roles or gained > max(MAX_NEW_FEATURES, len(recorded))
+
+
+class DecisionCache:
+    """
+    Persistent match/no-match verdicts for (new actor, existing actor) pairs.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_pairs: int = MAX_PAIRS):
+        """
+        Args:
+            path: JSON file to load from and save to (None keeps verdicts in memory)
+            max_pairs: Cached pairs kept before evicting the oldest
+        """
+        self.path = Path(path) if path else None
+        self.max_pairs = max_pairs
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._pairs = 0
+
+        self.stats = {
+            "lookups": 0,          # new actors looked up
+            "resolved": 0,         # ... resolved without the LLM
+            "matches": 0,          # ... of which by a cached match
+            "invalidated": 0,      # entries dropped as stale
+            "recorded": 0,         # verdicts recorded from the LLM
+        }
+
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("entries", {})
+                self._pairs = sum(len(pairs) for pairs in self.entries.values())
+            except (OSError, json.JSONDecodeError, AttributeError) as e:
+                print(f"[Decisions Warning] Ignoring unreadable {self.path}: {e}")
+                self.entries = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["DecisionCache"]:
+        """Cache configured by GSW_DECISION_CACHE_FILE (None if GSW_DECISION_CACHE=0)."""
+        if os.getenv("GSW_DECISION_CACHE", "1") == "0":
+            return None
+        path = os.getenv("GSW_DECISION_CACHE_FILE")
+        return cls(Path(path) if path else None)
+
+    def __len__(self) -> int:
+        return self._pairs
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def resolve(self, new_actor: Actor, candidates: List[Actor]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Resolve a new actor against its shortlisted candidates from the cache.
+
+        Args:
+            new_actor: Actor from the chunk being reconciled
+            candidates: Workspace actors the LLM would be shown for it, best first
+
+        Returns:
+            (resolved, match): resolved is False if the LLM must be asked;
+            match is an entity match in the reconciler's format, or None if
+            the cache says the actor matches none of the candidates
+        """
+        self.stats["lookups"] += 1
+        key = new_actor_key(new_actor)
+        pairs = self.entries.get(key)
+        if pairs is None:
+            return False, None
+        # Recently used keys are evicted last
+        self.entries[key] = self.entries.pop(key)
+
+        resolved = True
+        for candidate in candidates:
+            signature = existing_actor_key(candidate)
+            entry = pairs.get(signature)
+            if entry is not None and changed_substantially(set(entry["features"]), actor_features(candidate)):
+                del pairs[signature]
+                self._pairs -= 1
+                self.stats["invalidated"] += 1
+                entry = None
+            if entry is None:
+                resolved = False
+            elif entry["verdict"] == MATCH:
+                self.stats["resolved"] += 1
+                self.stats["matches"] += 1
+                return True, {
+                    "new_entity_id": new_actor.id,
+                    "existing_entity_id": candidate.id,
+                    "confidence": entry["confidence"],
+                    "reason": f"Cached decision: {new_actor.name} = {candidate.name}",
+                }
+        if not pairs:
+            del self.entries[key]
+        if resolved:
+            self.stats["resolved"] += 1
+        return resolved, None
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        new_actors: List[Actor],
+        shown: List[Actor],
+        matches: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Record the LLM's verdicts for every pair it was shown.
+
+        Args:
+            new_actors: New actors in the prompt
+            shown: Existing actors in the prompt
+            matches: Entity matches the LLM returned
+        """
+        by_id = {a.id: a for a in shown}
+        matched: Dict[str, Tuple[str, Optional[float]]] = {}
+        for m in matches:
+            existing_id = m.get("existing_entity_id")
+            if existing_id in by_id:
+                matched[m.get("new_entity_id")] = (existing_id, m.get("confidence"))
+
+        for new_actor in new_actors:
+            key = new_actor_key(new_actor)
+            pairs = self.entries.pop(key, {})
+            match = matched.get(new_actor.id)
+            for existing in shown:
+                if match and match[0] == existing.id:
+                    confidence = match[1]
+                    if not isinstance(confidence, (int, float)) or confidence < MIN_MATCH_CONFIDENCE:
+                        # Uncertain: ask again next time
+                        if pairs.pop(existing_actor_key(existing), None) is not None:
+                            self._pairs -= 1
+                        continue
+                    verdict = MATCH
+                else:
+                    verdict, confidence = NO_MATCH, None
+                signature = existing_actor_key(existing)
+                if signature not in pairs:
+                    self._pairs += 1
+                pairs[signature] = {
+                    "verdict": verdict,
+                    "confidence": confidence,
+                    "features": sorted(actor_features(existing)),
+                }
+                self.stats["recorded"] += 1
+            if pairs:
+                self.entries[key] = pairs
+
+        while self._pairs > self.max_pairs and self.entries:
+            oldest = next(iter(self.entries))
+            self._pairs -= len(self.entries.pop(oldest))
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write the verdicts (no-op for an in-memory cache)."""
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"entries": self.entries}, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"[Decisions Warning] Could not save {self.path}: {e}")
+
+    def summary(self) -> str:
+        """One-line summary of actors resolved without the LLM."""
+        stats = self.stats
+        return (f"{stats['resolved']}/{stats['lookups']} actors resolved from cache "
+                f"({stats['matches']} matches) | "
+                f"{stats['invalidated']} invalidated | {len(self)} pairs cached")
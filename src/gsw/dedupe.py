@@ -0,0 +1,517 @@
+"""
+Entity Deduplication - Offline Global Entity Resolution Over a Workspace
+
+Chunk-by-chunk reconciliation only sees one chunk at a time, so duplicate
+actors accumulate ("Mr Smith", "John Smith", "the husband"). The dedupe
+pass resolves them over the whole workspace in one batch:
+
+1. scope:    actors are grouped by source document; cross-case actors
+             (judges, courts, legislation, see partitions.is_cross_case)
+             share one domain-wide scope. Actors without a document id
+             (workspaces built before document ids were stored) share a
+             legacy scope.
+2. block:    within a scope and actor type, actors are bucketed by
+             normalized name keys, name/alias tokens and a phonetic code
+             (Soundex of the surname for people)
+3. score:    pairs inside a block are scored with cheap similarity
+             (exact key, surname + compatible given name, difflib ratio)
+4. union:    matches are unioned in a disjoint-set structure. A union is
+             refused when the two sets disagree on a gendered title
+             (Mr / Mrs) or a given name (John / Jane), so one ambiguous
+             "Smith" cannot chain a husband and wife together
+5. roles:    "the husband" joins the single actor of its document holding
+             a related role, as the rule-based reconciler does
+6. rewrite:  each set keeps its earliest actor (named after a proper name
+             rather than a legal term); the others are merged into it and every reference (verb agents/patients, link members,
+             question targets/answers, states, summaries) is rewritten in
+             one pass
+
+Exact-key blocks are unioned without pairwise comparison; token and
+phonetic blocks larger than MAX_BLOCK are skipped (too common to narrow
+anything down). The work is linear in the number of actors plus the
+pairs inside small blocks.
+"""
+
+import re
+import time
+from functools import lru_cache
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.gsw.legal_reconciler import ROLE_MAPPINGS, LegalReconciler
+from src.gsw.partitions import is_cross_case
+from src.logic.gsw_schema import Actor, ActorType, GlobalWorkspace
+
+
+MATCH_THRESHOLD = 0.9          # Pair score needed to merge
+MAX_BLOCK = 100                # Skip token/phonetic blocks larger than this
+
+# Leading words dropped from names; gendered titles are kept as a constraint
+TITLES = {
+    "the", "mr", "mrs", "ms", "miss", "master", "dr", "prof", "sir", "dame",
+    "hon", "honourable", "justice", "judge", "magistrate", "registrar",
+}
+GENDER_TITLES = {"mr": "m", "master": "m", "sir": "m", "mrs": "f", "ms": "f", "miss": "f", "dame": "f"}
+LEADING_WORDS = TITLES | set(GENDER_TITLES)
+# Trailing post-nominals ("Smith J", "Brown FM", "Jones SC")
+SUFFIXES = {"j", "cj", "fm", "sc", "qc", "kc", "am", "ao", "ac", "jr", "sr"}
+STOP_TOKENS = {"of", "and", "the", "for", "in", "at", "on", "pty", "ltd", "co"}
+
+CROSS_CASE_SCOPE = "*"
+
+_SOUNDEX_CODES = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+# ============================================================================
+# NAME NORMALIZATION
+# ============================================================================
+
+@lru_cache(maxsize=65536)
+def soundex(word: str) -> str:
+    """American Soundex code of a word ("" for words without letters)."""
+    word = re.sub(r"[^a-z]", "", word.lower())
+    if not word:
+        return ""
+    coded = word.translate(_SOUNDEX_CODES)
+    digits = []
+    previous = coded[0]
+    for letter, code in zip(word[1:], coded[1:]):
+        if code.isdigit() and code != previous:
+            digits.append(code)
+        # Vowels separate equal codes, h and w do not
+        if letter not in "hw":
+            previous = code
+    return (word[0] + "".join(digits) + "000")[:4].upper()
+
+
+def name_form(text: str) -> Tuple[Tuple[str, ...], Optional[str]]:
+    """
+    Tokens of a name without titles and post-nominals, plus its gender title.
+
+    Returns:
+        (tokens, "m" / "f" / None)
+    """
+    words = _WORD.findall(text.lower())
+    gender = None
+    start = 0
+    while start < len(words) - 1 and words[start] in LEADING_WORDS:
+        gender = GENDER_TITLES.get(words[start], gender)
+        start += 1
+    end = len(words)
+    while end - start > 1 and words[end - 1] in SUFFIXES:
+        end -= 1
+    return tuple(words[start:end]), gender
+
+
+def _given_compatible(a: str, b: str) -> bool:
+    """Given names agree: equal, or one is the other's initial."""
+    if len(a) == 1 or len(b) == 1:
+        return a[0] == b[0]
+    return a == b
+
+
+# ============================================================================
+# DISJOINT SET
+# ============================================================================
+
+class DisjointSet:
+    """
+    Union-find over 0..n-1 with path halving. The root of a set is its
+    smallest member, so the earliest actor of a group is its canonical one.
+    Each root carries the gender titles and given names of its set.
+    """
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.genders: Dict[int, Set[str]] = {}
+        self.givens: Dict[int, Set[str]] = {}
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def constrain(self, i: int, genders: Set[str], givens: Set[str]) -> None:
+        """Record the gender titles and given names of element i (a singleton)."""
+        if genders:
+            self.genders[i] = set(genders)
+        if givens:
+            self.givens[i] = set(givens)
+
+    def conflicts(self, a: int, b: int) -> bool:
+        """True if the sets of two roots cannot be the same entity."""
+        ga, gb = self.genders.get(a), self.genders.get(b)
+        if ga and gb and ga != gb:
+            return True
+        na, nb = self.givens.get(a), self.givens.get(b)
+        if na and nb:
+            return not any(_given_compatible(x, y) for x in na for y in nb)
+        return False
+
+    def union(self, a: int, b: int) -> bool:
+        """Join the sets of a and b; False if they already match or conflict."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb or self.conflicts(ra, rb):
+            return False
+        root, child = (ra, rb) if ra < rb else (rb, ra)
+        self.parent[child] = root
+        for attr in (self.genders, self.givens):
+            if child in attr:
+                attr.setdefault(root, set()).update(attr.pop(child))
+        return True
+
+
+# ============================================================================
+# DEDUPLICATOR
+# ============================================================================
+
+class EntityDeduplicator:
+    """
+    Blocking + similarity + union-find entity resolution over a workspace.
+    """
+
+    def __init__(
+        self,
+        threshold: float = MATCH_THRESHOLD,
+        max_block: int = MAX_BLOCK,
+        role_mappings: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        Args:
+            threshold: Pair score needed to merge two actors (0..1)
+            max_block: Token/phonetic blocks larger than this are skipped
+            role_mappings: Legal terms -> related roles (default: the reconciler's)
+        """
+        self.threshold = threshold
+        self.max_block = max_block
+        self.role_mappings = ROLE_MAPPINGS if role_mappings is None else role_mappings
+
+        self.stats = {
+            "actors": 0,
+            "scopes": 0,
+            "blocks": 0,
+            "skipped_blocks": 0,
+            "comparisons": 0,
+            "groups": 0,
+            "merged": 0,
+            "references": 0,
+            "seconds": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def dedupe(self, workspace: GlobalWorkspace) -> Dict[str, str]:
+        """
+        Find duplicate actors and merge them in place.
+
+        Returns:
+            Duplicate actor id -> id of the actor it was merged into
+        """
+        started = time.perf_counter()
+        merges = self.find_duplicates(workspace)
+        self.stats["references"] = apply_merges(workspace, merges)
+        self.stats["seconds"] = time.perf_counter() - started
+        return merges
+
+    def find_duplicates(self, workspace: GlobalWorkspace) -> Dict[str, str]:
+        """
+        Resolve duplicate actors without changing the workspace.
+
+        Returns:
+            Duplicate actor id -> id of its canonical (earliest) actor
+        """
+        started = time.perf_counter()
+        for key in self.stats:
+            self.stats[key] = 0.0 if key == "seconds" else 0
+        actors = list(workspace.actors.values())
+        forms = [self._forms(actor) for actor in actors]
+        sets = DisjointSet(len(actors))
+        for i, actor_forms in enumerate(forms):
+            sets.constrain(
+                i,
+                {gender for _, gender in actor_forms if gender},
+                self._givens(actors[i], actor_forms)
+            )
+
+        scopes: Dict[str, List[int]] = {}
+        for i, actor in enumerate(actors):
+            scopes.setdefault(self._scope(actor), []).append(i)
+
+        for scope, members in scopes.items():
+            self._resolve_scope(actors, forms, members, sets)
+            if scope not in ("", CROSS_CASE_SCOPE):
+                self._resolve_role_terms(actors, members, sets)
+
+        merges: Dict[str, str] = {}
+        roots: Set[int] = set()
+        for i, actor in enumerate(actors):
+            root = sets.find(i)
+            if root != i:
+                merges[actor.id] = actors[root].id
+                roots.add(root)
+
+        self.stats["actors"] = len(actors)
+        self.stats["scopes"] = len(scopes)
+        self.stats["groups"] = len(roots)
+        self.stats["merged"] = len(merges)
+        self.stats["seconds"] = time.perf_counter() - started
+        return merges
+
+    def summary(self) -> str:
+        """One-line summary of the last run."""
+        stats = self.stats
+        return (f"{stats['merged']} duplicates merged into {stats['groups']} actors "
+                f"({stats['actors']} actors, {stats['scopes']} scopes, "
+                f"{stats['blocks']} blocks, {stats['skipped_blocks']} skipped, "
+                f"{stats['comparisons']} comparisons) in {stats['seconds']:.2f}s")
+
+    # ------------------------------------------------------------------
+    # Blocking and scoring
+    # ------------------------------------------------------------------
+
+    def _resolve_scope(
+        self,
+        actors: List[Actor],
+        forms: List[List[Tuple[Tuple[str, ...], Optional[str]]]],
+        members: List[int],
+        sets: DisjointSet
+    ) -> None:
+        """Union the duplicates among the actors of one scope."""
+        # Actors known by a surname only, and the full names they could be
+        short = {i: not any(len(tokens) > 1 for tokens, _ in forms[i]) for i in members}
+        surname_matches: Dict[int, Set[int]] = {}
+
+        exact: Dict[Tuple[str, str], List[int]] = {}
+        fuzzy: Dict[Tuple[str, str, str], List[int]] = {}
+        for i in members:
+            actor_type = actors[i].actor_type.value
+            for key in self._block_keys(actors[i], forms[i]):
+                if key[0] == "=":
+                    exact.setdefault((actor_type, key), []).append(i)
+                else:
+                    fuzzy.setdefault((actor_type, key[0], key), []).append(i)
+
+        # Same normalized name or alias: a match without comparison, unless
+        # the sets conflict (then the actor heads a set of its own)
+        for block in exact.values():
+            self.stats["blocks"] += 1
+            heads: List[int] = []
+            for j in block:
+                if not any(sets.find(h) == sets.find(j) or sets.union(h, j) for h in heads):
+                    heads.append(j)
+
+        for block in fuzzy.values():
+            if len(block) < 2:
+                continue
+            self.stats["blocks"] += 1
+            if len(block) > self.max_block:
+                self.stats["skipped_blocks"] += 1
+                continue
+            block = list(dict.fromkeys(block))
+            for x in range(len(block)):
+                for y in range(x + 1, len(block)):
+                    a, b = block[x], block[y]
+                    if sets.find(a) == sets.find(b):
+                        continue
+                    self.stats["comparisons"] += 1
+                    score, surname_only = self._score(actors[a], forms[a], forms[b])
+                    if score < self.threshold:
+                        continue
+                    if not surname_only:
+                        sets.union(a, b)
+                    elif short[a] != short[b]:
+                        short_id, full_id = (a, b) if short[a] else (b, a)
+                        surname_matches.setdefault(short_id, set()).add(full_id)
+
+        # "Mr Smith" joins a full name only if it is the one Smith of the scope
+        for i, candidates in surname_matches.items():
+            roots = {sets.find(j) for j in candidates}
+            roots.discard(sets.find(i))
+            if len(roots) == 1:
+                sets.union(i, roots.pop())
+
+    def _resolve_role_terms(self, actors: List[Actor], members: List[int], sets: DisjointSet) -> None:
+        """Join "the husband" etc. to the one actor of the document with a related role."""
+        by_role: Dict[str, List[int]] = {}
+        generic: List[Tuple[int, str]] = []
+        for i in members:
+            keys = [k.lower().strip() for k in [actors[i].name] + list(actors[i].aliases)]
+            term = next((k for k in keys if k in self.role_mappings), None)
+            if term and keys[0] == term:
+                generic.append((i, term))
+                continue
+            for role in actors[i].roles:
+                by_role.setdefault(role.lower(), []).append(i)
+
+        for i, term in generic:
+            roots = {sets.find(j) for role in self.role_mappings[term] for j in by_role.get(role, ())}
+            roots.discard(sets.find(i))
+            if len(roots) == 1:
+                sets.union(i, roots.pop())
+
+    def _score(
+        self,
+        actor: Actor,
+        forms_a: List[Tuple[Tuple[str, ...], Optional[str]]],
+        forms_b: List[Tuple[Tuple[str, ...], Optional[str]]]
+    ) -> Tuple[float, bool]:
+        """
+        Best similarity of any name/alias form of a to any form of b.
+
+        Returns:
+            (score, True if the score only rests on a shared surname)
+        """
+        person = actor.actor_type == ActorType.PERSON
+        best = 0.0
+        surname_only = False
+        for tokens_a, gender_a in forms_a:
+            for tokens_b, gender_b in forms_b:
+                if not tokens_a or not tokens_b:
+                    continue
+                if gender_a and gender_b and gender_a != gender_b:
+                    continue
+                if tokens_a == tokens_b or (not person and set(tokens_a) == set(tokens_b)):
+                    return 1.0, False
+                if person and tokens_a[-1] == tokens_b[-1]:
+                    given_a, given_b = tokens_a[:-1], tokens_b[:-1]
+                    if given_a and given_b:
+                        if _given_compatible(given_a[0], given_b[0]) and best < 0.9:
+                            best, surname_only = 0.9, False
+                    elif best < 0.9:
+                        best, surname_only = 0.9, True
+                    # Same surname, different given name: not the same person
+                    continue
+                ratio = SequenceMatcher(None, " ".join(tokens_a), " ".join(tokens_b)).ratio()
+                if ratio > best:
+                    best, surname_only = ratio, False
+        return best, surname_only
+
+    def _block_keys(
+        self,
+        actor: Actor,
+        forms: List[Tuple[Tuple[str, ...], Optional[str]]]
+    ) -> Set[str]:
+        """Blocking keys: "=" exact name, "t" name token, "p" phonetic code."""
+        keys: Set[str] = set()
+        person = actor.actor_type == ActorType.PERSON
+        for tokens, _ in forms:
+            if not tokens:
+                continue
+            keys.add("=" + " ".join(tokens))
+            for token in tokens:
+                if len(token) > 1 and token not in STOP_TOKENS:
+                    keys.add("t" + token)
+            if person:
+                code = soundex(tokens[-1])
+            else:
+                code = soundex(tokens[0]) + soundex(tokens[-1]) if len(tokens) > 1 else soundex(tokens[0])
+            if code:
+                keys.add("p" + code)
+        return keys
+
+    @staticmethod
+    def _forms(actor: Actor) -> List[Tuple[Tuple[str, ...], Optional[str]]]:
+        return [name_form(text) for text in dict.fromkeys([actor.name] + list(actor.aliases))]
+
+    @staticmethod
+    def _givens(actor: Actor, forms: List[Tuple[Tuple[str, ...], Optional[str]]]) -> Set[str]:
+        """First given names (or initials) of a person's names."""
+        if actor.actor_type != ActorType.PERSON:
+            return set()
+        return {tokens[0] for tokens, _ in forms if len(tokens) > 1}
+
+    @staticmethod
+    def _scope(actor: Actor) -> str:
+        if is_cross_case(actor):
+            return CROSS_CASE_SCOPE
+        return (actor.metadata or {}).get("source_document_id", "")
+
+
+# ============================================================================
+# MERGE AND REFERENCE REWRITE
+# ============================================================================
+
+def apply_merges(workspace: GlobalWorkspace, merges: Dict[str, str]) -> int:
+    """
+    Merge duplicate actors into their canonical actors and rewrite references.
+
+    Args:
+        workspace: Workspace to update in place
+        merges: Duplicate actor id -> canonical actor id
+
+    Returns:
+        Number of references rewritten
+    """
+    if not merges:
+        return 0
+
+    for duplicate_id, canonical_id in merges.items():
+        duplicate = workspace.actors.get(duplicate_id)
+        canonical = workspace.actors.get(canonical_id)
+        if duplicate is None or canonical is None:
+            continue
+        LegalReconciler._merge_actors(canonical, duplicate)
+        # "the child" merged with "Linda Smith" is known by the proper name
+        if canonical.name.lower().strip() in ROLE_MAPPINGS and duplicate.name.lower().strip() not in ROLE_MAPPINGS:
+            canonical.aliases = [a for a in canonical.aliases if a != duplicate.name]
+            if canonical.name not in canonical.aliases:
+                canonical.aliases.append(canonical.name)
+            canonical.name = duplicate.name
+        for link_id in duplicate.spatio_temporal_link_ids:
+            canonical.add_link(link_id)
+        for case in duplicate.involved_cases:
+            canonical.add_case(case)
+        for key, value in (duplicate.metadata or {}).items():
+            canonical.metadata.setdefault(key, value)
+
+    workspace.remove_actors(merges)
+    rewritten = rewrite_references(workspace, merges)
+    for duplicate_id, canonical_id in merges.items():
+        summary = workspace.entity_summaries.pop(duplicate_id, None)
+        if summary is not None:
+            workspace.entity_summaries.setdefault(canonical_id, summary)
+    workspace.touch()
+    return rewritten
+
+
+def rewrite_references(workspace: GlobalWorkspace, id_map: Dict[str, str]) -> int:
+    """
+    Rewrite every actor reference in the workspace through id_map in one pass.
+
+    Returns:
+        Number of references changed
+    """
+    changed = 0
+
+    def ref(actor_id: Optional[str]) -> Optional[str]:
+        nonlocal changed
+        if actor_id in id_map:
+            changed += 1
+            return id_map[actor_id]
+        return actor_id
+
+    def refs(actor_ids: Iterable[str]) -> List[str]:
+        return list(dict.fromkeys(ref(x) for x in actor_ids))
+
+    for verb in workspace.verb_phrases.values():
+        verb.agent_id = ref(verb.agent_id)
+        verb.patient_ids = refs(verb.patient_ids)
+        verb.temporal_id = ref(verb.temporal_id)
+        verb.spatial_id = ref(verb.spatial_id)
+
+    for link in workspace.spatio_temporal_links.values():
+        link.linked_entity_ids = refs(link.linked_entity_ids)
+
+    for question in workspace.questions.values():
+        question.target_entity_id = ref(question.target_entity_id)
+        question.answer_entity_id = ref(question.answer_entity_id)
+
+    for state in workspace.states.values():
+        state.entity_id = ref(state.entity_id)
+
+    return changed
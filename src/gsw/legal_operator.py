@@ -14,11 +14,13 @@ Based on: GSW_prompt_operator.pdf
 Adapted for: Australian Legal Domain
 """
 
+import contextvars
 import json
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
 from uuid import uuid4
 import os
 
@@ -30,6 +32,17 @@ from src.logic.gsw_schema import (
     SpatioTemporalLink, ChunkExtraction, QuestionType, LinkType,
     OntologyContext
 )
+from src.gsw.adaptive_chunking import (
+    CHUNK_OVERLAP, MAX_SPLIT_DEPTH, ChunkSizeStore, extraction_truncated, merge_extractions
+)
+from src.gsw.cascade import ModelCascade
+from src.gsw.legal_reconciler import LegalReconciler
+from src.gsw.llm_client import chat_completion, shared_client, stream_chat_completion
+from src.gsw.llm_transport import replay_api_key
+from src.gsw.reflexion import ReflexionPolicy, extraction_triggers
+from src.gsw.telemetry import current_context, telemetry_context
+from src.utils.json_stream import IncrementalJSONParser, parse_partial_json
+from src.utils.toon import ToonDecodeError, ToonDecoder
 
 
 # ============================================================================
@@ -50,7 +63,7 @@ This mirrors how human episodic memory works:
 When you remember an experience, you remember WHO was involved and WHAT happened to them.
 """
 
-LEGAL_OPERATOR_USER_PROMPT = """
+LEGAL_OPERATOR_TASKS = """
 ## Your 6 Tasks
 
 ### Task 1: ACTOR IDENTIFICATION
@@ -144,9 +157,15 @@ For each question, if the text provides an answer:
 - Mark as answerable: true
 - Provide the answer_text
 - Link to the relevant actor_id
+"""
 
+# Per-document input. It goes last in every prompt: the tasks and output
+# format before it are byte-identical across calls, so providers can serve
+# them from their prompt-prefix cache. The ontology changes least often of
+# the variable parts, so it comes first among them.
+LEGAL_OPERATOR_INPUT = """
 ---
-
+{ontology_context}
 <situation>
 {situation}
 </situation>
@@ -155,12 +174,12 @@ For each question, if the text provides an answer:
 {background_context}
 </background_context>
 
-{ontology_context}
-
 <input_text>
 {input_text}
 </input_text>
+"""
 
+LEGAL_OPERATOR_JSON_FORMAT = """
 ---
 
 ## Output Format
@@ -232,6 +251,154 @@ IMPORTANT:
 - Generate at least 5 predictive questions
 """
 
+# Compact alternative to the JSON format: the same fields as TOON tables,
+# decoded by ToonDecoder.decode_extraction. Roughly half the output tokens.
+LEGAL_OPERATOR_TOON_FORMAT = """
+---
+
+## Output Format
+
+Return TOON tables (no JSON, no prose). Each table is a header
+`Name[row_count]{{columns}}` followed by one comma-separated row per line
+and a blank line. Separate list values with `|`, write flags as 1 or 0,
+leave a value empty if unknown, and wrap any value containing a comma in
+double quotes (write a literal quote as "").
+
+```
+Summary[1]{{text}}
+Brief description of what this text is about
+
+Actors[3]{{id,name,type,aliases,roles}}
+actor_001,John Smith,person,the husband|the applicant|Mr Smith,Applicant|Husband|Father
+actor_010,Family Court of Australia,organization,,Court
+actor_020,15 March 2020,temporal,date of separation,
+
+States[2]{{actor,name,value,start,end}}
+actor_001,RelationshipStatus,Separated,2020-03-15,
+actor_001,Employment,Employed as accountant,,
+
+VerbPhrases[1]{{id,verb,agent,patients,temporal,spatial,implicit}}
+verb_001,filed,actor_001,actor_010,actor_020,,0
+
+Questions[1]{{id,type,about,answer_id,answered,answer,question}}
+q_001,when,actor_001,actor_020,1,"March 15, 2020",When did the parties separate?
+
+Links[1]{{id,entities,type,value}}
+link_001,actor_001|actor_010|actor_020,temporal,2020-03-15
+```
+
+IMPORTANT:
+- Extract ALL actors, even minor ones
+- Generate IDs consistently (actor_001, actor_002, etc.)
+- If a date is mentioned, create a temporal actor for it
+- Link actors via VerbPhrases and Links
+- Be conservative with states - only include what's explicitly stated
+- Generate at least 5 predictive questions
+"""
+
+LEGAL_OPERATOR_USER_PROMPT = LEGAL_OPERATOR_TASKS + LEGAL_OPERATOR_JSON_FORMAT + LEGAL_OPERATOR_INPUT
+LEGAL_OPERATOR_TOON_USER_PROMPT = LEGAL_OPERATOR_TASKS + LEGAL_OPERATOR_TOON_FORMAT + LEGAL_OPERATOR_INPUT
+
+OUTPUT_FORMATS = ("json", "toon")
+
+# Several short documents in one request. Task instructions are shared;
+# each document is delimited and tagged so the response can be split
+# back into one ChunkExtraction per document.
+LEGAL_OPERATOR_PACKED_PROMPT = LEGAL_OPERATOR_TASKS + """
+---
+
+The input at the end contains SEPARATE legal documents.
+Perform all 6 tasks on EACH document independently. Never link actors,
+verbs or questions across documents.
+
+## Output Format
+
+Return a JSON object with one entry per document, in input order:
+
+```json
+{{
+    "documents": [
+        {{
+            "document_id": "D1",
+            "situation_summary": "Brief description of this document",
+            "actors": [
+                {{
+                    "id": "D1_actor_001",
+                    "name": "John Smith",
+                    "actor_type": "person",
+                    "aliases": ["the applicant"],
+                    "roles": ["Applicant"],
+                    "states": [{{"name": "Employment", "value": "Accountant", "start_date": null}}]
+                }}
+            ],
+            "verb_phrases": [
+                {{"id": "D1_verb_001", "verb": "filed", "agent_id": "D1_actor_001", "patient_ids": ["D1_actor_002"], "temporal_id": null, "is_implicit": false}}
+            ],
+            "questions": [
+                {{"id": "D1_q_001", "question_text": "Who is the applicant?", "question_type": "who", "target_entity_id": "D1_actor_001", "answerable": true, "answer_text": "John Smith", "answer_entity_id": "D1_actor_001"}}
+            ],
+            "spatio_temporal_links": [
+                {{"id": "D1_link_001", "linked_entity_ids": ["D1_actor_001"], "tag_type": "temporal", "tag_value": "2020-03-15"}}
+            ]
+        }}
+    ]
+}}
+```
+
+IMPORTANT:
+- "document_id" MUST be the id attribute of the <document> tag
+- Prefix every id with its document_id (D1_actor_001, D2_actor_001, ...)
+- Extract ALL actors of each document, even minor ones
+- Generate at least 3 predictive questions per document
+
+---
+{ontology_context}
+<documents count="{document_count}">
+{documents}
+</documents>
+"""
+
+PACKED_DOCUMENT_TEMPLATE = """<document id="{tag}">
+<situation>{situation}</situation>
+<background_context>{background_context}</background_context>
+<input_text>
+{input_text}
+</input_text>
+</document>"""
+
+# Reflexion pass - only missing or corrected elements are returned
+LEGAL_OPERATOR_REVIEW_PROMPT = """
+Review this extraction for accuracy and completeness.
+
+REVIEW CHECKLIST:
+1. Are all parties (applicant, respondent) identified?
+2. Are all dates captured as temporal entities?
+3. Are key assets identified?
+4. Are relationship states tracked?
+5. Are the questions appropriate for this text?
+
+If the extraction looks good, respond with: {{"status": "approved"}}
+
+If improvements are needed, respond with ONLY the missing or corrected items,
+using the same JSON format as the original extraction ("actors",
+"verb_phrases", "questions", "spatio_temporal_links"):
+- To correct an existing actor, reuse its id and give the added roles,
+  aliases or states
+- Give new actors new ids (actor_r01, actor_r02, ...)
+
+LIKELY PROBLEMS:
+{problems}
+
+EXTRACTED ACTORS:
+{actors_json}
+
+EXTRACTED QUESTIONS:
+{questions_json}
+
+ORIGINAL TEXT:
+{original_text}
+"""
+
 
 # ============================================================================
 # OPERATOR CLASS
@@ -254,7 +421,12 @@ class LegalOperator:
         self,
         model: str = "google/gemini-2.0-flash-001",
         api_key: Optional[str] = None,
-        use_openrouter: bool = True
+        use_openrouter: bool = True,
+        stream: bool = False,
+        reflexion: Optional[ReflexionPolicy] = None,
+        cascade: Optional[ModelCascade] = None,
+        output_format: Optional[str] = None,
+        chunk_sizes: Optional[ChunkSizeStore] = None
     ):
         """
         Initialize the Legal Operator.
@@ -263,15 +435,36 @@ class LegalOperator:
             model: Model to use for extraction
             api_key: API key (or uses env var)
             use_openrouter: Whether to use OpenRouter API
+            stream: Stream the completion and parse it incrementally
+            reflexion: Policy deciding when review_extraction calls the LLM
+                (default: from GSW_REFLEXION, "triggered")
+            cascade: Models to try cheapest-first, escalating when an
+                extraction fails validation (default: from GSW_MODEL_CASCADE,
+                none - only `model` is used)
+            output_format: "json" or "toon" - TOON tables need far fewer
+                output tokens; responses that do not decode as TOON fall
+                back to the JSON parser (default: from GSW_OPERATOR_FORMAT,
+                "json"). TOON responses are never streamed.
+            chunk_sizes: Learned per-domain chunk sizes. Chunks larger than
+                the learned size are split up front, and chunks whose output
+                is truncated are split in half and re-extracted (default:
+                from GSW_ADAPTIVE_CHUNKING / GSW_CHUNK_SIZES, in memory)
         """
         self.model = model
         self.use_openrouter = use_openrouter
+        self.stream = stream
+        self.reflexion = reflexion or ReflexionPolicy.from_env()
+        self.cascade = cascade or ModelCascade.from_env()
+        self.output_format = (output_format or os.getenv("GSW_OPERATOR_FORMAT") or "json").lower()
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {self.output_format!r} (expected one of {OUTPUT_FORMATS})")
+        self.chunk_sizes = chunk_sizes or ChunkSizeStore.from_env()
 
         # Get API key
         if api_key:
             self.api_key = api_key
         elif use_openrouter:
-            self.api_key = os.getenv("OPENROUTER_API_KEY")
+            self.api_key = os.getenv("OPENROUTER_API_KEY") or replay_api_key()
         else:
             self.api_key = os.getenv("GOOGLE_API_KEY")
 
@@ -283,15 +476,7 @@ class LegalOperator:
     def _setup_client(self) -> None:
         """Setup the LLM client."""
         if self.use_openrouter:
-            import httpx
-            self.client = httpx.Client(
-                base_url="https://openrouter.ai/api/v1",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                timeout=120.0
-            )
+            self.client = shared_client(self.api_key)
         else:
             import google.generativeai as genai
             genai.configure(api_key=self.api_key)
@@ -304,7 +489,10 @@ class LegalOperator:
         background_context: str = "",
         ontology_context: Optional[OntologyContext] = None,
         chunk_id: Optional[str] = None,
-        document_id: str = ""
+        document_id: str = "",
+        on_element: Optional[Callable[[str, Any], None]] = None,
+        model: Optional[str] = None,
+        domain: Optional[str] = None
     ) -> ChunkExtraction:
         """
         Extract structured information from legal text.
@@ -316,6 +504,18 @@ class LegalOperator:
             ontology_context: Current ontology for feedback loop
             chunk_id: ID for this chunk
             document_id: ID of source document
+            on_element: Streaming mode only - called as on_element(key, obj)
+                for every actor, verb phrase, question and link as soon as
+                it has been generated. With a cascade, elements are reported
+                once the accepted extraction is known. If adaptive chunking
+                splits the chunk, the merged extraction's elements are
+                reported once all parts are done (after any streamed by a
+                truncated first attempt).
+            model: Model for this call only (e.g. a cheaper model picked by
+                triage); bypasses the cascade. Defaults to the cascade if
+                one is configured, else self.model. OpenRouter only.
+            domain: Domain whose learned chunk size applies (default: the
+                telemetry context's domain)
 
         Returns:
             ChunkExtraction with actors, verbs, questions, links
@@ -323,23 +523,161 @@ class LegalOperator:
         if chunk_id is None:
             chunk_id = f"chunk_{uuid4().hex[:8]}"
 
+        if self.chunk_sizes is None:
+            return self._extract_text(
+                text, situation, background_context, ontology_context,
+                chunk_id, document_id, on_element, model
+            )
+
+        domain = domain or current_context().get("domain") or "default"
+        extraction = self._extract_adaptive(
+            text, situation, background_context, ontology_context,
+            chunk_id, document_id, model, domain, depth=0, on_element=on_element
+        )
+        # Only an unsplit first attempt streams to on_element; parts are reported merged
+        if on_element and extraction.metadata.get("split_parts"):
+            for key in ("actors", "verb_phrases", "questions", "spatio_temporal_links"):
+                for element in getattr(extraction, key):
+                    on_element(key, element)
+        return extraction
+
+    def _extract_adaptive(
+        self,
+        text: str,
+        situation: str,
+        background_context: str,
+        ontology_context: Optional[OntologyContext],
+        chunk_id: str,
+        document_id: str,
+        model: Optional[str],
+        domain: str,
+        depth: int,
+        on_element: Optional[Callable[[str, Any], None]] = None
+    ) -> ChunkExtraction:
+        """
+        Extract a chunk, splitting it while the output comes back truncated.
+
+        Chunks above the domain's learned size are split before any call.
+        A truncated chunk teaches the store a smaller size and is halved
+        (up to MAX_SPLIT_DEPTH times); the halves run concurrently.
+        on_element is only passed to an unsplit call (parts are merged first).
+        """
+        limit = self.chunk_sizes.size_for(domain)
+        if depth == 0 and len(text) > limit:
+            parts = chunk_legal_text(text, max_chunk_size=limit, overlap=CHUNK_OVERLAP)
+            if len(parts) > 1:
+                return self._extract_parts(
+                    parts, situation, background_context, ontology_context,
+                    chunk_id, document_id, model, domain, depth
+                )
+
+        extraction = self._extract_text(
+            text, situation, background_context, ontology_context,
+            chunk_id, document_id, on_element, model
+        )
+        if not extraction_truncated(extraction):
+            self.chunk_sizes.record_success(domain)
+            return extraction
+        if depth >= MAX_SPLIT_DEPTH or len(text) < 2 * self.chunk_sizes.min_chars:
+            return extraction
+
+        new_limit = self.chunk_sizes.record_truncation(domain, len(text))
+        print(f"[Operator] Output truncated for {len(text)} chars - splitting "
+              f"(domain '{domain}' chunk size now {new_limit})")
+        halves = chunk_legal_text(
+            text, max_chunk_size=len(text) // 2 + CHUNK_OVERLAP, overlap=CHUNK_OVERLAP
+        )
+        return self._extract_parts(
+            halves, situation, background_context, ontology_context,
+            chunk_id, document_id, model, domain, depth + 1
+        )
+
+    def _extract_parts(
+        self,
+        parts: List[Tuple[str, int, int]],
+        situation: str,
+        background_context: str,
+        ontology_context: Optional[OntologyContext],
+        chunk_id: str,
+        document_id: str,
+        model: Optional[str],
+        domain: str,
+        depth: int
+    ) -> ChunkExtraction:
+        """Extract chunk parts concurrently and merge them."""
+        with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+            futures = [
+                # Each part runs in a copy of this context (telemetry attribution)
+                pool.submit(
+                    contextvars.copy_context().run, self._extract_adaptive,
+                    part_text, situation, background_context, ontology_context,
+                    f"{chunk_id}_p{i}", document_id, model, domain, depth
+                )
+                for i, (part_text, _, _) in enumerate(parts, 1)
+            ]
+            extractions = [future.result() for future in futures]
+        return merge_extractions(extractions, chunk_id, document_id, situation)
+
+    def _extract_text(
+        self,
+        text: str,
+        situation: str,
+        background_context: str,
+        ontology_context: Optional[OntologyContext],
+        chunk_id: str,
+        document_id: str,
+        on_element: Optional[Callable[[str, Any], None]],
+        model: Optional[str]
+    ) -> ChunkExtraction:
+        """Build the prompt for one chunk and run the cascade or a single model."""
         # Build the prompt
         ontology_str = ""
         if ontology_context:
             ontology_str = f"\n<known_vocabulary>\n{ontology_context.to_prompt_context()}\n</known_vocabulary>\n"
 
-        user_prompt = LEGAL_OPERATOR_USER_PROMPT.format(
+        template = LEGAL_OPERATOR_USER_PROMPT
+        if self.output_format == "toon":
+            template = LEGAL_OPERATOR_TOON_USER_PROMPT
+        user_prompt = template.format(
             situation=situation or "Legal proceedings",
             background_context=background_context or "Australian legal document",
             ontology_context=ontology_str,
             input_text=text[:30000]  # Limit text length
         )
 
-        # Call LLM
+        if self.cascade and model is None:
+            return self._extract_cascade(
+                user_prompt, chunk_id, document_id, situation, on_element
+            )
+        return self._extract_once(
+            user_prompt, chunk_id, document_id, situation, on_element, model or self.model
+        )
+
+    def _extract_once(
+        self,
+        user_prompt: str,
+        chunk_id: str,
+        document_id: str,
+        situation: str,
+        on_element: Optional[Callable[[str, Any], None]],
+        model: str
+    ) -> ChunkExtraction:
+        """Run one extraction call with a single model."""
         try:
-            raw_response = self._call_llm(user_prompt)
-            extraction = self._parse_response(raw_response, chunk_id, document_id)
+            toon = self.output_format == "toon"
+            if self.stream and not toon:
+                return self._extract_streaming(
+                    user_prompt, chunk_id, document_id, on_element, model
+                )
+
+            raw_response, finish_reason = self._complete(user_prompt, model=model)
+            if toon:
+                extraction = self._parse_toon_response(raw_response, chunk_id, document_id)
+            else:
+                extraction = self._parse_response(raw_response, chunk_id, document_id)
             extraction.raw_llm_response = raw_response
+            extraction.model_used = model
+            extraction.metadata["finish_reason"] = finish_reason
             return extraction
 
         except Exception as e:
@@ -348,31 +686,259 @@ class LegalOperator:
             return ChunkExtraction(
                 chunk_id=chunk_id,
                 source_document_id=document_id,
-                situation=situation
+                situation=situation,
+                model_used=model,
+                metadata={"error": str(e)[:200]}
+            )
+
+    def _extract_cascade(
+        self,
+        user_prompt: str,
+        chunk_id: str,
+        document_id: str,
+        situation: str,
+        on_element: Optional[Callable[[str, Any], None]]
+    ) -> ChunkExtraction:
+        """
+        Try each cascade model in turn until an extraction validates.
+
+        Streamed elements are only reported (via on_element) for the
+        accepted extraction, once it has been validated.
+        """
+        attempts = []
+        models = self.cascade.models
+        for step, model in enumerate(models):
+            with telemetry_context(cascade_step=step):
+                extraction = self._extract_once(
+                    user_prompt, chunk_id, document_id, situation, None, model
+                )
+            issues = self.cascade.validate(extraction)
+            attempts.append({"model": model, "issues": issues})
+            if not issues:
+                break
+
+        self.cascade.record(attempts)
+        extraction.metadata["cascade"] = attempts
+
+        if on_element:
+            for key in ("actors", "verb_phrases", "questions", "spatio_temporal_links"):
+                for element in getattr(extraction, key):
+                    on_element(key, element)
+        return extraction
+
+    def extract_packed(
+        self,
+        documents: List[Dict[str, Any]],
+        ontology_context: Optional[OntologyContext] = None,
+        model: Optional[str] = None
+    ) -> List[ChunkExtraction]:
+        """
+        Extract several short documents with a single operator call.
+
+        The shared task instructions are sent once and each document is
+        wrapped in a tagged <document> block. The response is split back
+        into one ChunkExtraction per document. Any document that cannot be
+        demultiplexed (missing entry, unparseable response, no actors) is
+        re-extracted with a normal single-document call.
+
+        Args:
+            documents: Dicts with "text" and optional "situation",
+                "background_context", "document_id" and "chunk_id"
+            ontology_context: Current ontology for feedback loop
+            model: Model for this pack (defaults to self.model)
+
+        Returns:
+            One ChunkExtraction per input document, in input order
+        """
+        if len(documents) <= 1:
+            return [
+                self.extract(
+                    text=doc.get("text", ""),
+                    situation=doc.get("situation", ""),
+                    background_context=doc.get("background_context", ""),
+                    ontology_context=ontology_context,
+                    chunk_id=doc.get("chunk_id"),
+                    document_id=doc.get("document_id", ""),
+                    model=model
+                )
+                for doc in documents
+            ]
+
+        tags = [f"D{i + 1}" for i in range(len(documents))]
+        blocks = [
+            PACKED_DOCUMENT_TEMPLATE.format(
+                tag=tag,
+                situation=doc.get("situation") or "Legal proceedings",
+                background_context=doc.get("background_context") or "Australian legal document",
+                input_text=doc.get("text", "")
             )
+            for tag, doc in zip(tags, documents)
+        ]
+
+        ontology_str = ""
+        if ontology_context:
+            ontology_str = f"<known_vocabulary>\n{ontology_context.to_prompt_context()}\n</known_vocabulary>"
+
+        user_prompt = LEGAL_OPERATOR_PACKED_PROMPT.format(
+            document_count=len(documents),
+            ontology_context=ontology_str,
+            documents="\n\n".join(blocks)
+        )
 
-    def _call_llm(self, user_prompt: str) -> str:
+        entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            raw_response = self._call_llm(user_prompt, model=model)
+            data, _, _ = self._load_response_json(raw_response)
+            for entry in data.get("documents", []) or []:
+                if isinstance(entry, dict) and isinstance(entry.get("document_id"), str):
+                    entries[entry["document_id"].strip()] = entry
+        except Exception as e:
+            print(f"[Operator Warning] Packed extraction failed, falling back: {e}")
+
+        results = []
+        for tag, doc in zip(tags, documents):
+            chunk_id = doc.get("chunk_id") or f"chunk_{uuid4().hex[:8]}"
+            document_id = doc.get("document_id", "")
+            entry = entries.get(tag)
+
+            if entry and entry.get("actors"):
+                extraction = self._build_extraction(entry, chunk_id, document_id)
+                extraction.model_used = model or self.model
+                extraction.metadata["packed"] = {"tag": tag, "size": len(documents)}
+            else:
+                # Demux failed for this document - extract it on its own
+                extraction = self.extract(
+                    text=doc.get("text", ""),
+                    situation=doc.get("situation", ""),
+                    background_context=doc.get("background_context", ""),
+                    ontology_context=ontology_context,
+                    chunk_id=chunk_id,
+                    document_id=document_id,
+                    model=model
+                )
+                extraction.metadata["packed_fallback"] = True
+            results.append(extraction)
+
+        return results
+
+    def _request_payload(self, user_prompt: str, model: Optional[str] = None) -> Dict[str, Any]:
+        """Build the chat completion request body."""
+        return {
+            "model": model or self.model,
+            "messages": [
+                {"role": "system", "content": LEGAL_OPERATOR_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.1,
+            "max_tokens": 8000
+        }
+
+    def _call_llm(
+        self,
+        user_prompt: str,
+        stage: str = "operator",
+        model: Optional[str] = None
+    ) -> str:
         """Call the LLM and get response."""
+        return self._complete(user_prompt, stage, model)[0]
+
+    def _complete(
+        self,
+        user_prompt: str,
+        stage: str = "operator",
+        model: Optional[str] = None
+    ) -> Tuple[str, Optional[str]]:
+        """Call the LLM and return (content, finish_reason)."""
         if self.use_openrouter:
-            response = self.client.post(
-                "/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": LEGAL_OPERATOR_SYSTEM_PROMPT},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "temperature": 0.1,
-                    "max_tokens": 8000
-                }
+            data = chat_completion(
+                self.client, self._request_payload(user_prompt, model), stage=stage
             )
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            choice = data["choices"][0]
+            return choice["message"]["content"], choice.get("finish_reason")
         else:
             response = self.client.generate_content(
                 f"{LEGAL_OPERATOR_SYSTEM_PROMPT}\n\n{user_prompt}"
             )
-            return response.text
+            return response.text, None
+
+    def _stream_llm(
+        self,
+        user_prompt: str,
+        model: Optional[str] = None
+    ) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Stream the LLM completion.
+
+        Yields:
+            (content_delta, finish_reason) - finish_reason is None until
+            the final event
+        """
+        if self.use_openrouter:
+            payload = self._request_payload(user_prompt, model)
+            for event in stream_chat_completion(self.client, payload, stage="operator"):
+                choices = event.get("choices") or []
+                if not choices:
+                    continue
+                delta = choices[0].get("delta") or {}
+                yield delta.get("content") or "", choices[0].get("finish_reason")
+        else:
+            response = self.client.generate_content(
+                f"{LEGAL_OPERATOR_SYSTEM_PROMPT}\n\n{user_prompt}",
+                stream=True
+            )
+            for chunk in response:
+                yield chunk.text, None
+
+    def _extract_streaming(
+        self,
+        user_prompt: str,
+        chunk_id: str,
+        document_id: str,
+        on_element: Optional[Callable[[str, Any], None]] = None,
+        model: Optional[str] = None
+    ) -> ChunkExtraction:
+        """
+        Build the extraction element by element from a streamed completion.
+
+        Every array element is parsed the moment its closing bracket
+        arrives. If the stream ends early (max_tokens, dropped connection)
+        all elements completed up to that point are kept.
+        """
+        extraction = ChunkExtraction(
+            chunk_id=chunk_id,
+            source_document_id=document_id,
+            model_used=model or self.model
+        )
+        parser = IncrementalJSONParser()
+        raw_parts: List[str] = []
+        finish_reason = None
+
+        try:
+            for delta, reason in self._stream_llm(user_prompt, model):
+                if reason:
+                    finish_reason = reason
+                if not delta:
+                    continue
+                raw_parts.append(delta)
+                for key, data in parser.feed(delta):
+                    element = self._add_element(extraction, key, data, chunk_id)
+                    if element is not None and on_element:
+                        on_element(key, element)
+        except Exception as e:
+            if not raw_parts:
+                raise
+            print(f"[Operator Warning] Stream interrupted, keeping partial output: {e}")
+
+        data = parser.finish()
+        situation = data.get("situation_summary", "")
+        extraction.situation = situation if isinstance(situation, str) else ""
+        extraction.raw_llm_response = "".join(raw_parts)
+        extraction.metadata.update({
+            "streamed": True,
+            "finish_reason": finish_reason,
+            "truncated": parser.truncated or finish_reason == "length",
+        })
+        return extraction
 
     def _repair_json(self, text: str) -> str:
         """Attempt to repair common JSON issues from LLM output."""
@@ -401,12 +967,57 @@ class LegalOperator:
         document_id: str
     ) -> ChunkExtraction:
         """Parse LLM response into ChunkExtraction."""
+        data, repaired, truncated = self._load_response_json(raw_response)
+        extraction = self._build_extraction(data, chunk_id, document_id)
+        extraction.metadata.update({
+            "parse_repaired": repaired,
+            "truncated": truncated,
+        })
+        return extraction
+
+    def _parse_toon_response(
+        self,
+        raw_response: str,
+        chunk_id: str,
+        document_id: str
+    ) -> ChunkExtraction:
+        """
+        Parse TOON tables into a ChunkExtraction.
+
+        Falls back to the JSON parser if the response has no Actors table
+        (e.g. the model answered in JSON anyway).
+        """
+        try:
+            data, report = ToonDecoder.decode_extraction(raw_response)
+        except ToonDecodeError:
+            extraction = self._parse_response(raw_response, chunk_id, document_id)
+            extraction.metadata["output_format"] = "json_fallback"
+            return extraction
+
+        extraction = self._build_extraction(data, chunk_id, document_id)
+        extraction.metadata.update({
+            "output_format": "toon",
+            "parse_repaired": bool(report["count_mismatch"] or report["ambiguous_rows"]),
+            "truncated": report["truncated"],
+        })
+        return extraction
+
+    def _load_response_json(self, raw_response: str) -> Tuple[Dict[str, Any], bool, bool]:
+        """
+        Decode the JSON object in an LLM response.
+
+        Returns:
+            (data, repaired, truncated) - repaired is True if the JSON had
+            to be repaired or salvaged, truncated if it was cut off
+        """
         # Clean markdown code blocks
         cleaned = raw_response.strip()
         if cleaned.startswith("```"):
             cleaned = re.sub(r'^```(?:json)?\n?', '', cleaned)
             cleaned = re.sub(r'\n?```$', '', cleaned)
 
+        repaired = False
+        truncated = False
         try:
             data = json.loads(cleaned)
         except json.JSONDecodeError:
@@ -417,45 +1028,81 @@ class LegalOperator:
                 try:
                     data = json.loads(json_str)
                 except json.JSONDecodeError:
-                    # Try to repair the JSON
-                    repaired = self._repair_json(json_str)
+                    # Try to repair the JSON; unclosed brackets mean it was cut off
+                    repaired = True
+                    truncated = (json_str.count('{') > json_str.count('}')
+                                 or json_str.count('[') > json_str.count(']'))
+                    repaired_str = self._repair_json(json_str)
                     try:
-                        data = json.loads(repaired)
+                        data = json.loads(repaired_str)
                     except json.JSONDecodeError:
-                        # Last resort: return minimal valid structure
-                        data = {"actors": [], "verb_phrases": [], "questions": []}
+                        # Last resort: keep every complete element
+                        data, truncated = parse_partial_json(cleaned)
+            elif "{" in cleaned:
+                # Truncated before any object closed
+                repaired = True
+                data, truncated = parse_partial_json(cleaned)
             else:
                 raise ValueError("Could not parse JSON from response")
 
-        # Build ChunkExtraction
+        if not isinstance(data, dict):
+            raise ValueError("Response JSON is not an object")
+
+        return data, repaired, truncated
+
+    def _build_extraction(
+        self,
+        data: Dict[str, Any],
+        chunk_id: str,
+        document_id: str
+    ) -> ChunkExtraction:
+        """Build a ChunkExtraction from decoded response data."""
+        situation = data.get("situation_summary", "")
         extraction = ChunkExtraction(
             chunk_id=chunk_id,
             source_document_id=document_id,
-            situation=data.get("situation_summary", ""),
+            situation=situation if isinstance(situation, str) else "",
             model_used=self.model
         )
 
-        # Parse actors
-        for actor_data in data.get("actors", []):
-            actor = self._parse_actor(actor_data, chunk_id)
-            extraction.actors.append(actor)
+        for key in ("actors", "verb_phrases", "questions", "spatio_temporal_links"):
+            for element_data in data.get(key, []) or []:
+                self._add_element(extraction, key, element_data, chunk_id)
 
-        # Parse verb phrases
-        for verb_data in data.get("verb_phrases", []):
-            verb = self._parse_verb_phrase(verb_data, chunk_id)
-            extraction.verb_phrases.append(verb)
+        return extraction
 
-        # Parse questions
-        for q_data in data.get("questions", []):
-            question = self._parse_question(q_data, chunk_id)
-            extraction.questions.append(question)
+    def _add_element(
+        self,
+        extraction: ChunkExtraction,
+        key: str,
+        data: Any,
+        chunk_id: str
+    ) -> Optional[Any]:
+        """
+        Parse one element of a response array and append it to the extraction.
 
-        # Parse spatio-temporal links
-        for link_data in data.get("spatio_temporal_links", []):
-            link = self._parse_link(link_data, chunk_id)
-            extraction.spatio_temporal_links.append(link)
+        Returns the parsed object, or None if the key is not an element list
+        or the data is not an object.
+        """
+        if not isinstance(data, dict):
+            return None
+
+        if key == "actors":
+            element = self._parse_actor(data, chunk_id)
+            extraction.actors.append(element)
+        elif key == "verb_phrases":
+            element = self._parse_verb_phrase(data, chunk_id)
+            extraction.verb_phrases.append(element)
+        elif key == "questions":
+            element = self._parse_question(data, chunk_id)
+            extraction.questions.append(element)
+        elif key == "spatio_temporal_links":
+            element = self._parse_link(data, chunk_id)
+            extraction.spatio_temporal_links.append(element)
+        else:
+            return None
 
-        return extraction
+        return element
 
     def _parse_actor(self, data: Dict[str, Any], chunk_id: str) -> Actor:
         """Parse actor from response data."""
@@ -557,48 +1204,111 @@ class LegalOperator:
         """
         Reflexion step: Review and improve extraction.
 
-        This implements the self-correction loop from Phase 4.
+        This implements the self-correction loop from Phase 4. The
+        reflexion policy decides whether the review call is made at all;
+        corrections returned by the model are merged into the extraction.
         """
-        # Build review prompt
-        review_prompt = f"""
-Review this extraction for accuracy and completeness.
-
-ORIGINAL TEXT:
-{original_text[:10000]}
-
-EXTRACTED DATA:
-- Actors: {len(extraction.actors)}
-- Verb Phrases: {len(extraction.verb_phrases)}
-- Questions: {len(extraction.questions)}
-- Spatio-Temporal Links: {len(extraction.spatio_temporal_links)}
-
-Actor names: {[a.name for a in extraction.actors]}
-Questions: {[q.question_text for q in extraction.questions]}
-
-REVIEW CHECKLIST:
-1. Are all parties (applicant, respondent) identified?
-2. Are all dates captured as temporal entities?
-3. Are key assets identified?
-4. Are relationship states tracked?
-5. Are the questions appropriate for this text?
+        reasons = extraction_triggers(extraction)
+        if not self.reflexion.should_review(reasons):
+            return extraction
 
-If the extraction looks good, respond with: {{"status": "approved"}}
-If improvements needed, respond with corrections in the same JSON format as original extraction.
-"""
+        actors_json = json.dumps([
+            {"id": a.id, "name": a.name, "type": a.actor_type.value, "roles": a.roles}
+            for a in extraction.actors
+        ])
+        questions_json = json.dumps([q.question_text for q in extraction.questions])
+
+        review_prompt = LEGAL_OPERATOR_REVIEW_PROMPT.format(
+            original_text=original_text[:10000],
+            actors_json=actors_json,
+            questions_json=questions_json,
+            problems=", ".join(reasons) if reasons else "None detected"
+        )
 
         try:
-            response = self._call_llm(review_prompt)
-            if '"status": "approved"' in response or '"status":"approved"' in response:
+            response = self._call_llm(review_prompt, stage="review")
+            data, _, _ = self._load_response_json(response)
+            if data.get("status") == "approved":
+                self.reflexion.record_outcome(reasons, changed=False)
                 return extraction
 
-            # Parse corrections and merge
-            # For now, just return original if approved
+            corrections = self._build_extraction(
+                data, extraction.chunk_id, extraction.source_document_id
+            )
+            changes = self._merge_corrections(extraction, corrections)
+            self.reflexion.record_outcome(reasons, changed=changes > 0)
+            extraction.metadata["reflexion"] = {"triggers": reasons, "changes": changes}
             return extraction
 
         except Exception as e:
             print(f"[Review Warning] {e}")
             return extraction
 
+    def _merge_corrections(
+        self,
+        extraction: ChunkExtraction,
+        corrections: ChunkExtraction
+    ) -> int:
+        """
+        Merge review corrections into an extraction.
+
+        Actors are matched by id, then by name; matched actors gain the new
+        roles, aliases and states, and references to a correction actor
+        matched under another id are rewritten to the existing id. Other
+        elements are added when their id (or, for questions, their text)
+        is new.
+
+        Returns:
+            Number of changes applied
+        """
+        changes = 0
+        by_id = {a.id: a for a in extraction.actors}
+        by_name = {a.name.lower().strip(): a for a in extraction.actors}
+        id_map: Dict[str, str] = {}
+
+        for actor in corrections.actors:
+            existing = by_id.get(actor.id) or by_name.get(actor.name.lower().strip())
+            if existing is None:
+                extraction.actors.append(actor)
+                by_id[actor.id] = actor
+                by_name[actor.name.lower().strip()] = actor
+                changes += 1
+                continue
+            if existing.id != actor.id:
+                id_map[actor.id] = existing.id
+
+            for role in actor.roles:
+                changes += existing.add_role(role)
+            for alias in actor.aliases:
+                changes += existing.add_alias(alias)
+            for state in actor.states:
+                state.entity_id = existing.id
+                changes += existing.merge_state(state)
+
+        # Correction elements below may refer to actors by their correction id
+        LegalReconciler._update_references(corrections, id_map)
+
+        known_verbs = {v.id for v in extraction.verb_phrases}
+        for verb in corrections.verb_phrases:
+            if verb.id not in known_verbs:
+                extraction.verb_phrases.append(verb)
+                changes += 1
+
+        known_questions = {q.id for q in extraction.questions}
+        known_texts = {q.question_text.lower().strip() for q in extraction.questions}
+        for question in corrections.questions:
+            if question.id not in known_questions and question.question_text.lower().strip() not in known_texts:
+                extraction.questions.append(question)
+                changes += 1
+
+        known_links = {link.id for link in extraction.spatio_temporal_links}
+        for link in corrections.spatio_temporal_links:
+            if link.id not in known_links:
+                extraction.spatio_temporal_links.append(link)
+                changes += 1
+
+        return changes
+
 
 # ============================================================================
 # HELPER FUNCTIONS
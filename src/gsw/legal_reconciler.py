@@ -27,6 +27,13 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 from src.logic.gsw_schema import (
     Actor, State, PredictiveQuestion, ChunkExtraction, GlobalWorkspace
 )
+from src.gsw.candidates import CANDIDATES_PER_ACTOR, MAX_CANDIDATES, CandidateRetriever
+from src.gsw.decision_cache import DecisionCache
+from src.gsw.llm_client import chat_completion, circuit_open, shared_client
+from src.gsw.partitions import WorkspacePartitions, is_cross_case, reconcile_scope
+from src.gsw.question_index import ChunkFacts, QuestionIndex, answer_question
+from src.gsw.llm_transport import replay_api_key
+from src.gsw.vector_index import VectorIndex, actor_text, cosine, encode_batched, encoder_from_env
 from src.utils.toon import ToonEncoder
 
 
@@ -43,17 +50,14 @@ Your task is to:
 This is crucial for building a coherent knowledge graph across multiple chunks of a legal document.
 """
 
+# Static instructions first, per-call input last, so the prompt prefix is
+# identical across calls and can be served from the provider's cache.
+# Workspace entities change least often, so they lead the variable part.
 RECONCILE_USER_PROMPT = """
 ## Task 1: Entity Reconciliation
 
 Match entities from the new chunk to existing entities in the workspace.
 
-### Existing Entities in Workspace:
-{existing_entities}
-
-### New Entities from Current Chunk:
-{new_entities}
-
 ### Guidelines for Matching:
 - Match by NAME: "John Smith" = "Mr Smith" = "the husband" = "the applicant"
 - Match by ROLE: If roles align (both "Applicant"), likely same person
@@ -64,12 +68,6 @@ Match entities from the new chunk to existing entities in the workspace.
 
 Check if this chunk answers any unanswered questions.
 
-### Unanswered Questions:
-{unanswered_questions}
-
-### Current Chunk Text:
-{chunk_text}
-
 ## Output Format
 
 ```json
@@ -99,9 +97,34 @@ Check if this chunk answers any unanswered questions.
 - entity_matches: Links between new and existing entities
 - answered_questions: Questions that can now be answered from this chunk
 - new_entities: Entity IDs that are genuinely NEW (not matches to existing)
+
+---
+
+### Existing Entities in Workspace:
+{existing_entities}
+
+### Unanswered Questions:
+{unanswered_questions}
+
+### New Entities from Current Chunk:
+{new_entities}
+
+### Current Chunk Text:
+{chunk_text}
 """
 
 
+# Legal terms that refer to a party by role ("the husband" matches an
+# existing actor whose roles include "Applicant Husband")
+ROLE_MAPPINGS = {
+    "the husband": ["husband", "applicant husband", "respondent husband"],
+    "the wife": ["wife", "applicant wife", "respondent wife"],
+    "the applicant": ["applicant"],
+    "the respondent": ["respondent"],
+    "the child": ["child", "subject child"],
+}
+
+
 # ============================================================================
 # RECONCILER CLASS
 # ============================================================================
@@ -123,7 +146,10 @@ class LegalReconciler:
         api_key: Optional[str] = None,
         use_openrouter: bool = True,
         similarity_threshold: float = 0.85,
-        use_toon: bool = True  # Enable TOON format for ~71% token reduction
+        use_toon: bool = True,  # Enable TOON format for ~71% token reduction
+        scope: Optional[str] = None,  # "document" (default) or "domain"
+        vector_store: Optional["VectorReconciler"] = None,
+        decision_cache: Optional[DecisionCache] = None
     ):
         self.model = model
         self.use_openrouter = use_openrouter
@@ -133,27 +159,44 @@ class LegalReconciler:
         if api_key:
             self.api_key = api_key
         elif use_openrouter:
-            self.api_key = os.getenv("OPENROUTER_API_KEY")
+            self.api_key = os.getenv("OPENROUTER_API_KEY") or replay_api_key()
         else:
             self.api_key = os.getenv("GOOGLE_API_KEY")
 
         self._setup_client()
 
         # Optional: Vector store for entity embeddings
-        self.vector_store = None
+        self.vector_store = vector_store
+
+        # Ranks workspace actors so LLM prompts carry likely matches only
+        self.candidates = CandidateRetriever(role_mappings=ROLE_MAPPINGS)
+
+        # Match actors within their document (plus a cross-case registry) by default
+        self.scope = reconcile_scope(scope)
+        self.partitions = WorkspacePartitions(role_mappings=ROLE_MAPPINGS)
+        if self.scope == "document":
+            self.candidates.stats = self.partitions.candidate_stats
+
+        # Pending questions by type and topic, so a chunk checks only those it can answer
+        self.question_index = QuestionIndex()
+
+        # LLM verdicts on recurring pairs, consulted before asking again
+        self.decision_cache = decision_cache if decision_cache is not None else DecisionCache.from_env()
+
+        # Actors resolved by each tier before (or instead of) an LLM call
+        self.tier_stats = {
+            "chunks": 0,           # chunks with actors to match
+            "actors": 0,
+            "deterministic": 0,    # resolved by a unique name/alias match
+            "cached": 0,           # resolved by the decision cache
+            "llm_actors": 0,       # sent to the LLM
+            "calls_skipped": 0,    # chunks that needed no LLM call
+        }
 
     def _setup_client(self) -> None:
         """Setup LLM client."""
         if self.use_openrouter and self.api_key:
-            import httpx
-            self.client = httpx.Client(
-                base_url="https://openrouter.ai/api/v1",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                timeout=60.0
-            )
+            self.client = shared_client(self.api_key)
         else:
             self.client = None
 
@@ -189,15 +232,20 @@ class LegalReconciler:
             Tuple of (updated_extraction, reconciliation_log)
         """
         reconciliation_log = []
+        if self.vector_store is not None:
+            self.vector_store.sync(workspace)
 
         # Step 1: Entity Reconciliation
-        entity_matches = self._reconcile_entities(
+        document_id = new_extraction.source_document_id
+        entity_matches = self._match_entities(
             new_extraction.actors,
             workspace,
-            chunk_text
+            chunk_text,
+            document_id
         )
 
-        # Apply entity matches
+        # Apply entity matches; references are rewritten in one pass after
+        id_map: Dict[str, str] = {}
         for match in entity_matches:
             new_id = match["new_entity_id"]
             existing_id = match["existing_entity_id"]
@@ -213,9 +261,15 @@ class LegalReconciler:
 
                 # Merge information
                 self._merge_actors(existing_actor, new_actor)
+                workspace.reindex_actor(existing_actor)
+                if self.scope == "document":
+                    self.partitions.reindex(existing_actor)
+                else:
+                    self.candidates.index_actor(existing_actor)
+                if self.vector_store is not None:
+                    self.vector_store.add_actor(existing_actor)
 
-                # Update references in extraction
-                self._update_references(new_extraction, new_id, existing_id)
+                id_map[new_id] = existing_id
 
                 reconciliation_log.append({
                     "action": "merged",
@@ -224,12 +278,11 @@ class LegalReconciler:
                     "reason": match.get("reason", "")
                 })
 
+        # Update references in extraction
+        self._update_references(new_extraction, id_map)
+
         # Step 2: Answer Pending Questions
-        answered = self._answer_questions(
-            workspace.get_unanswered_questions(),
-            chunk_text,
-            new_extraction
-        )
+        answered = self.question_index.answer(workspace, chunk_text, new_extraction)
 
         for answer in answered:
             q_id = answer["question_id"]
@@ -238,6 +291,7 @@ class LegalReconciler:
                 workspace.questions[q_id].answer_text = answer["answer_text"]
                 workspace.questions[q_id].answer_entity_id = answer.get("answer_entity_id")
                 workspace.questions[q_id].answered_in_chunk_id = new_extraction.chunk_id
+                self.question_index.remove(q_id)
 
                 reconciliation_log.append({
                     "action": "answered_question",
@@ -246,23 +300,31 @@ class LegalReconciler:
                 })
 
         # Step 3: Add new entities to workspace
+        matched_ids = {m["new_entity_id"] for m in entity_matches}
+        added = []
         for actor in new_extraction.actors:
             # Check if this actor was matched to an existing one
-            was_matched = any(
-                m["new_entity_id"] == actor.id for m in entity_matches
-            )
-
-            if not was_matched:
+            if actor.id not in matched_ids:
+                if document_id:
+                    actor.metadata.setdefault("source_document_id", document_id)
                 workspace.add_actor(actor)
+                added.append(actor)
+                if self.scope == "document":
+                    self.partitions.add(actor, document_id)
                 reconciliation_log.append({
                     "action": "added_new",
                     "entity_id": actor.id,
                     "name": actor.name
                 })
 
-        # Step 4: Add new questions
+        if self.vector_store is not None:
+            self.vector_store.add_actors(added)
+
+        # Step 4: Add new questions (ids are per document, so one may replace
+        # an answered question; the index only notices new ids on its own)
         for question in new_extraction.questions:
             workspace.questions[question.id] = question
+            self.question_index.add(question)
 
         # Step 5: Add verb phrases and links
         for verb in new_extraction.verb_phrases:
@@ -277,38 +339,207 @@ class LegalReconciler:
 
         return new_extraction, reconciliation_log
 
+    def _match_entities(
+        self,
+        new_actors: List[Actor],
+        workspace: GlobalWorkspace,
+        chunk_text: str,
+        document_id: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Match new actors within the reconciliation scope.
+
+        With the "document" scope, actors are matched against their document's
+        partition. Left-over actors are then matched by rule against actors of
+        unknown document (workspaces built before partitioning) and, for
+        cross-case actors (judges, courts, legislation), the domain registry.
+        """
+        if self.scope == "domain":
+            return self._reconcile_entities(new_actors, workspace, chunk_text, document_id)
+
+        self.partitions.sync(workspace)
+        partition = self.partitions.partition(document_id)
+        matches = [
+            m for m in self._reconcile_entities(
+                new_actors, partition.workspace, chunk_text, document_id, partition.candidates,
+                question_workspace=workspace
+            )
+            if m.get("existing_entity_id") in partition.workspace.actors
+        ]
+
+        unscoped = self.partitions.partitions.get("")
+        if document_id and unscoped is not None:
+            matched = {m["new_entity_id"] for m in matches}
+            rest = [a for a in new_actors if a.id not in matched]
+            matches += self._rule_based_reconciliation(rest, unscoped.workspace)
+
+        matched = {m["new_entity_id"] for m in matches}
+        cross_case = [a for a in new_actors if a.id not in matched and is_cross_case(a)]
+        if cross_case and self.partitions.registry.workspace.actors:
+            matches += self._rule_based_reconciliation(cross_case, self.partitions.registry.workspace)
+        return matches
+
     def _reconcile_entities(
         self,
         new_actors: List[Actor],
         workspace: GlobalWorkspace,
-        chunk_text: str
+        chunk_text: str,
+        document_id: str = "",
+        candidates: Optional[CandidateRetriever] = None,
+        question_workspace: Optional[GlobalWorkspace] = None
     ) -> List[Dict[str, Any]]:
         """
         Find matches between new actors and existing workspace actors.
+
+        question_workspace holds the pending questions for the LLM prompt
+        (the domain workspace when workspace is a partition; default: workspace).
         """
         if not workspace.actors or not new_actors:
             return []
 
-        # Try LLM-based reconciliation first
-        if self.client:
+        # Try LLM-based reconciliation first (skipped while the provider's circuit is open)
+        resolved: List[Dict[str, Any]] = []
+        if self.client and not circuit_open(self.client):
+            # Tiers: conclusive deterministic matches, then cached verdicts;
+            # only the residue is sent to the LLM
+            stats = self.tier_stats
+            stats["chunks"] += 1
+            stats["actors"] += len(new_actors)
+            resolved, new_actors = self._deterministic_matches(new_actors, workspace)
+            stats["deterministic"] += len(resolved)
+            remaining = len(new_actors)
+            cached, new_actors = self._cached_decisions(new_actors, workspace, document_id, candidates)
+            resolved += cached
+            stats["cached"] += remaining - len(new_actors)
+            if not new_actors:
+                stats["calls_skipped"] += 1
+                return resolved
+            stats["llm_actors"] += len(new_actors)
             try:
-                return self._llm_reconcile_entities(new_actors, workspace, chunk_text)
+                return resolved + self._llm_reconcile_entities(
+                    new_actors, workspace, chunk_text, document_id, candidates, question_workspace
+                )
             except Exception as e:
                 print(f"[Reconciler Warning] LLM reconciliation failed: {e}")
 
-        # Fall back to rule-based reconciliation
-        return self._rule_based_reconciliation(new_actors, workspace)
+        # Fall back to rule-based reconciliation, then vector similarity
+        matches = resolved + self._rule_based_reconciliation(new_actors, workspace)
+        if self.vector_store is not None:
+            matched = {m["new_entity_id"] for m in matches}
+            rest = [a for a in new_actors if a.id not in matched]
+            matches += self.vector_store.match(rest, workspace)
+        return matches
+
+    def tier_summary(self) -> str:
+        """One-line summary of actors resolved per tier and LLM calls skipped."""
+        stats = self.tier_stats
+        actors = stats["actors"] or 1
+        chunks = stats["chunks"] or 1
+        return (f"{stats['actors']} actors: {stats['deterministic'] / actors:.0%} deterministic, "
+                f"{stats['cached'] / actors:.0%} cached, {stats['llm_actors'] / actors:.0%} sent to the LLM | "
+                f"{stats['calls_skipped']}/{stats['chunks']} LLM calls skipped "
+                f"({stats['calls_skipped'] / chunks:.0%})")
+
+    def _deterministic_matches(
+        self,
+        new_actors: List[Actor],
+        workspace: GlobalWorkspace
+    ) -> Tuple[List[Dict[str, Any]], List[Actor]]:
+        """
+        Match new actors whose name or an alias identifies exactly one
+        existing actor of the same type.
+
+        Role-based matches ("the husband") and names shared by several
+        actors are left to the later tiers.
+
+        Returns:
+            (conclusive entity matches, unresolved or ambiguous actors)
+        """
+        matches, residue = [], []
+        for new_actor in new_actors:
+            new_name = new_actor.name.lower().strip()
+            new_aliases = [a.lower().strip() for a in new_actor.aliases]
+            found = []
+            for key in [new_name] + new_aliases:
+                for existing_id in workspace.actor_ids_by_name(key):
+                    existing_actor = workspace.actors.get(existing_id)
+                    if existing_actor is None or existing_id in found:
+                        continue
+                    if self._name_match_reason(new_actor, new_name, new_aliases, existing_actor):
+                        found.append(existing_id)
+            same_type = [a for a in found if workspace.actors[a].actor_type == new_actor.actor_type]
+            if len(found) == 1 and len(same_type) == 1:
+                existing_actor = workspace.actors[same_type[0]]
+                matches.append({
+                    "new_entity_id": new_actor.id,
+                    "existing_entity_id": existing_actor.id,
+                    "confidence": 0.8,
+                    "reason": self._name_match_reason(new_actor, new_name, new_aliases, existing_actor)
+                })
+            else:
+                residue.append(new_actor)
+        return matches, residue
+
+    def _cached_decisions(
+        self,
+        new_actors: List[Actor],
+        workspace: GlobalWorkspace,
+        document_id: str = "",
+        candidates: Optional[CandidateRetriever] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Actor]]:
+        """
+        Resolve new actors from cached LLM verdicts against their candidates.
+
+        Returns:
+            (cached entity matches, actors the LLM still has to see)
+        """
+        if self.decision_cache is None:
+            return [], list(new_actors)
+
+        retriever = candidates or self.candidates
+        nearest = self.vector_store.nearest(new_actors, workspace) if self.vector_store is not None else {}
+        matches, pending = [], []
+        for actor in new_actors:
+            shortlist = [a for a, _ in retriever.rank(actor, workspace, document_id)[:retriever.per_actor]]
+            shortlist += [a for a, _ in nearest.get(actor.id, []) if a not in shortlist]
+            if not shortlist:
+                pending.append(actor)
+                continue
+            resolved, match = self.decision_cache.resolve(actor, [workspace.actors[a] for a in shortlist])
+            if not resolved:
+                pending.append(actor)
+            elif match is not None:
+                matches.append(match)
+        return matches, pending
 
     def _llm_reconcile_entities(
         self,
         new_actors: List[Actor],
         workspace: GlobalWorkspace,
-        chunk_text: str
+        chunk_text: str,
+        document_id: str = "",
+        candidates: Optional[CandidateRetriever] = None,
+        question_workspace: Optional[GlobalWorkspace] = None
     ) -> List[Dict[str, Any]]:
         """Use LLM for entity reconciliation."""
+        # Only workspace actors similar to a new actor can be matches
+        retriever = candidates or self.candidates
+        existing = retriever.candidates(new_actors, workspace, document_id)
+        if self.vector_store is not None:
+            # Nearest neighbours in embedding space the n-gram retrieval missed
+            seen = {a.id for a in existing}
+            for actor in self.vector_store.candidates(new_actors, workspace):
+                if len(existing) >= MAX_CANDIDATES:
+                    break
+                if actor.id not in seen:
+                    existing.append(actor)
+                    seen.add(actor.id)
+        if not existing:
+            return []
+
         # Build existing entities summary
         existing_summary = []
-        for actor in list(workspace.actors.values())[:50]:  # Limit for context
+        for actor in existing:
             existing_summary.append({
                 "id": actor.id,
                 "name": actor.name,
@@ -329,7 +560,8 @@ class LegalReconciler:
             })
 
         # Build unanswered questions summary
-        unanswered = workspace.get_unanswered_questions()[:20]
+        # The question index only ever tracks the domain workspace, never a partition
+        unanswered = self.question_index.unanswered(question_workspace or workspace, limit=20)
         questions_summary = [
             {"id": q.id, "question": q.question_text}
             for q in unanswered
@@ -352,9 +584,9 @@ class LegalReconciler:
             chunk_text=chunk_text[:5000]
         )
 
-        response = self.client.post(
-            "/chat/completions",
-            json={
+        data = chat_completion(
+            self.client,
+            {
                 "model": self.model,
                 "messages": [
                     {"role": "system", "content": RECONCILE_SYSTEM_PROMPT},
@@ -362,10 +594,10 @@ class LegalReconciler:
                 ],
                 "temperature": 0.1,
                 "max_tokens": 4000
-            }
+            },
+            stage="reconcile"
         )
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"]
+        content = data["choices"][0]["message"]["content"]
 
         # Parse response
         cleaned = content.strip()
@@ -389,7 +621,10 @@ class LegalReconciler:
                         return []
             else:
                 return []
-        return data.get("entity_matches", [])
+        matches = data.get("entity_matches", [])
+        if self.decision_cache is not None:
+            self.decision_cache.record(new_actors, existing, matches)
+        return matches
 
     def _rule_based_reconciliation(
         self,
@@ -410,56 +645,28 @@ class LegalReconciler:
             new_name = new_actor.name.lower().strip()
             new_aliases = [a.lower().strip() for a in new_actor.aliases]
 
-            for existing_id, existing_actor in workspace.actors.items():
-                existing_name = existing_actor.name.lower().strip()
-                existing_aliases = [a.lower().strip() for a in existing_actor.aliases]
-
-                # Check for name/alias matches
-                match_found = False
-                reason = ""
-
-                # Exact name match
-                if new_name == existing_name:
-                    match_found = True
-                    reason = f"Exact name match: {new_actor.name}"
-
-                # New name in existing aliases
-                elif new_name in existing_aliases:
-                    match_found = True
-                    reason = f"Name matches alias: {new_actor.name}"
-
-                # Existing name in new aliases
-                elif existing_name in new_aliases:
-                    match_found = True
-                    reason = f"Alias matches name: {existing_actor.name}"
-
-                # Cross-alias match
-                elif set(new_aliases) & set(existing_aliases):
-                    match_found = True
-                    common = list(set(new_aliases) & set(existing_aliases))[0]
-                    reason = f"Common alias: {common}"
-
-                # Role-based matching for common legal terms
-                if not match_found:
-                    # Match "the husband"/"the wife" patterns
-                    role_mappings = {
-                        "the husband": ["husband", "applicant husband", "respondent husband"],
-                        "the wife": ["wife", "applicant wife", "respondent wife"],
-                        "the applicant": ["applicant"],
-                        "the respondent": ["respondent"],
-                        "the child": ["child", "subject child"],
-                    }
-
-                    for term, related_roles in role_mappings.items():
-                        if new_name == term or term in new_aliases:
-                            # Check if existing actor has matching role
-                            existing_roles_lower = [r.lower() for r in existing_actor.roles]
-                            if any(r in existing_roles_lower for r in related_roles):
-                                match_found = True
-                                reason = f"Role-based match: {term} -> {existing_actor.name}"
-                                break
-
-                if match_found:
+            # Candidates from the workspace indexes instead of a full scan:
+            # actors sharing a name/alias key, plus the earliest holder of
+            # each role related to a legal term the new actor goes by (any
+            # holder matches on the role, so a scan stops at the earliest)
+            candidate_ids = set()
+            for key in [new_name] + new_aliases:
+                candidate_ids |= workspace.actor_ids_by_name(key)
+            for term, related_roles in ROLE_MAPPINGS.items():
+                if new_name == term or term in new_aliases:
+                    for role in related_roles:
+                        first_holder = workspace.first_actor_id_by_role(role)
+                        if first_holder is not None:
+                            candidate_ids.add(first_holder)
+
+            # Check candidates in workspace order so the first match is the
+            # one a scan over workspace.actors would have found
+            for existing_id in sorted(candidate_ids, key=workspace.actor_order):
+                existing_actor = workspace.actors.get(existing_id)
+                if existing_actor is None:
+                    continue
+                reason = self._rule_match_reason(new_actor, new_name, new_aliases, existing_actor)
+                if reason:
                     matches.append({
                         "new_entity_id": new_actor.id,
                         "existing_entity_id": existing_id,
@@ -470,72 +677,113 @@ class LegalReconciler:
 
         return matches
 
-    def _merge_actors(self, existing: Actor, new: Actor) -> None:
-        """Merge information from new actor into existing actor."""
+    @classmethod
+    def _rule_match_reason(
+        cls,
+        new_actor: Actor,
+        new_name: str,
+        new_aliases: List[str],
+        existing_actor: Actor
+    ) -> str:
+        """Reason the new actor matches an existing one ("" if it does not)."""
+        reason = cls._name_match_reason(new_actor, new_name, new_aliases, existing_actor)
+        if reason:
+            return reason
+
+        # Role-based matching for common legal terms
+        existing_roles_lower = [r.lower() for r in existing_actor.roles]
+        for term, related_roles in ROLE_MAPPINGS.items():
+            if new_name == term or term in new_aliases:
+                if any(r in existing_roles_lower for r in related_roles):
+                    return f"Role-based match: {term} -> {existing_actor.name}"
+
+        return ""
+
+    @staticmethod
+    def _name_match_reason(
+        new_actor: Actor,
+        new_name: str,
+        new_aliases: List[str],
+        existing_actor: Actor
+    ) -> str:
+        """Reason a name or alias of the new actor matches an existing one ("" if none)."""
+        existing_name = existing_actor.name.lower().strip()
+        existing_aliases = [a.lower().strip() for a in existing_actor.aliases]
+
+        # Exact name match
+        if new_name == existing_name:
+            return f"Exact name match: {new_actor.name}"
+
+        # New name in existing aliases
+        if new_name in existing_aliases:
+            return f"Name matches alias: {new_actor.name}"
+
+        # Existing name in new aliases
+        if existing_name in new_aliases:
+            return f"Alias matches name: {existing_actor.name}"
+
+        # Cross-alias match
+        common = set(new_aliases) & set(existing_aliases)
+        if common:
+            return f"Common alias: {list(common)[0]}"
+
+        return ""
+
+    @staticmethod
+    def _merge_actors(existing: Actor, new: Actor) -> None:
+        """
+        Merge information from new actor into existing actor.
+
+        Membership checks go through the actor's set views, so a merge
+        costs O(size of new) even for courts and judges with thousands of
+        source chunks.
+        """
         # Add new aliases
         for alias in new.aliases:
-            if alias not in existing.aliases and alias != existing.name:
-                existing.aliases.append(alias)
+            existing.add_alias(alias)
 
         # Add the new name as alias if different
-        if new.name != existing.name and new.name not in existing.aliases:
-            existing.aliases.append(new.name)
+        existing.add_alias(new.name)
 
         # Add new roles
         for role in new.roles:
-            if role not in existing.roles:
-                existing.roles.append(role)
+            existing.add_role(role)
 
-        # Add new states
+        # Add new states (unless the same state type with same value exists)
         for state in new.states:
-            # Check if we already have this state type with same value
-            existing_state = next(
-                (s for s in existing.states
-                 if s.name == state.name and s.value == state.value),
-                None
-            )
-            if not existing_state:
-                state.entity_id = existing.id
-                existing.states.append(state)
+            existing.merge_state(state)
 
         # Track source chunks
         for chunk_id in new.source_chunk_ids:
-            if chunk_id not in existing.source_chunk_ids:
-                existing.source_chunk_ids.append(chunk_id)
+            existing.add_source_chunk(chunk_id)
 
+    @staticmethod
     def _update_references(
-        self,
         extraction: ChunkExtraction,
-        old_id: str,
-        new_id: str
+        id_map: Dict[str, str]
     ) -> None:
-        """Update all references from old_id to new_id in extraction."""
+        """Rewrite references in extraction through id_map (old -> new) in one pass."""
+        if not id_map:
+            return
+
+        def ref(entity_id: Optional[str]) -> Optional[str]:
+            return id_map.get(entity_id, entity_id) if entity_id else entity_id
+
         # Update verb phrase references
         for verb in extraction.verb_phrases:
-            if verb.agent_id == old_id:
-                verb.agent_id = new_id
-            verb.patient_ids = [
-                new_id if pid == old_id else pid
-                for pid in verb.patient_ids
-            ]
-            if verb.temporal_id == old_id:
-                verb.temporal_id = new_id
-            if verb.spatial_id == old_id:
-                verb.spatial_id = new_id
+            verb.agent_id = ref(verb.agent_id)
+            verb.patient_ids = [ref(pid) for pid in verb.patient_ids]
+            verb.temporal_id = ref(verb.temporal_id)
+            verb.spatial_id = ref(verb.spatial_id)
 
         # Update spatio-temporal links
         for link in extraction.spatio_temporal_links:
-            link.linked_entity_ids = [
-                new_id if eid == old_id else eid
-                for eid in link.linked_entity_ids
-            ]
+            link.linked_entity_ids = [ref(eid) for eid in link.linked_entity_ids]
 
         # Update question references
         for q in extraction.questions:
-            if q.target_entity_id == old_id:
-                q.target_entity_id = new_id
-            if q.answer_entity_id == old_id:
-                q.answer_entity_id = new_id
+            q.target_entity_id = ref(q.target_entity_id)
+            q.answer_entity_id = ref(q.answer_entity_id)
 
     def _answer_questions(
         self,
@@ -544,58 +792,19 @@ class LegalReconciler:
         extraction: ChunkExtraction
     ) -> List[Dict[str, Any]]:
         """
-        Check if the chunk text answers any pending questions.
+        Check if the chunk text answers any of the given questions.
+
+        Every question is checked; reconcile() goes through
+        self.question_index, which checks only the questions a chunk can answer.
         """
         if not questions:
             return []
 
         answered = []
-        chunk_lower = chunk_text.lower()
+        facts = ChunkFacts.from_text(chunk_text)
 
         for q in questions:
-            q_text = q.question_text.lower()
-
-            # Simple pattern matching for common question types
-            answer_found = None
-
-            # When questions
-            if "when" in q_text:
-                # Look for dates in the chunk
-                date_patterns = [
-                    r'(\d{1,2}\s+(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{4})',
-                    r'((?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2},?\s+\d{4})',
-                    r'(\d{4}-\d{2}-\d{2})',
-                ]
-
-                # Check if question topic is in chunk
-                topic_words = ["separate", "marry", "divorce", "hear", "order", "file"]
-                for word in topic_words:
-                    if word in q_text and word in chunk_lower:
-                        # Find nearby date
-                        for pattern in date_patterns:
-                            matches = re.findall(pattern, chunk_lower)
-                            if matches:
-                                answer_found = matches[0]
-                                break
-                        break
-
-            # Who questions
-            elif "who" in q_text:
-                # Check if we have new person actors
-                for actor in extraction.actors:
-                    if actor.actor_type.value == "person":
-                        if any(role.lower() in q_text for role in actor.roles):
-                            answer_found = actor.name
-                            break
-
-            # What questions about value
-            elif "value" in q_text or "worth" in q_text:
-                # Look for dollar amounts
-                money_pattern = r'\$[\d,]+(?:\.\d{2})?(?:\s*(?:million|m))?'
-                matches = re.findall(money_pattern, chunk_lower)
-                if matches:
-                    answer_found = matches[0]
-
+            answer_found = answer_question(q, facts, extraction)
             if answer_found:
                 answered.append({
                     "question_id": q.id,
@@ -670,18 +879,146 @@ class VectorReconciler:
     """
     Enhanced reconciler using vector embeddings for entity matching.
 
-    Uses the existing vector_store.py for embedding-based similarity.
+    Actor name + alias + role strings are embedded in batches (hashing
+    encoder by default, see vector_index.py) and kept in an approximate
+    nearest-neighbour index that is updated on add_actor and persisted next
+    to the workspace. LegalReconciler uses it to put nearest neighbours in
+    the LLM prompt and, without an LLM, to match actors whose similarity
+    reaches the threshold.
     """
 
-    def __init__(self, embedding_model: str = "BAAI/bge-m3"):
-        self.embedding_model = embedding_model
-        self.embeddings: Dict[str, List[float]] = {}
+    def __init__(
+        self,
+        embedding_model: Optional[str] = None,
+        index_path: Optional[Path] = None,
+        threshold: float = 0.85,
+        neighbours: int = CANDIDATES_PER_ACTOR,
+        encoder: Optional[Any] = None
+    ):
+        """
+        Args:
+            embedding_model: "hashing" or a sentence-transformers model name
+                (default: GSW_VECTOR_ENCODER, "hashing")
+            index_path: JSON file the index is loaded from and saved to
+                (None keeps it in memory)
+            threshold: Cosine similarity needed for a vector match
+            neighbours: Nearest neighbours retrieved per new actor
+            encoder: Encoder instance (overrides embedding_model)
+        """
+        self.encoder = encoder or encoder_from_env(embedding_model)
+        self.embedding_model = self.encoder.name
+        self.index_path = Path(index_path) if index_path else None
+        self.threshold = threshold
+        self.neighbours = neighbours
+        if self.index_path:
+            self.index = VectorIndex.load(self.index_path, self.encoder.dim, self.encoder.name)
+        else:
+            self.index = VectorIndex(self.encoder.dim, self.encoder.name)
+        self._workspace_id: Optional[int] = None
+
+        self.stats = {"embedded": 0, "queries": 0, "candidates": 0, "matches": 0}
 
     def compute_similarity(self, text1: str, text2: str) -> float:
         """Compute semantic similarity between two texts."""
-        # This would use the sentence-transformers model
-        # Placeholder for now
-        return 0.0
+        vector1, vector2 = self.encoder.encode([text1, text2])
+        return cosine(vector1, vector2)
+
+    # ------------------------------------------------------------------
+    # Index updates
+    # ------------------------------------------------------------------
+
+    def add_actor(self, actor: Actor) -> None:
+        """Embed and index an actor added to (or merged in) the workspace."""
+        self.add_actors([actor])
+
+    def add_actors(self, actors: List[Actor]) -> None:
+        """Embed actors in batches; actors whose text is unchanged are skipped."""
+        changed = [(a, actor_text(a)) for a in actors]
+        changed = [(a, text) for a, text in changed if self.index.texts.get(a.id) != text]
+        if not changed:
+            return
+        vectors = encode_batched(self.encoder, [text for _, text in changed])
+        for (actor, text), vector in zip(changed, vectors):
+            self.index.add(actor.id, vector, text)
+        self.stats["embedded"] += len(changed)
+
+    def sync(self, workspace: GlobalWorkspace) -> None:
+        """Index workspace actors the index does not have (e.g. after a load)."""
+        if self._workspace_id == id(workspace) and len(self.index) == len(workspace.actors):
+            return
+        self._workspace_id = id(workspace)
+        for actor_id in [a for a in self.index.vectors if a not in workspace.actors]:
+            self.index.remove(actor_id)
+        self.add_actors([a for a in workspace.actors.values() if a.id not in self.index.vectors])
+
+    def save(self) -> None:
+        """Persist the index (no-op for an in-memory index)."""
+        if self.index_path:
+            self.index.save(self.index_path)
+
+    # ------------------------------------------------------------------
+    # Retrieval and matching
+    # ------------------------------------------------------------------
+
+    def nearest(
+        self,
+        new_actors: List[Actor],
+        workspace: GlobalWorkspace
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Nearest workspace actors of the same type for each new actor.
+
+        Args:
+            new_actors: Actors from the chunk being reconciled
+            workspace: Workspace (or partition) whose actors may be returned
+
+        Returns:
+            New actor id -> (existing actor id, cosine) pairs, best first
+        """
+        if not new_actors or not workspace.actors:
+            return {}
+        vectors = encode_batched(self.encoder, [actor_text(a) for a in new_actors])
+        results = {}
+        for actor, vector in zip(new_actors, vectors):
+            hits = self.index.search(vector, k=self.neighbours * 2, allowed=workspace.actors)
+            results[actor.id] = [
+                (actor_id, score) for actor_id, score in hits
+                if workspace.actors[actor_id].actor_type == actor.actor_type
+            ][:self.neighbours]
+        self.stats["queries"] += 1
+        return results
+
+    def candidates(self, new_actors: List[Actor], workspace: GlobalWorkspace) -> List[Actor]:
+        """Workspace actors nearest to any of the new actors, best first."""
+        best: Dict[str, float] = {}
+        for hits in self.nearest(new_actors, workspace).values():
+            for actor_id, score in hits:
+                best[actor_id] = max(best.get(actor_id, 0.0), score)
+        ranked = sorted(best, key=lambda a: (-best[a], workspace.actor_order(a)))
+        self.stats["candidates"] += len(ranked)
+        return [workspace.actors[a] for a in ranked]
+
+    def match(self, new_actors: List[Actor], workspace: GlobalWorkspace) -> List[Dict[str, Any]]:
+        """Match new actors to their nearest workspace actor at or above the threshold."""
+        matches = []
+        for new_id, hits in self.nearest(new_actors, workspace).items():
+            if hits and hits[0][1] >= self.threshold:
+                existing_id, score = hits[0]
+                matches.append({
+                    "new_entity_id": new_id,
+                    "existing_entity_id": existing_id,
+                    "confidence": round(score, 3),
+                    "reason": f"Vector similarity {score:.2f}: {workspace.actors[existing_id].name}"
+                })
+        self.stats["matches"] += len(matches)
+        return matches
+
+    def summary(self) -> str:
+        """One-line summary of embedding work and matches."""
+        stats = self.stats
+        return (f"{len(self.index)} actors indexed ({self.embedding_model}), "
+                f"{stats['embedded']} embedded, {stats['queries']} queries, "
+                f"{stats['matches']} threshold matches")
 
 
 # ============================================================================
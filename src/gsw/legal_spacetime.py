@@ -26,6 +26,8 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 from src.logic.gsw_schema import (
     Actor, SpatioTemporalLink, LinkType, ChunkExtraction
 )
+from src.gsw.llm_client import chat_completion, circuit_open, shared_client
+from src.gsw.llm_transport import replay_api_key
 
 
 # ============================================================================
@@ -46,14 +48,11 @@ This binding is crucial for understanding legal narratives:
   → The judge, parties, and hearing all share spatial context
 """
 
+# Static instructions first, per-call input last, so the prompt prefix is
+# identical across calls and can be served from the provider's cache.
 SPACETIME_USER_PROMPT = """
-Analyze this text and the extracted entities to identify spatio-temporal links.
-
-## Extracted Entities
-{entities_json}
-
-## Original Text
-{input_text}
+Analyze the text and the extracted entities at the end of this message to
+identify spatio-temporal links.
 
 ## Instructions
 
@@ -94,6 +93,12 @@ IMPORTANT:
 - Use specific values when mentioned (actual dates, addresses)
 - Use null for tag_value if the context is implied but not explicitly stated
 - Include context_description to explain why entities are linked
+
+## Extracted Entities
+{entities_json}
+
+## Original Text
+{input_text}
 """
 
 
@@ -122,7 +127,7 @@ class LegalSpacetime:
         if api_key:
             self.api_key = api_key
         elif use_openrouter:
-            self.api_key = os.getenv("OPENROUTER_API_KEY")
+            self.api_key = os.getenv("OPENROUTER_API_KEY") or replay_api_key()
         else:
             self.api_key = os.getenv("GOOGLE_API_KEY")
 
@@ -131,15 +136,7 @@ class LegalSpacetime:
     def _setup_client(self) -> None:
         """Setup the LLM client."""
         if self.use_openrouter:
-            import httpx
-            self.client = httpx.Client(
-                base_url="https://openrouter.ai/api/v1",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                timeout=60.0
-            )
+            self.client = shared_client(self.api_key)
 
     def link_entities(
         self,
@@ -159,6 +156,10 @@ class LegalSpacetime:
         if not extraction.actors:
             return []
 
+        # Provider failing: don't wait out a timeout per chunk
+        if circuit_open(getattr(self, "client", None)):
+            return self._rule_based_linking(extraction)
+
         # Build entities JSON for prompt
         entities_data = []
         for actor in extraction.actors:
@@ -190,9 +191,9 @@ class LegalSpacetime:
     def _call_llm(self, user_prompt: str) -> str:
         """Call the LLM."""
         if self.use_openrouter:
-            response = self.client.post(
-                "/chat/completions",
-                json={
+            data = chat_completion(
+                self.client,
+                {
                     "model": self.model,
                     "messages": [
                         {"role": "system", "content": SPACETIME_SYSTEM_PROMPT},
@@ -200,10 +201,10 @@ class LegalSpacetime:
                     ],
                     "temperature": 0.1,
                     "max_tokens": 4000
-                }
+                },
+                stage="spacetime"
             )
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            return data["choices"][0]["message"]["content"]
         else:
             raise NotImplementedError("Direct Google API not implemented")
 
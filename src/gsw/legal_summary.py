@@ -20,6 +20,8 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 from src.logic.gsw_schema import (
     Actor, GlobalWorkspace, State, VerbPhrase, SpatioTemporalLink
 )
+from src.gsw.llm_client import chat_completion, circuit_open, shared_client
+from src.gsw.llm_transport import replay_api_key
 
 
 # ============================================================================
@@ -96,7 +98,7 @@ class LegalSummary:
         if api_key:
             self.api_key = api_key
         elif use_openrouter:
-            self.api_key = os.getenv("OPENROUTER_API_KEY")
+            self.api_key = os.getenv("OPENROUTER_API_KEY") or replay_api_key()
         else:
             self.api_key = os.getenv("GOOGLE_API_KEY")
 
@@ -105,15 +107,7 @@ class LegalSummary:
     def _setup_client(self) -> None:
         """Setup LLM client."""
         if self.use_openrouter and self.api_key:
-            import httpx
-            self.client = httpx.Client(
-                base_url="https://openrouter.ai/api/v1",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                timeout=60.0
-            )
+            self.client = shared_client(self.api_key)
         else:
             self.client = None
 
@@ -138,8 +132,8 @@ class LegalSummary:
         spacetime_info = self._format_spacetime(actor.id, workspace)
         related_entities = self._find_related_entities(actor.id, workspace)
 
-        # Try LLM generation
-        if self.client:
+        # Try LLM generation (skipped while the provider's circuit is open)
+        if self.client and not circuit_open(self.client):
             try:
                 return self._llm_generate_summary(
                     actor, states_info, actions_info, spacetime_info, related_entities
@@ -289,9 +283,9 @@ class LegalSummary:
             related_entities=related_entities
         )
 
-        response = self.client.post(
-            "/chat/completions",
-            json={
+        data = chat_completion(
+            self.client,
+            {
                 "model": f"google/{self.model}",
                 "messages": [
                     {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
@@ -299,11 +293,11 @@ class LegalSummary:
                 ],
                 "temperature": 0.3,
                 "max_tokens": 500
-            }
+            },
+            stage="summary"
         )
-        response.raise_for_status()
 
-        return response.json()["choices"][0]["message"]["content"].strip()
+        return data["choices"][0]["message"]["content"].strip()
 
     def _template_summary(
         self,
@@ -0,0 +1,642 @@
+"""
+LLM Client - Instrumented Chat Completion Calls
+
+Shared connection pool and request path for every GSW component that
+talks to an OpenAI-compatible /chat/completions endpoint.
+
+shared_client() returns one process-wide httpx.Client per (base URL, API
+key): keep-alive pooling, HTTP/2 multiplexing when the optional "h2"
+package is installed, and the auth headers set in one place. Operator,
+Spacetime, Reconciler and Summary all share it, so a run pays for TLS
+handshakes once and concurrent stages reuse the same sockets.
+
+Each chat completion call:
+
+- retries rate limits (429) and transient server errors (5xx), honouring
+  Retry-After
+- reads the provider's usage block (prompt, completion and cached tokens)
+- records model, tokens, latency, retries, cache hit and outcome in the
+  telemetry ledger (see src.gsw.telemetry)
+- uses the calling stage's timeout (STAGE_TIMEOUTS)
+
+Errors are re-raised after recording so component fallbacks behave as
+before.
+
+Identical requests that overlap in time are coalesced (single-flight):
+while one chat completion is in flight, concurrent callers sending the
+same payload to the same endpoint wait for its response instead of
+sending a duplicate. Each waiter is recorded in the ledger as a coalesced
+call with no tokens. This complements the cassette cache (llm_transport),
+which only helps once a response has been stored. Streamed calls are not
+coalesced.
+
+Each endpoint has a circuit breaker. After CIRCUIT_FAILURE_THRESHOLD
+consecutive provider failures (timeouts, connection errors, 429/5xx after
+retries) it opens and calls fail immediately with CircuitOpenError instead
+of waiting out the timeout, so components drop straight to their
+rule-based fallbacks. After the recovery period one probe call is let
+through (half-open); success closes the circuit, failure re-opens it.
+
+Configuration (environment):
+    GSW_HTTP2                  Set to 0 to disable HTTP/2 (default: on if h2 is installed)
+    GSW_HTTP_MAX_CONNECTIONS   Pool size (default: 20)
+    GSW_HTTP_MAX_KEEPALIVE     Idle keep-alive connections (default: 10)
+    GSW_TIMEOUT_<STAGE>        Read timeout override, e.g. GSW_TIMEOUT_OPERATOR=180
+    GSW_SINGLE_FLIGHT          Set to 0 to disable request coalescing (default: on)
+    GSW_CIRCUIT_BREAKER        Set to 0 to disable circuit breakers (default: on)
+    GSW_CIRCUIT_FAILURES       Consecutive failures that open a circuit (default: 5)
+    GSW_CIRCUIT_RECOVERY       Seconds before an open circuit is probed (default: 30)
+"""
+
+import atexit
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from src.gsw.llm_transport import CassetteMissError, cassette_transport_from_env, llm_base_url
+from src.gsw.telemetry import LLMCall, record_call
+from src.utils.json_stream import iter_sse_data
+
+# HTTP/2 needs the h2 package (httpx[http2] in requirements.txt)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+DEFAULT_MAX_RETRIES = 2
+MAX_BACKOFF_SECONDS = 30.0
+
+# Read timeouts per stage (seconds) - long structured extractions need more
+STAGE_TIMEOUTS: Dict[str, float] = {
+    "operator": 120.0,
+    "review": 120.0,
+    "spacetime": 60.0,
+    "reconcile": 60.0,
+    "summary": 60.0,
+}
+DEFAULT_TIMEOUT = 60.0
+CONNECT_TIMEOUT = 10.0
+
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RECOVERY_SECONDS = 30.0
+
+
+# ============================================================================
+# SHARED CLIENT
+# ============================================================================
+
+_clients: Dict[Tuple[str, Optional[str]], httpx.Client] = {}
+_clients_lock = threading.Lock()
+_http1_notice_shown = False
+
+
+def stage_timeout(stage: str) -> httpx.Timeout:
+    """Timeout for a stage (GSW_TIMEOUT_<STAGE> overrides the default)."""
+    read = STAGE_TIMEOUTS.get(stage, DEFAULT_TIMEOUT)
+    override = os.getenv(f"GSW_TIMEOUT_{stage.upper()}")
+    if override:
+        try:
+            read = float(override)
+        except ValueError:
+            print(f"[LLM Client Warning] Ignoring invalid GSW_TIMEOUT_{stage.upper()}={override}")
+    return httpx.Timeout(read, connect=min(CONNECT_TIMEOUT, read))
+
+
+def http2_enabled() -> bool:
+    """HTTP/2 is used when h2 is installed and not disabled via GSW_HTTP2=0."""
+    return HTTP2_AVAILABLE and os.getenv("GSW_HTTP2", "1") != "0"
+
+
+def _log_http1_fallback() -> None:
+    """Say once per process why LLM calls are not multiplexed over HTTP/2."""
+    global _http1_notice_shown
+    if _http1_notice_shown:
+        return
+    _http1_notice_shown = True
+    if not HTTP2_AVAILABLE:
+        print("[LLM Client] HTTP/2 off: h2 is not installed (pip install 'httpx[http2]') - using HTTP/1.1")
+    else:
+        print("[LLM Client] HTTP/2 off: disabled by GSW_HTTP2=0 - using HTTP/1.1")
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("GSW_HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("GSW_HTTP_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=30.0
+    )
+
+
+def create_client(api_key: Optional[str], base_url: Optional[str] = None) -> httpx.Client:
+    """
+    Build a pooled client for an OpenAI-compatible endpoint.
+
+    Prefer shared_client() - this is the factory behind it.
+    """
+    http2 = http2_enabled()
+    if not http2:
+        _log_http1_fallback()
+    pool = httpx.HTTPTransport(http2=http2, limits=_pool_limits())
+    transport = cassette_transport_from_env(inner=pool) or pool
+
+    return httpx.Client(
+        base_url=base_url or llm_base_url(),
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        },
+        timeout=stage_timeout("default"),
+        transport=transport
+    )
+
+
+def shared_client(api_key: Optional[str], base_url: Optional[str] = None) -> httpx.Client:
+    """
+    Process-wide pooled client for (base URL, API key).
+
+    All components asking for the same endpoint and key share one
+    connection pool.
+    """
+    key = (base_url or llm_base_url(), api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = create_client(api_key, key[0])
+            _clients[key] = client
+        return client
+
+
+def close_shared_clients() -> None:
+    """Close every shared client (also registered at interpreter exit)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+atexit.register(close_shared_clients)
+
+
+# ============================================================================
+# SINGLE-FLIGHT
+# ============================================================================
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it runs wait on the leader's future and share its
+    result or exception. Nothing is kept once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.stats: Dict[str, int] = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among overlapping callers.
+
+        Returns:
+            (result, shared) - shared is True if the result came from
+            another caller's in-flight call
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        """Number of keys currently being executed."""
+        with self._lock:
+            return len(self._in_flight)
+
+
+_single_flight = SingleFlight()
+
+
+def single_flight_enabled() -> bool:
+    """Coalescing is on unless disabled via GSW_SINGLE_FLIGHT=0."""
+    return os.getenv("GSW_SINGLE_FLIGHT", "1") != "0"
+
+
+def single_flight_stats() -> Dict[str, int]:
+    """Process-wide coalescing counters (calls seen, calls coalesced)."""
+    with _single_flight._lock:
+        return dict(_single_flight.stats)
+
+
+def _flight_key(client: httpx.Client, payload: Dict[str, Any]) -> str:
+    """Identity of a request: endpoint, credentials and canonical payload."""
+    auth = client.headers.get("authorization", "")
+    body = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{client.base_url}\n{auth}\n{body}".encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while an endpoint's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker for one endpoint.
+
+    - closed:     requests flow; consecutive failures are counted
+    - open:       requests are rejected until recovery_seconds have passed
+    - half_open:  a single probe request is allowed; its outcome closes or
+                  re-opens the circuit
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        recovery_seconds: float = CIRCUIT_RECOVERY_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_seconds: Time an open circuit waits before probing
+            clock: Time source (monotonic seconds)
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.stats: Dict[str, int] = {"opened": 0, "rejected": 0, "probes": 0}
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected (does not claim the probe)."""
+        with self._lock:
+            return self._rejecting()
+
+    def short_circuit(self) -> bool:
+        """Like is_open(), but counts the skipped call as rejected."""
+        with self._lock:
+            rejecting = self._rejecting()
+            if rejecting:
+                self.stats["rejected"] += 1
+            return rejecting
+
+    def _rejecting(self) -> bool:
+        if self.state == "open":
+            return self._clock() - self.opened_at < self.recovery_seconds
+        return self.state == "half_open" and self._probing
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now (claims the probe when half-open)."""
+        with self._lock:
+            if self.state == "open" and self._clock() - self.opened_at >= self.recovery_seconds:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                self.stats["probes"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        """The endpoint answered: close the circuit."""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """The endpoint failed: open after too many failures or a failed probe."""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.stats["opened"] += 1
+                self.state = "open"
+                self.opened_at = self._clock()
+                self._probing = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker_enabled() -> bool:
+    """Breakers are on unless disabled via GSW_CIRCUIT_BREAKER=0."""
+    return os.getenv("GSW_CIRCUIT_BREAKER", "1") != "0"
+
+
+def circuit_breaker(client: httpx.Client) -> CircuitBreaker:
+    """Process-wide breaker for the client's endpoint (base URL)."""
+    key = str(client.base_url)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=int(os.getenv("GSW_CIRCUIT_FAILURES", str(CIRCUIT_FAILURE_THRESHOLD))),
+                recovery_seconds=float(os.getenv("GSW_CIRCUIT_RECOVERY", str(CIRCUIT_RECOVERY_SECONDS)))
+            )
+            _breakers[key] = breaker
+        return breaker
+
+
+def circuit_breakers() -> Dict[str, CircuitBreaker]:
+    """All breakers created so far, by endpoint."""
+    with _breakers_lock:
+        return dict(_breakers)
+
+
+def circuit_open(client: Any) -> bool:
+    """
+    True if calls through this client would currently be rejected.
+
+    Components check this to go straight to their rule-based path. Clients
+    that are not httpx clients (e.g. Google SDK models) are never blocked.
+    """
+    if not circuit_breaker_enabled() or not isinstance(client, httpx.Client):
+        return False
+    return circuit_breaker(client).short_circuit()
+
+
+def _provider_failed(error: BaseException) -> bool:
+    """Failures that indicate a degraded provider (not a bad request)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, httpx.TransportError) and not isinstance(error, CassetteMissError)
+
+
+def _guard(client: httpx.Client, call: LLMCall) -> Optional[CircuitBreaker]:
+    """Breaker for the call, raising CircuitOpenError if it rejects the request."""
+    if not circuit_breaker_enabled():
+        return None
+    breaker = circuit_breaker(client)
+    if not breaker.allow():
+        call.outcome = "circuit_open"
+        call.error = f"Circuit open for {client.base_url}"
+        record_call(call)
+        raise CircuitOpenError(call.error)
+    return breaker
+
+
+def _settle(breaker: Optional[CircuitBreaker], error: Optional[BaseException] = None) -> None:
+    """Report a call's outcome to its breaker."""
+    if breaker is None:
+        return
+    if error is not None and _provider_failed(error):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+# ============================================================================
+# CHAT COMPLETIONS
+# ============================================================================
+
+def _backoff_seconds(response: httpx.Response, attempt: int) -> float:
+    """Delay before the next attempt (Retry-After wins over exponential backoff)."""
+    retry_after = response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            pass
+    return min(0.5 * (2 ** attempt), MAX_BACKOFF_SECONDS)
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (4 chars/token) when the provider omits usage."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _apply_usage(call: LLMCall, usage: Optional[Dict[str, Any]], payload: Dict[str, Any], content: str) -> None:
+    """Copy the usage block into the call record, estimating if absent."""
+    if usage:
+        call.prompt_tokens = usage.get("prompt_tokens") or 0
+        call.completion_tokens = usage.get("completion_tokens") or 0
+        details = usage.get("prompt_tokens_details") or {}
+        call.cached_tokens = details.get("cached_tokens") or 0
+    else:
+        prompt_chars = "".join(
+            str(m.get("content", "")) for m in payload.get("messages", [])
+        )
+        call.prompt_tokens = _estimate_tokens(prompt_chars)
+        call.completion_tokens = _estimate_tokens(content)
+        call.usage_estimated = True
+
+
+def _send_with_retries(
+    client: httpx.Client,
+    payload: Dict[str, Any],
+    call: LLMCall,
+    max_retries: int,
+    stream: bool = False
+) -> httpx.Response:
+    """
+    Send the request, retrying retryable statuses.
+
+    Returns the first non-retryable response (or the last one once
+    retries are exhausted). Streamed responses are returned open.
+    """
+    attempt = 0
+    while True:
+        request = client.build_request(
+            "POST", "/chat/completions", json=payload, timeout=stage_timeout(call.stage)
+        )
+        response = client.send(request, stream=stream)
+
+        if response.status_code not in RETRYABLE_STATUS or attempt >= max_retries:
+            return response
+
+        delay = _backoff_seconds(response, attempt)
+        response.close()
+        attempt += 1
+        call.retries = attempt
+        time.sleep(delay)
+
+
+def chat_completion(
+    client: httpx.Client,
+    payload: Dict[str, Any],
+    stage: str,
+    max_retries: int = DEFAULT_MAX_RETRIES
+) -> Dict[str, Any]:
+    """
+    POST a chat completion and record it in the telemetry ledger.
+
+    Args:
+        client: httpx client with base URL and auth configured
+        payload: Request body (model, messages, ...)
+        stage: Component name for telemetry ("operator", "spacetime", ...)
+        max_retries: Retries for 429/5xx responses
+
+    Returns:
+        The decoded response JSON
+
+    Raises:
+        httpx.HTTPStatusError / httpx.TransportError as before
+    """
+    if not single_flight_enabled():
+        return _chat_completion(client, payload, stage, max_retries)
+
+    started = time.perf_counter()
+    coalesced = LLMCall(stage=stage, model=payload.get("model", ""), coalesced=True, cost_usd=0.0)
+    led = []
+
+    def send() -> Dict[str, Any]:
+        led.append(True)
+        return _chat_completion(client, payload, stage, max_retries)
+
+    try:
+        data, shared = _single_flight.do(_flight_key(client, payload), send)
+    except Exception as e:
+        # The leader recorded its own failure; waiters record theirs as coalesced
+        if not led:
+            coalesced.outcome = "error"
+            coalesced.error = f"{type(e).__name__}: {e}"[:200]
+            coalesced.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            record_call(coalesced)
+        raise
+    if not shared:
+        return data
+
+    # Waited on an identical in-flight request: no tokens were spent
+    coalesced.model = data.get("model") or coalesced.model
+    coalesced.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+    record_call(coalesced)
+    return copy.deepcopy(data)
+
+
+def _chat_completion(
+    client: httpx.Client,
+    payload: Dict[str, Any],
+    stage: str,
+    max_retries: int
+) -> Dict[str, Any]:
+    """Send one chat completion and record it (no coalescing)."""
+    call = LLMCall(stage=stage, model=payload.get("model", ""))
+    breaker = _guard(client, call)
+    started = time.perf_counter()
+
+    try:
+        response = _send_with_retries(client, payload, call, max_retries)
+        call.cache_hit = response.headers.get("x-gsw-cassette") == "hit"
+        response.raise_for_status()
+        data = response.json()
+    except httpx.HTTPStatusError as e:
+        _settle(breaker, e)
+        call.outcome = f"http_{e.response.status_code}"
+        call.error = str(e)[:200]
+        call.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        record_call(call)
+        raise
+    except Exception as e:
+        _settle(breaker, e)
+        call.outcome = "error"
+        call.error = f"{type(e).__name__}: {e}"[:200]
+        call.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        record_call(call)
+        raise
+
+    _settle(breaker)
+    call.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+    choices = data.get("choices") or [{}]
+    content = (choices[0].get("message") or {}).get("content") or ""
+    if choices[0].get("finish_reason") == "length":
+        call.outcome = "truncated"
+    call.model = data.get("model") or call.model
+    _apply_usage(call, data.get("usage"), payload, content)
+    record_call(call)
+    return data
+
+
+def stream_chat_completion(
+    client: httpx.Client,
+    payload: Dict[str, Any],
+    stage: str,
+    max_retries: int = DEFAULT_MAX_RETRIES
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream a chat completion, yielding decoded SSE events.
+
+    Retries happen only before the first event is received. The call is
+    recorded once the stream ends (or fails), using the usage block of the
+    final event when the provider sends one.
+    """
+    payload = dict(payload, stream=True)
+    call = LLMCall(stage=stage, model=payload.get("model", ""))
+    breaker = _guard(client, call)
+    started = time.perf_counter()
+    content_parts = []
+    usage = None
+    error: Optional[BaseException] = None
+
+    try:
+        response = _send_with_retries(client, payload, call, max_retries, stream=True)
+        try:
+            call.cache_hit = response.headers.get("x-gsw-cassette") == "hit"
+            response.raise_for_status()
+            for event in iter_sse_data(response.iter_lines()):
+                usage = event.get("usage") or usage
+                for choice in event.get("choices") or []:
+                    delta = choice.get("delta") or {}
+                    content_parts.append(delta.get("content") or "")
+                    if choice.get("finish_reason") == "length":
+                        call.outcome = "truncated"
+                yield event
+        finally:
+            response.close()
+    except httpx.HTTPStatusError as e:
+        error = e
+        call.outcome = f"http_{e.response.status_code}"
+        call.error = str(e)[:200]
+        raise
+    except Exception as e:
+        error = e
+        call.outcome = "error"
+        call.error = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        _settle(breaker, error)
+        call.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        _apply_usage(call, usage, payload, "".join(content_parts))
+        record_call(call)
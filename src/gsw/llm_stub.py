@@ -0,0 +1,416 @@
+"""
+LLM Stub - Local OpenAI-Compatible Server for Benchmarks
+
+A tiny /chat/completions server that answers every GSW component with
+synthetic but schema-valid payloads:
+
+- operator:   actors, verb phrases, questions and links (single or packed,
+              as JSON or as TOON tables); review passes are approved
+- spacetime:  spatio_temporal_links over the supplied entity ids
+- reconcile:  empty entity_matches / answered_questions
+- summary:    one plain-text paragraph
+
+The stage is detected from the system prompt. Latency, HTTP 429 rate and
+truncation rate are configurable so orchestration throughput can be
+measured (and regressions caught) without network access or API spend.
+
+Provider prompt-prefix caching is simulated: prompts are hashed in blocks
+of PREFIX_BLOCK_CHARS and every leading block seen before (for the same
+model) is reported as usage.prompt_tokens_details.cached_tokens. A prompt
+layout with a stable static prefix therefore shows up in the telemetry
+exactly as it would against a caching provider.
+
+Usage:
+    with StubLLMServer(latency=0.05, error_rate=0.02) as stub:
+        os.environ["GSW_LLM_BASE_URL"] = stub.base_url
+        ...
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+STAGES = ("operator", "spacetime", "reconcile", "summary")
+
+# Granularity of the simulated prefix cache (~128 tokens)
+PREFIX_BLOCK_CHARS = 512
+
+# System prompt fragments identifying each component
+_STAGE_MARKERS = [
+    ("operator", "Legal Operator"),
+    ("spacetime", "spatio-temporal"),
+    ("reconcile", "entity reconciliation"),
+    ("summary", "narrative summarizer"),
+]
+
+
+def detect_stage(payload: Dict[str, Any]) -> str:
+    """Identify the calling component from the request's system prompt."""
+    messages = payload.get("messages") or []
+    system = next(
+        (m.get("content", "") for m in messages if m.get("role") == "system"),
+        ""
+    )
+    for stage, marker in _STAGE_MARKERS:
+        if marker.lower() in system.lower():
+            return stage
+    return "unknown"
+
+
+# ============================================================================
+# SYNTHETIC PAYLOADS
+# ============================================================================
+
+def _user_prompt(payload: Dict[str, Any]) -> str:
+    messages = payload.get("messages") or []
+    return next(
+        (m.get("content", "") for m in reversed(messages) if m.get("role") == "user"),
+        ""
+    )
+
+
+def _synthetic_document(text: str, prefix: str = "") -> Dict[str, Any]:
+    """Deterministic operator output for one document."""
+    seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+    n = seed % 100000
+    # Ids are unique per document so the workspace grows like a real corpus
+    ids = [f"{prefix}actor_{n:05d}{i}" for i in range(1, 5)]
+
+    return {
+        "situation_summary": f"Synthetic proceedings {n}",
+        "actors": [
+            {"id": ids[0], "name": f"Applicant {n}", "actor_type": "person",
+             "aliases": ["the applicant"], "roles": ["Applicant"],
+             "states": [{"name": "RelationshipStatus", "value": "Separated", "start_date": "2020-03-01"}]},
+            {"id": ids[1], "name": f"Respondent {n}", "actor_type": "person",
+             "aliases": ["the respondent"], "roles": ["Respondent"], "states": []},
+            {"id": ids[2], "name": "Family Court of Australia", "actor_type": "organization",
+             "aliases": [], "roles": ["Court"], "states": []},
+            {"id": ids[3], "name": "1 March 2020", "actor_type": "temporal",
+             "aliases": ["date of separation"], "roles": [], "states": []},
+        ],
+        "verb_phrases": [
+            {"id": f"{prefix}verb_{n:05d}1", "verb": "filed", "agent_id": ids[0],
+             "patient_ids": [ids[2]], "temporal_id": ids[3], "is_implicit": False},
+        ],
+        "questions": [
+            {"id": f"{prefix}q_{n:05d}1", "question_text": f"Who is Applicant {n}?", "question_type": "who",
+             "target_entity_id": ids[0], "answerable": True,
+             "answer_text": f"Applicant {n}", "answer_entity_id": ids[0]},
+            {"id": f"{prefix}q_{n:05d}2", "question_text": "When did the parties separate?", "question_type": "when",
+             "target_entity_id": ids[0], "answerable": False},
+            {"id": f"{prefix}q_{n:05d}3", "question_text": "What is the asset pool worth?", "question_type": "how_much",
+             "target_entity_id": ids[0], "answerable": False},
+        ],
+        "spatio_temporal_links": [
+            {"id": f"{prefix}link_{n:05d}1", "linked_entity_ids": [ids[0], ids[1], ids[3]],
+             "tag_type": "temporal", "tag_value": "2020-03-01"},
+        ],
+    }
+
+
+def _toon_value(value: Any) -> str:
+    text = "|".join(value) if isinstance(value, list) else str(value if value is not None else "")
+    if isinstance(value, bool):
+        text = "1" if value else "0"
+    if "," in text or '"' in text:
+        text = '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _synthetic_toon(document: Dict[str, Any]) -> str:
+    """Render a synthetic operator document as the operator's TOON tables."""
+    def table(name: str, columns: List[str], rows: List[List[Any]]) -> str:
+        lines = [f"{name}[{len(rows)}]{{{','.join(columns)}}}"]
+        lines += [",".join(_toon_value(v) for v in row) for row in rows]
+        return "\n".join(lines)
+
+    actors = document["actors"]
+    return "\n\n".join([
+        table("Summary", ["text"], [[document["situation_summary"]]]),
+        table("Actors", ["id", "name", "type", "aliases", "roles"], [
+            [a["id"], a["name"], a["actor_type"], a["aliases"], a["roles"]] for a in actors
+        ]),
+        table("States", ["actor", "name", "value", "start", "end"], [
+            [a["id"], st["name"], st["value"], st.get("start_date"), st.get("end_date")]
+            for a in actors for st in a["states"]
+        ]),
+        table("VerbPhrases", ["id", "verb", "agent", "patients", "temporal", "spatial", "implicit"], [
+            [v["id"], v["verb"], v["agent_id"], v["patient_ids"], v.get("temporal_id"),
+             v.get("spatial_id"), v["is_implicit"]]
+            for v in document["verb_phrases"]
+        ]),
+        table("Questions", ["id", "type", "about", "answer_id", "answered", "answer", "question"], [
+            [q["id"], q["question_type"], q["target_entity_id"], q.get("answer_entity_id"),
+             q["answerable"], q.get("answer_text"), q["question_text"]]
+            for q in document["questions"]
+        ]),
+        table("Links", ["id", "entities", "type", "value"], [
+            [link["id"], link["linked_entity_ids"], link["tag_type"], link["tag_value"]]
+            for link in document["spatio_temporal_links"]
+        ]),
+    ]) + "\n"
+
+
+def build_content(stage: str, payload: Dict[str, Any]) -> str:
+    """Build the completion text for a stage."""
+    prompt = _user_prompt(payload)
+
+    if stage == "operator":
+        if prompt.lstrip().startswith("Review this extraction"):
+            return json.dumps({"status": "approved"})
+        tags = re.findall(r'<document id="([^"]+)">', prompt)
+        if tags:
+            return json.dumps({"documents": [
+                dict(_synthetic_document(f"{tag}:{prompt}", prefix=f"{tag}_"), document_id=tag)
+                for tag in tags
+            ]})
+        if "Return TOON tables" in prompt:
+            return _synthetic_toon(_synthetic_document(prompt))
+        return json.dumps(_synthetic_document(prompt))
+
+    if stage == "spacetime":
+        actor_ids = list(dict.fromkeys(re.findall(r'"(actor_\d+)"', prompt)))
+        links = []
+        if actor_ids:
+            links.append({
+                "linked_entity_ids": actor_ids,
+                "tag_type": "temporal",
+                "tag_value": "2020-03-01",
+                "context_description": "Synthetic shared date"
+            })
+        return json.dumps({"spatio_temporal_links": links})
+
+    if stage == "reconcile":
+        return json.dumps({"entity_matches": [], "answered_questions": [], "new_entities": []})
+
+    if stage == "summary":
+        return "The entity appears in synthetic proceedings before the Family Court of Australia."
+
+    return json.dumps({"status": "approved"})
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class StubLLMServer:
+    """
+    Threaded local /chat/completions server.
+
+    Runs in a daemon thread on 127.0.0.1. Use as a context manager or call
+    start()/stop() explicitly.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        truncation_rate: float = 0.0,
+        port: int = 0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            latency: Seconds to wait before answering each request
+            error_rate: Fraction of requests answered with HTTP 429
+            truncation_rate: Fraction of completions cut short
+                (finish_reason "length")
+            port: Port to bind (0 picks a free port)
+            seed: Random seed for reproducible error/truncation patterns
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.truncation_rate = truncation_rate
+        self.port = port
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self._prefixes: set = set()
+
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "rate_limited": 0,
+            "truncated": 0,
+            "cached_tokens": 0,
+        }
+        self.stage_counts: Dict[str, int] = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def start(self) -> "StubLLMServer":
+        """Start serving in a background thread."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    def _cached_prefix_chars(self, payload: Dict[str, Any]) -> int:
+        """
+        Length of the prompt prefix already seen, in whole cache blocks.
+
+        Every block boundary of this prompt is remembered, so later
+        requests sharing the prefix are reported as cache hits.
+        """
+        prompt = payload.get("model", "") + "\x00" + "".join(
+            f"{m.get('role')}\x00{m.get('content', '')}\x00" for m in payload.get("messages") or []
+        )
+        digest = hashlib.sha1()
+        cached = 0
+        matching = True
+        with self._lock:
+            for end in range(PREFIX_BLOCK_CHARS, len(prompt) + 1, PREFIX_BLOCK_CHARS):
+                digest.update(prompt[end - PREFIX_BLOCK_CHARS:end].encode("utf-8"))
+                key = digest.hexdigest()
+                if matching and key in self._prefixes:
+                    cached = end
+                else:
+                    matching = False
+                    self._prefixes.add(key)
+        return cached
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        """Answer one request."""
+        length = int(handler.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(handler.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            payload = {}
+
+        stage = detect_stage(payload)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stage_counts[stage] = self.stage_counts.get(stage, 0) + 1
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        if not handler.path.rstrip("/").endswith("chat/completions"):
+            self._send_json(handler, 404, {"error": {"message": f"Unknown path {handler.path}"}})
+            return
+
+        if self._roll(self.error_rate):
+            with self._lock:
+                self.stats["rate_limited"] += 1
+            self._send_json(
+                handler, 429,
+                {"error": {"message": "Rate limit exceeded (stub)"}},
+                {"Retry-After": "0"}
+            )
+            return
+
+        content = build_content(stage, payload)
+        finish_reason = "stop"
+        if stage == "operator" and self._roll(self.truncation_rate):
+            with self._lock:
+                self.stats["truncated"] += 1
+            content = content[:max(1, int(len(content) * 0.6))]
+            finish_reason = "length"
+
+        usage = {
+            "prompt_tokens": len(json.dumps(payload.get("messages", []))) // 4,
+            "completion_tokens": len(content) // 4,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        cached_tokens = min(usage["prompt_tokens"], self._cached_prefix_chars(payload) // 4)
+        usage["prompt_tokens_details"] = {"cached_tokens": cached_tokens}
+        with self._lock:
+            self.stats["cached_tokens"] += cached_tokens
+
+        if payload.get("stream"):
+            self._send_stream(handler, content, finish_reason, payload.get("model", "stub"))
+            return
+
+        self._send_json(handler, 200, {
+            "id": f"stub-{self.stats['requests']}",
+            "object": "chat.completion",
+            "model": payload.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason,
+            }],
+            "usage": usage,
+        })
+
+    def _send_json(
+        self,
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        body: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        data = json.dumps(body).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _send_stream(
+        self,
+        handler: BaseHTTPRequestHandler,
+        content: str,
+        finish_reason: str,
+        model: str
+    ) -> None:
+        """Send the completion as server-sent events in small deltas."""
+        events: List[str] = []
+        for i in range(0, len(content), 64):
+            events.append(json.dumps({
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[i:i + 64]}, "finish_reason": None}],
+            }))
+        events.append(json.dumps({
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+        }))
+
+        data = "".join(f"data: {event}\n\n" for event in events) + "data: [DONE]\n\n"
+        body = data.encode("utf-8")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
@@ -0,0 +1,247 @@
+"""
+LLM Transport - Record/Replay Cassettes for Offline Runs
+
+Every GSW component talks to an OpenAI-compatible /chat/completions
+endpoint through httpx. CassetteTransport sits underneath those clients:
+
+- record: forward each request to the network and save the exchange
+- replay: answer every request from the cassette, never touch the network
+- auto:   replay when a recording exists, otherwise record
+
+Requests are matched on a hash of the normalized request (method, path and
+canonical JSON body) - auth headers and the host are ignored, so a cassette
+recorded against openrouter.ai replays against any base URL.
+
+Replay can simulate provider latency (fixed delay and/or a multiple of the
+originally recorded duration) so pipeline performance work can be measured
+on a machine without network access.
+
+Configuration (environment):
+    GSW_LLM_BASE_URL            OpenAI-compatible endpoint (default: OpenRouter)
+    GSW_CASSETTE_DIR            Cassette directory (enables the transport)
+    GSW_CASSETTE_MODE           record | replay | auto (default: replay)
+    GSW_CASSETTE_LATENCY        Fixed replay delay in seconds (default: 0)
+    GSW_CASSETTE_LATENCY_SCALE  Replay delay as multiple of recorded time (default: 0)
+
+Usage:
+    GSW_CASSETTE_DIR=data/cassettes GSW_CASSETTE_MODE=record \
+        python gsw_pipeline.py process --domain family --limit 20
+    GSW_CASSETTE_DIR=data/cassettes GSW_CASSETTE_MODE=replay \
+        python gsw_pipeline.py process --domain family --limit 20 --calibration
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+
+CASSETTE_MODES = ("record", "replay", "auto")
+
+# Placeholder credential so components build their clients in replay mode
+REPLAY_API_KEY = "cassette-replay"
+
+# Headers that describe the wire encoding of the original body, which is
+# stored decoded
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMissError(httpx.TransportError):
+    """Raised in replay mode when no recording matches a request."""
+
+
+def normalize_request(request: httpx.Request) -> Dict[str, Any]:
+    """
+    Reduce a request to the parts that determine the LLM response.
+
+    The JSON body is decoded and re-encoded canonically so key order and
+    whitespace in the serialized payload do not affect matching.
+    """
+    body: Any = request.content.decode("utf-8", errors="replace")
+    try:
+        body = json.loads(body) if body else None
+    except json.JSONDecodeError:
+        pass
+
+    return {
+        "method": request.method,
+        # Endpoint only ("chat/completions") - the base path differs per provider
+        "path": "/".join(request.url.path.strip("/").split("/")[-2:]),
+        "body": body,
+    }
+
+
+def request_hash(request: httpx.Request) -> str:
+    """Stable hash of a normalized request."""
+    canonical = json.dumps(normalize_request(request), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """
+    httpx transport that records LLM exchanges to, and replays them from,
+    a directory of cassette files (one JSON file per request hash).
+    """
+
+    def __init__(
+        self,
+        cassette_dir: Path,
+        mode: str = "replay",
+        inner: Optional[httpx.BaseTransport] = None,
+        latency: float = 0.0,
+        latency_scale: float = 0.0
+    ):
+        """
+        Args:
+            cassette_dir: Directory holding the cassette files
+            mode: "record", "replay" or "auto"
+            inner: Transport used for live requests (default: HTTPTransport)
+            latency: Fixed delay added to every replayed response (seconds)
+            latency_scale: Additional delay as a multiple of the recorded
+                request duration (1.0 reproduces the original timing)
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (expected one of {CASSETTE_MODES})")
+
+        self.cassette_dir = Path(cassette_dir)
+        self.mode = mode
+        self.inner = inner
+        self.latency = latency
+        self.latency_scale = latency_scale
+
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path_for(self, key: str) -> Path:
+        return self.cassette_dir / f"{key}.json"
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        key = request_hash(request)
+        path = self._path_for(key)
+
+        if self.mode in ("replay", "auto") and path.exists():
+            return self._replay(path, request)
+
+        if self.mode == "replay":
+            self.misses += 1
+            raise CassetteMissError(
+                f"No cassette recording for {request.method} {request.url.path} ({key[:12]})",
+                request=request
+            )
+
+        return self._record(path, request)
+
+    def _replay(self, path: Path, request: httpx.Request) -> httpx.Response:
+        """Serve a recorded response."""
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+
+        recorded = entry["response"]
+        delay = self.latency + self.latency_scale * recorded.get("elapsed", 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        self.hits += 1
+        headers = dict(recorded.get("headers", {}))
+        headers["x-gsw-cassette"] = "hit"
+        return httpx.Response(
+            status_code=recorded["status_code"],
+            headers=headers,
+            content=recorded["body"].encode("utf-8"),
+            request=request
+        )
+
+    def _record(self, path: Path, request: httpx.Request) -> httpx.Response:
+        """Forward a request to the network and save successful exchanges."""
+        if self.inner is None:
+            self.inner = httpx.HTTPTransport()
+
+        started = time.perf_counter()
+        response = self.inner.handle_request(request)
+        body = response.read()
+        elapsed = time.perf_counter() - started
+        response.close()
+
+        headers = {
+            k: v for k, v in response.headers.items()
+            if k.lower() not in _DROPPED_HEADERS
+        }
+
+        if 200 <= response.status_code < 300:
+            entry = {
+                "request": normalize_request(request),
+                "response": {
+                    "status_code": response.status_code,
+                    "headers": headers,
+                    "body": body.decode("utf-8", errors="replace"),
+                    "elapsed": round(elapsed, 4),
+                },
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            # Write atomically - several components may record concurrently
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self.recorded += 1
+
+        headers["x-gsw-cassette"] = "recorded"
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            content=body,
+            request=request
+        )
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+
+def llm_base_url() -> str:
+    """Base URL for chat completions (GSW_LLM_BASE_URL overrides OpenRouter)."""
+    return os.getenv("GSW_LLM_BASE_URL") or DEFAULT_BASE_URL
+
+
+def cassette_transport_from_env(
+    inner: Optional[httpx.BaseTransport] = None
+) -> Optional[CassetteTransport]:
+    """
+    Build a CassetteTransport from GSW_CASSETTE_* variables, if configured.
+
+    Args:
+        inner: Transport used for live requests when recording
+    """
+    cassette_dir = os.getenv("GSW_CASSETTE_DIR")
+    if not cassette_dir:
+        return None
+
+    return CassetteTransport(
+        Path(cassette_dir),
+        mode=os.getenv("GSW_CASSETTE_MODE", "replay"),
+        inner=inner,
+        latency=float(os.getenv("GSW_CASSETTE_LATENCY", "0") or 0),
+        latency_scale=float(os.getenv("GSW_CASSETTE_LATENCY_SCALE", "0") or 0)
+    )
+
+
+def replay_api_key() -> Optional[str]:
+    """
+    Placeholder API key when replaying cassettes without credentials.
+
+    Lets components that require a key build their clients on an
+    air-gapped machine. Returns None outside replay mode.
+    """
+    if os.getenv("GSW_CASSETTE_DIR") and os.getenv("GSW_CASSETTE_MODE", "replay") == "replay":
+        return REPLAY_API_KEY
+    return None
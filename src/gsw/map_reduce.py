@@ -0,0 +1,326 @@
+"""
+Map-Reduce Reconciliation - Local Workspaces per Document, Merged in Parallel
+
+Sequential reconciliation runs on one core because every chunk mutates the
+one GlobalWorkspace. In map-reduce mode the pipeline buffers each
+document's extractions instead and:
+
+1. map:    reconciles every document into its own local GlobalWorkspace in
+           a worker process (rule-based reconciler, no LLM calls); each
+           worker takes a contiguous group of documents and merges their
+           local workspaces before returning one
+2. reduce: merges the workers' workspaces pairwise in a parallel tree
+           reduction with an entity-resolving merge
+3. merges the reduced workspace into the domain workspace
+
+Actors of one document are already resolved by the map step, so the merge
+only resolves cross-document entities: cross-case actors (judges, courts,
+legislation, see partitions.is_cross_case) with the same type and a
+shared name or alias become one actor. Every other actor is copied, with
+ids that collide across documents renamed (references included) instead
+of overwritten as merge_workspaces does.
+
+Pending questions are answered within their own document.
+"""
+
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.gsw.legal_reconciler import LegalReconciler
+from src.gsw.partitions import is_cross_case
+from src.logic.gsw_schema import Actor, ChunkExtraction, GlobalWorkspace
+
+
+RECONCILE_MODES = ("sequential", "map_reduce")
+
+
+# ============================================================================
+# MAP: ONE DOCUMENT -> LOCAL WORKSPACE
+# ============================================================================
+
+def reconcile_document(
+    domain: str,
+    items: List[Tuple[ChunkExtraction, str]]
+) -> GlobalWorkspace:
+    """
+    Reconcile the extractions of one document into a fresh local workspace.
+
+    Args:
+        domain: Domain of the workspace
+        items: (extraction, chunk text) pairs in chunk order
+
+    Returns:
+        The document's local GlobalWorkspace
+    """
+    reconciler = LegalReconciler(use_openrouter=False, scope="domain")
+    workspace = GlobalWorkspace(domain=domain)
+    for extraction, text in items:
+        reconciler.reconcile(extraction, workspace, text)
+    workspace.document_count = 1
+    return workspace
+
+
+# ============================================================================
+# REDUCE: ENTITY-RESOLVING MERGE
+# ============================================================================
+
+def _resolve_cross_case(target: GlobalWorkspace, actor: Actor) -> Optional[Actor]:
+    """The target's cross-case actor that is the same entity as actor (or None)."""
+    keys = [actor.name] + list(actor.aliases)
+    candidate_ids = set()
+    for key in keys:
+        candidate_ids |= target.actor_ids_by_name(key)
+    for actor_id in sorted(candidate_ids, key=target.actor_order):
+        existing = target.actors[actor_id]
+        if existing.actor_type == actor.actor_type and is_cross_case(existing):
+            return existing
+    return None
+
+
+def _unique_id(taken: Dict[str, Any], item_id: str, reserved: Optional[Set[str]] = None) -> str:
+    """item_id, or item_id with a numeric suffix if the target already has it."""
+    reserved = reserved or set()
+    if item_id not in taken and item_id not in reserved:
+        return item_id
+    n = 2
+    while f"{item_id}_{n}" in taken or f"{item_id}_{n}" in reserved:
+        n += 1
+    return f"{item_id}_{n}"
+
+
+def merge_resolved(target: GlobalWorkspace, source: GlobalWorkspace) -> int:
+    """
+    Merge source into target, resolving cross-document entities.
+
+    Source elements are moved, not copied: source should not be used after
+    the merge.
+
+    Args:
+        target: Workspace to merge into (modified in place)
+        source: Workspace of other documents
+
+    Returns:
+        Number of source actors resolved to an existing target actor
+    """
+    actor_ids: Dict[str, str] = {}
+    link_ids: Dict[str, str] = {}
+    resolved = 0
+
+    for link_id in source.spatio_temporal_links:
+        link_ids[link_id] = _unique_id(target.spatio_temporal_links, link_id)
+
+    # Actors: resolve cross-case entities, rename colliding ids
+    merges: List[Tuple[Actor, Actor]] = []
+    added: List[Tuple[str, Actor]] = []
+    reserved: Set[str] = set()
+    for actor_id, actor in source.actors.items():
+        existing = _resolve_cross_case(target, actor) if is_cross_case(actor) else None
+        if existing is not None:
+            actor_ids[actor_id] = existing.id
+            merges.append((existing, actor))
+            resolved += 1
+        else:
+            actor_ids[actor_id] = _unique_id(target.actors, actor_id, reserved)
+            reserved.add(actor_ids[actor_id])
+            added.append((actor_id, actor))
+
+    def actor_ref(ref: Optional[str]) -> Optional[str]:
+        return actor_ids.get(ref, ref) if ref else ref
+
+    for actor_id, actor in source.actors.items():
+        actor.spatio_temporal_link_ids = [link_ids.get(x, x) for x in actor.spatio_temporal_link_ids]
+        for state in actor.states:
+            state.entity_id = actor_ids[actor_id]
+
+    for existing, actor in merges:
+        LegalReconciler._merge_actors(existing, actor)
+        for link_id in actor.spatio_temporal_link_ids:
+            existing.add_link(link_id)
+        target.reindex_actor(existing)
+
+    for actor_id, actor in added:
+        actor.id = actor_ids[actor_id]
+        target.add_actor(actor)
+
+    # Other elements: rewrite actor and link references
+    for verb in source.verb_phrases.values():
+        verb.id = _unique_id(target.verb_phrases, verb.id)
+        verb.agent_id = actor_ref(verb.agent_id)
+        verb.patient_ids = [actor_ref(x) for x in verb.patient_ids]
+        verb.temporal_id = actor_ref(verb.temporal_id)
+        verb.spatial_id = actor_ref(verb.spatial_id)
+        target.add_verb_phrase(verb)
+
+    for question in source.questions.values():
+        question.id = _unique_id(target.questions, question.id)
+        question.target_entity_id = actor_ref(question.target_entity_id)
+        question.answer_entity_id = actor_ref(question.answer_entity_id)
+        target.add_question(question)
+
+    for link_id, link in source.spatio_temporal_links.items():
+        link.id = link_ids[link_id]
+        link.linked_entity_ids = list(dict.fromkeys(actor_ref(x) for x in link.linked_entity_ids))
+        target.add_spatio_temporal_link(link)
+
+    for actor_id, summary in source.entity_summaries.items():
+        target.entity_summaries.setdefault(actor_ids.get(actor_id, actor_id), summary)
+
+    target.chunk_count += source.chunk_count
+    target.document_count += source.document_count
+    target.domain = target.domain or source.domain
+    target.touch()
+    return resolved
+
+
+def reconcile_documents(
+    domain: str,
+    documents: List[List[Tuple[ChunkExtraction, str]]]
+) -> Tuple[Optional[GlobalWorkspace], int]:
+    """
+    Map a group of documents to local workspaces and merge them in order.
+
+    Workers handle a contiguous group each, so only one workspace per
+    worker crosses a process boundary.
+
+    Returns:
+        (merged workspace of the group, actors resolved while merging)
+    """
+    return tree_reduce([reconcile_document(domain, items) for items in documents])
+
+
+def _merge_pair(pair: Tuple[GlobalWorkspace, GlobalWorkspace]) -> Tuple[GlobalWorkspace, int]:
+    target, source = pair
+    resolved = merge_resolved(target, source)
+    return target, resolved
+
+
+def tree_reduce(
+    workspaces: List[GlobalWorkspace],
+    executor: Optional[Executor] = None
+) -> Tuple[Optional[GlobalWorkspace], int]:
+    """
+    Merge workspaces pairwise, level by level, keeping document order.
+
+    Args:
+        workspaces: Local workspaces to merge
+        executor: Runs the merges of one level in parallel (None: in process)
+
+    Returns:
+        (merged workspace or None if there were none, actors resolved)
+    """
+    resolved = 0
+    level = list(workspaces)
+    while len(level) > 1:
+        pairs = [(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        leftover = [level[-1]] if len(level) % 2 else []
+        results = executor.map(_merge_pair, pairs) if executor else map(_merge_pair, pairs)
+        level = []
+        for workspace, count in results:
+            level.append(workspace)
+            resolved += count
+        level.extend(leftover)
+    return (level[0] if level else None), resolved
+
+
+# ============================================================================
+# PIPELINE INTEGRATION
+# ============================================================================
+
+class MapReduceReconciler:
+    """
+    Buffers extractions per document and reconciles them with map-reduce.
+
+    Has the reconcile() signature of LegalReconciler so the pipeline can use
+    either; call flush() to integrate the buffered documents.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers: Worker processes (default: CPU count; 1 runs in process)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._buffer: Dict[str, List[Tuple[ChunkExtraction, str]]] = {}
+
+        self.stats = {
+            "documents": 0,
+            "flushes": 0,
+            "resolved": 0,
+            "map_seconds": 0.0,
+            "reduce_seconds": 0.0,
+        }
+
+    def reconcile(
+        self,
+        new_extraction: ChunkExtraction,
+        workspace: GlobalWorkspace,
+        chunk_text: str
+    ) -> Tuple[ChunkExtraction, List[Dict[str, Any]]]:
+        """Buffer an extraction for its document (integrated on flush)."""
+        document_id = new_extraction.source_document_id or new_extraction.chunk_id
+        self._buffer.setdefault(document_id, []).append((new_extraction, chunk_text))
+        return new_extraction, []
+
+    def flush(self, workspace: GlobalWorkspace) -> int:
+        """
+        Map the buffered documents to local workspaces, reduce them and merge
+        the result into the workspace.
+
+        If the map or reduce step fails the documents stay buffered for the
+        next flush (the workspace is untouched). Once merging into the
+        workspace has started they are dropped either way, since a retry
+        would duplicate what was already merged.
+
+        Returns:
+            Number of documents integrated
+        """
+        if not self._buffer:
+            return 0
+        documents = list(self._buffer.values())
+        domain = workspace.domain
+
+        # One contiguous group of documents per worker keeps document order
+        workers = min(self.workers, len(documents))
+        size = -(-len(documents) // workers)
+        groups = [documents[i:i + size] for i in range(0, len(documents), size)]
+
+        executor = ProcessPoolExecutor(max_workers=len(groups)) if len(groups) > 1 else None
+        try:
+            started = time.perf_counter()
+            if executor:
+                results = list(executor.map(reconcile_documents, [domain] * len(groups), groups))
+            else:
+                results = [reconcile_documents(domain, group) for group in groups]
+            self.stats["map_seconds"] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            merged, resolved = tree_reduce([ws for ws, _ in results], executor)
+            resolved += sum(count for _, count in results)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        try:
+            resolved += merge_resolved(workspace, merged)
+        finally:
+            self._buffer = {}
+        self.stats["reduce_seconds"] += time.perf_counter() - started
+        self.stats["documents"] += len(documents)
+        self.stats["flushes"] += 1
+        self.stats["resolved"] += resolved
+        return len(documents)
+
+    @property
+    def buffered(self) -> int:
+        """Documents waiting for the next flush."""
+        return len(self._buffer)
+
+    def summary(self) -> str:
+        """One-line summary of map-reduce work."""
+        stats = self.stats
+        return (f"{stats['documents']} documents in {stats['flushes']} flushes on "
+                f"{self.workers} workers | map {stats['map_seconds']:.2f}s, "
+                f"reduce {stats['reduce_seconds']:.2f}s | "
+                f"{stats['resolved']} cross-document entities resolved")
@@ -0,0 +1,141 @@
+"""
+Reconciliation Partitions - Match Actors Within Their Own Case
+
+A domain workspace holds the actors of many judgments. Matching a new actor
+against all of them merges "the husband" of one case into the husband of
+another, and the cost of every chunk grows with the domain instead of the
+case. WorkspacePartitions splits the actors for reconciliation:
+
+- one partition per source document (actor.metadata["source_document_id"])
+- a domain-level registry of cross-case actors: judges and registrars,
+  courts and other organisations, and legislation
+
+A new actor is matched against its document's partition first; cross-case
+actors that found no match there are matched against the registry. Each
+partition is a GlobalWorkspace shell over the same Actor objects, so the
+workspace name/role indexes and candidate retrieval work unchanged, and the
+work per chunk is bounded by the size of the case (plus the registry).
+
+Configuration (environment):
+    GSW_RECONCILE_SCOPE   "document" (default) or "domain" (match against
+                          the whole workspace, as before)
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from src.gsw.candidates import CandidateRetriever
+from src.logic.gsw_schema import Actor, ActorType, GlobalWorkspace
+
+
+RECONCILE_SCOPES = ("document", "domain")
+
+# Actor types and roles that are the same entity across cases
+CROSS_CASE_TYPES = {ActorType.ORGANIZATION}
+JUDICIAL_ROLE_PATTERN = re.compile(r"\b(?:judge|justice|magistrate|registrar|president)\b", re.IGNORECASE)
+LEGISLATION_PATTERN = re.compile(r"\b(?:Act|Regulations?|Rules|Code)\b")
+
+REGISTRY_KEY = "__registry__"
+
+
+def reconcile_scope(scope: Optional[str] = None) -> str:
+    """Reconciliation scope from the argument or GSW_RECONCILE_SCOPE."""
+    scope = scope or os.getenv("GSW_RECONCILE_SCOPE", "document")
+    if scope not in RECONCILE_SCOPES:
+        raise ValueError(f"Unknown reconcile scope {scope!r} (expected one of {RECONCILE_SCOPES})")
+    return scope
+
+
+def is_cross_case(actor: Actor) -> bool:
+    """True for actors that belong in the domain registry (judges, courts, legislation)."""
+    if actor.actor_type in CROSS_CASE_TYPES:
+        return True
+    if actor.actor_type == ActorType.PERSON:
+        return any(JUDICIAL_ROLE_PATTERN.search(role) for role in actor.roles)
+    if actor.actor_type == ActorType.LEGAL_DOCUMENT:
+        return bool(LEGISLATION_PATTERN.search(actor.name))
+    return False
+
+
+@dataclass
+class Partition:
+    """Actors of one document (or the registry) with their own indexes."""
+    workspace: GlobalWorkspace
+    candidates: CandidateRetriever
+
+
+class WorkspacePartitions:
+    """
+    Per-document partitions plus a cross-case registry over a domain workspace.
+    """
+
+    def __init__(self, role_mappings: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            role_mappings: Legal terms -> related roles, for candidate retrieval
+        """
+        self.role_mappings = role_mappings
+        # Candidate retrieval stats shared by all partitions
+        self.candidate_stats = {"queries": 0, "candidates": 0, "workspace_actors": 0}
+
+        self.partitions: Dict[str, Partition] = {}
+        self.registry = self._new_partition("")
+        self._member_of: Dict[str, Set[str]] = {}     # actor id -> partition keys
+        self._workspace_id: Optional[int] = None
+
+    def sync(self, workspace: GlobalWorkspace) -> None:
+        """Partition workspace actors not seen yet (e.g. after loading a workspace)."""
+        if self._workspace_id != id(workspace):
+            self.partitions = {}
+            self.registry = self._new_partition(workspace.domain)
+            self._member_of = {}
+            self._workspace_id = id(workspace)
+        if len(self._member_of) == len(workspace.actors):
+            return
+        for actor_id, actor in workspace.actors.items():
+            if actor_id not in self._member_of:
+                self.add(actor, (actor.metadata or {}).get("source_document_id", ""))
+
+    def partition(self, document_id: str) -> Partition:
+        """The partition of a document (created on first use)."""
+        partition = self.partitions.get(document_id)
+        if partition is None:
+            partition = self._new_partition(self.registry.workspace.domain)
+            self.partitions[document_id] = partition
+        return partition
+
+    def add(self, actor: Actor, document_id: str) -> None:
+        """Add a new workspace actor to its document's partition (and the registry)."""
+        self.partition(document_id).workspace.add_actor(actor)
+        self._member_of.setdefault(actor.id, set()).add(document_id)
+        if is_cross_case(actor):
+            self._add_to_registry(actor)
+
+    def reindex(self, actor: Actor) -> None:
+        """Re-index an actor merged in place; it joins the registry if it now qualifies."""
+        for key in self._member_of.get(actor.id, ()):
+            partition = self.registry if key == REGISTRY_KEY else self.partitions.get(key)
+            if partition is not None:
+                partition.workspace.reindex_actor(actor)
+                partition.candidates.index_actor(actor)
+        if is_cross_case(actor) and REGISTRY_KEY not in self._member_of.get(actor.id, ()):
+            self._add_to_registry(actor)
+
+    def summary(self) -> str:
+        """One-line summary of partition sizes."""
+        sizes = [len(p.workspace.actors) for p in self.partitions.values()]
+        largest = max(sizes) if sizes else 0
+        average = sum(sizes) / len(sizes) if sizes else 0.0
+        return (f"{len(sizes)} document partitions (avg {average:.1f}, max {largest} actors), "
+                f"registry {len(self.registry.workspace.actors)} cross-case actors")
+
+    def _add_to_registry(self, actor: Actor) -> None:
+        self.registry.workspace.add_actor(actor)
+        self._member_of.setdefault(actor.id, set()).add(REGISTRY_KEY)
+
+    def _new_partition(self, domain: str) -> Partition:
+        candidates = CandidateRetriever(role_mappings=self.role_mappings)
+        candidates.stats = self.candidate_stats
+        return Partition(workspace=GlobalWorkspace(domain=domain), candidates=candidates)
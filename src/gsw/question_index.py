@@ -0,0 +1,307 @@
+"""
+Question Index - Check Only the Questions a Chunk Can Answer
+
+The reconciler answers pending predictive questions with simple rules:
+
+- "when" questions:  a topic word (separate, marry, ...) appears in both the
+                     question and the chunk, and the chunk contains a date
+- "who" questions:   a person actor of the chunk has a role named in the
+                     question
+- value questions:   the chunk contains a dollar amount
+
+Checking every unanswered question of the workspace against every chunk
+costs O(chunks x questions), with the date and money regexes re-run per
+question. QuestionIndex keeps the unanswered questions in an inverted
+index instead:
+
+- when questions by topic word
+- who questions by the words of the question text (a role can only be in
+  the question if each of its words is part of a question word)
+- value questions in one bucket
+
+For each chunk the regex facts are computed once (ChunkFacts) and only the
+questions whose bucket the chunk can satisfy are checked. Answers are the
+same as checking every question in workspace order.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from src.logic.gsw_schema import ChunkExtraction, GlobalWorkspace, PredictiveQuestion
+
+
+MONTHS = "january|february|march|april|may|june|july|august|september|october|november|december"
+
+DATE_PATTERNS = [
+    re.compile(rf'(\d{{1,2}}\s+(?:{MONTHS})\s+\d{{4}})'),
+    re.compile(rf'((?:{MONTHS})\s+\d{{1,2}},?\s+\d{{4}})'),
+    re.compile(r'(\d{4}-\d{2}-\d{2})'),
+]
+
+MONEY_PATTERN = re.compile(r'\$[\d,]+(?:\.\d{2})?(?:\s*(?:million|m))?')
+
+# Topics of "when" questions that a dated chunk can answer
+TOPIC_WORDS = ["separate", "marry", "divorce", "hear", "order", "file"]
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def question_kind(question_text: str) -> Optional[str]:
+    """Rule that can answer a question: "when", "who", "value" or None."""
+    q_text = question_text.lower()
+    if "when" in q_text:
+        return "when"
+    if "who" in q_text:
+        return "who"
+    if "value" in q_text or "worth" in q_text:
+        return "value"
+    return None
+
+
+@dataclass
+class ChunkFacts:
+    """Regex facts of one chunk, computed once and shared by all questions."""
+    text_lower: str
+    date: Optional[str] = None
+    money: Optional[str] = None
+    topics: Set[str] = field(default_factory=set)
+
+    @classmethod
+    def from_text(cls, chunk_text: str) -> "ChunkFacts":
+        chunk_lower = chunk_text.lower()
+        facts = cls(text_lower=chunk_lower)
+        facts.topics = {word for word in TOPIC_WORDS if word in chunk_lower}
+        for pattern in DATE_PATTERNS:
+            matches = pattern.findall(chunk_lower)
+            if matches:
+                facts.date = matches[0]
+                break
+        money = MONEY_PATTERN.findall(chunk_lower)
+        if money:
+            facts.money = money[0]
+        return facts
+
+
+def answer_question(
+    question: PredictiveQuestion,
+    facts: ChunkFacts,
+    extraction: ChunkExtraction
+) -> Optional[str]:
+    """
+    Answer a question from a chunk's facts and extraction.
+
+    Returns:
+        The answer text, or None if the chunk does not answer the question
+    """
+    q_text = question.question_text.lower()
+    kind = question_kind(q_text)
+
+    if kind == "when":
+        # The first topic word of the question decides, as long as the chunk has a date
+        for word in TOPIC_WORDS:
+            if word in q_text and word in facts.topics:
+                return facts.date
+        return None
+
+    if kind == "who":
+        for actor in extraction.actors:
+            if actor.actor_type.value == "person":
+                if any(role.lower() in q_text for role in actor.roles):
+                    return actor.name
+        return None
+
+    if kind == "value":
+        return facts.money
+
+    return None
+
+
+class QuestionIndex:
+    """
+    Inverted index over a workspace's unanswered questions.
+    """
+
+    def __init__(self):
+        self._when: Dict[str, Set[str]] = {}      # topic word -> question ids
+        self._who: Dict[str, Set[str]] = {}       # question word -> question ids
+        self._value: Set[str] = set()
+        self._keys: Dict[str, List[str]] = {}     # question id -> its when/who keys
+        self._order: Dict[str, int] = {}          # unanswered question id -> position
+        self._known: Dict[str, int] = {}          # every question id seen -> position
+        self._next = 0
+        self._resort = False                      # _order no longer in position order
+        self._workspace_id: Optional[int] = None
+
+        self.stats = {"chunks": 0, "checked": 0, "unanswered": 0}
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def sync(self, workspace: GlobalWorkspace) -> None:
+        """Index questions added to the workspace since the last sync."""
+        if self._workspace_id != id(workspace):
+            self._when, self._who, self._value, self._keys = {}, {}, set(), {}
+            self._order, self._known, self._next, self._resort = {}, {}, 0, False
+            self._workspace_id = id(workspace)
+        if len(self._known) == len(workspace.questions):
+            return
+        for question_id in [q for q in self._known if q not in workspace.questions]:
+            self.remove(question_id)
+            del self._known[question_id]
+        for question_id, question in workspace.questions.items():
+            if question_id not in self._known:
+                self.add(question)
+
+    def add(self, question: PredictiveQuestion) -> None:
+        """
+        Index a question (answered questions are only remembered as seen).
+
+        A question stored under an id seen before replaces the old one and
+        keeps its position, as overwriting workspace.questions[id] does.
+        """
+        self.remove(question.id)
+        if question.id not in self._known:
+            self._known[question.id] = self._next
+            self._next += 1
+        if question.answerable:
+            return
+
+        q_text = question.question_text.lower()
+        kind = question_kind(q_text)
+        keys: List[str] = []
+        if kind == "when":
+            keys = [word for word in TOPIC_WORDS if word in q_text]
+            for word in keys:
+                self._when.setdefault(word, set()).add(question.id)
+        elif kind == "who":
+            keys = sorted(set(WORD_PATTERN.findall(q_text)))
+            for word in keys:
+                self._who.setdefault(word, set()).add(question.id)
+        elif kind == "value":
+            self._value.add(question.id)
+        self._keys[question.id] = keys
+
+        # Questions no rule answers are still pending for the LLM prompt
+        position = self._known[question.id]
+        if self._order and position < next(reversed(self._order.values())):
+            self._resort = True
+        self._order[question.id] = position
+
+    def remove(self, question_id: str) -> None:
+        """Drop an answered or deleted question from the buckets."""
+        if self._order.pop(question_id, None) is None:
+            return
+        for key in self._keys.pop(question_id, []):
+            for buckets in (self._when, self._who):
+                ids = buckets.get(key)
+                if ids is not None and question_id in ids:
+                    ids.discard(question_id)
+                    if not ids:
+                        del buckets[key]
+        self._value.discard(question_id)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def candidates(self, facts: ChunkFacts, extraction: ChunkExtraction) -> List[str]:
+        """Ids of the indexed questions a chunk might answer, in workspace order."""
+        ids: Set[str] = set()
+
+        if facts.date:
+            for word in facts.topics:
+                ids |= self._when.get(word, set())
+
+        for actor in extraction.actors:
+            if actor.actor_type.value != "person":
+                continue
+            for role in actor.roles:
+                ids |= self._who_candidates(role.lower())
+
+        if facts.money:
+            ids |= self._value
+
+        return sorted(ids, key=self._order.__getitem__)
+
+    def answer(
+        self,
+        workspace: GlobalWorkspace,
+        chunk_text: str,
+        extraction: ChunkExtraction
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer the workspace's pending questions that a chunk can answer.
+
+        Args:
+            workspace: Workspace holding the questions
+            chunk_text: Text of the chunk
+            extraction: The chunk's extraction (for "who" answers)
+
+        Returns:
+            Answers in the reconciler's format, in workspace question order
+        """
+        self.sync(workspace)
+        facts = ChunkFacts.from_text(chunk_text)
+        candidate_ids = self.candidates(facts, extraction)
+
+        self.stats["chunks"] += 1
+        self.stats["checked"] += len(candidate_ids)
+        self.stats["unanswered"] += len(self._order)
+
+        answered = []
+        for question_id in candidate_ids:
+            question = workspace.questions.get(question_id)
+            if question is None or question.answerable:
+                self.remove(question_id)
+                continue
+            answer_found = answer_question(question, facts, extraction)
+            if answer_found:
+                answered.append({
+                    "question_id": question.id,
+                    "answer_text": str(answer_found).title(),
+                    "answer_entity_id": None,
+                    "confidence": 0.7
+                })
+        return answered
+
+    def unanswered(self, workspace: GlobalWorkspace, limit: Optional[int] = None) -> List[PredictiveQuestion]:
+        """Pending questions in workspace order, without scanning answered ones."""
+        self.sync(workspace)
+        if self._resort:
+            self._order = dict(sorted(self._order.items(), key=lambda item: item[1]))
+            self._resort = False
+        pending = []
+        stale = []
+        for question_id in self._order:
+            question = workspace.questions.get(question_id)
+            if question is None or question.answerable:
+                stale.append(question_id)
+                continue
+            pending.append(question)
+            if limit is not None and len(pending) >= limit:
+                break
+        for question_id in stale:
+            self.remove(question_id)
+        return pending
+
+    def summary(self) -> str:
+        """One-line summary of questions checked against questions pending."""
+        chunks = self.stats["chunks"]
+        if not chunks:
+            return "no chunks reconciled"
+        return (f"{self.stats['checked'] / chunks:.1f} questions checked per chunk "
+                f"of {self.stats['unanswered'] / chunks:.0f} pending on average")
+
+    def _who_candidates(self, role: str) -> Set[str]:
+        """Who questions whose text may contain a role (verified by answer_question)."""
+        words = WORD_PATTERN.findall(role)
+        if not words:
+            return set().union(*self._who.values()) if self._who else set()
+        longest = max(words, key=len)
+        ids: Set[str] = set()
+        for word, question_ids in self._who.items():
+            if longest in word:
+                ids |= question_ids
+        return ids
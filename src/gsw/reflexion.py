@@ -0,0 +1,178 @@
+"""
+Reflexion Policy - Decide When an Extraction Is Worth Reviewing
+
+A reflexion (self-review) pass costs a full LLM call per document. Most
+reviews change nothing, so the policy decides per extraction:
+
+- off:        never review
+- sampled:    review a random fraction (sample_rate) of extractions
+- triggered:  review only when cheap heuristics flag a likely defect
+- always:     review every extraction (previous legacy behaviour)
+
+Triggers (no LLM involved):
+- missing_applicant / missing_respondent: no actor holds a party role
+- no_temporal: no temporal actor (dates were not captured)
+- truncated: the operator response was cut short or needed JSON repair
+
+The policy also tracks how often reviews actually changed something, per
+trigger, so unproductive triggers can be switched off.
+
+Configuration (environment):
+    GSW_REFLEXION        off | sampled | triggered | always (default: triggered)
+    GSW_REFLEXION_RATE   Sample rate for "sampled" mode (default: 0.1)
+"""
+
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+from src.logic.gsw_schema import ChunkExtraction
+
+
+REFLEXION_MODES = ("off", "sampled", "triggered", "always")
+
+APPLICANT_ROLES = {"applicant", "appellant", "plaintiff", "claimant", "petitioner", "prosecutor"}
+RESPONDENT_ROLES = {"respondent", "defendant", "accused"}
+
+
+def _has_role(labels: List[str], roles: set) -> bool:
+    """True if any label mentions one of the role words."""
+    for label in labels:
+        words = set(label.lower().replace("-", " ").split())
+        if words & roles:
+            return True
+    return False
+
+
+def extraction_triggers(extraction: ChunkExtraction) -> List[str]:
+    """Cheap heuristics flagging a ChunkExtraction for review."""
+    reasons = []
+
+    labels = []
+    for actor in extraction.actors:
+        labels.extend(actor.roles)
+        labels.extend(actor.aliases)
+
+    if not _has_role(labels, APPLICANT_ROLES):
+        reasons.append("missing_applicant")
+    if not _has_role(labels, RESPONDENT_ROLES):
+        reasons.append("missing_respondent")
+
+    if not any(a.actor_type.value == "temporal" for a in extraction.actors):
+        reasons.append("no_temporal")
+
+    metadata = extraction.metadata or {}
+    if metadata.get("truncated") or metadata.get("parse_repaired"):
+        reasons.append("truncated")
+
+    return reasons
+
+
+def case_triggers(case: Any) -> List[str]:
+    """Cheap heuristics flagging a legacy LegalCase (src.logic.schema) for review."""
+    reasons = []
+
+    labels = [p.role_in_case or "" for p in case.persons]
+    if not _has_role(labels, APPLICANT_ROLES):
+        reasons.append("missing_applicant")
+    if not _has_role(labels, RESPONDENT_ROLES):
+        reasons.append("missing_respondent")
+
+    has_dates = (
+        any(e.date for e in case.timeline)
+        or any(s.start_date for s in case.states)
+    )
+    if not has_dates:
+        reasons.append("no_temporal")
+
+    return reasons
+
+
+class ReflexionPolicy:
+    """
+    Decides whether a review pass should run and records whether it paid off.
+    """
+
+    def __init__(
+        self,
+        mode: str = "triggered",
+        sample_rate: float = 0.1,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            mode: "off", "sampled", "triggered" or "always"
+            sample_rate: Fraction of extractions reviewed in "sampled" mode
+            seed: Random seed for reproducible sampling
+        """
+        if mode not in REFLEXION_MODES:
+            raise ValueError(f"Unknown reflexion mode: {mode} (expected one of {REFLEXION_MODES})")
+
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self._random = random.Random(seed)
+
+        self.stats: Dict[str, Any] = {
+            "considered": 0,
+            "reviewed": 0,
+            "skipped": 0,
+            "changed": 0,
+            "by_trigger": {},
+        }
+
+    @classmethod
+    def from_env(cls) -> "ReflexionPolicy":
+        """Build a policy from GSW_REFLEXION / GSW_REFLEXION_RATE."""
+        return cls(
+            mode=os.getenv("GSW_REFLEXION", "triggered"),
+            sample_rate=float(os.getenv("GSW_REFLEXION_RATE", "0.1") or 0.1)
+        )
+
+    def should_review(self, reasons: List[str]) -> bool:
+        """
+        Decide whether to review, given the triggers that fired.
+
+        Args:
+            reasons: Output of extraction_triggers() / case_triggers()
+
+        Returns:
+            True if the review LLM call should be made
+        """
+        self.stats["considered"] += 1
+
+        if self.mode == "always":
+            review = True
+        elif self.mode == "sampled":
+            review = self._random.random() < self.sample_rate
+        elif self.mode == "triggered":
+            review = bool(reasons)
+        else:
+            review = False
+
+        self.stats["reviewed" if review else "skipped"] += 1
+        return review
+
+    def record_outcome(self, reasons: List[str], changed: bool) -> None:
+        """Record whether a review that ran changed the extraction."""
+        if changed:
+            self.stats["changed"] += 1
+        for reason in reasons or ["untriggered"]:
+            bucket = self.stats["by_trigger"].setdefault(reason, {"reviewed": 0, "changed": 0})
+            bucket["reviewed"] += 1
+            if changed:
+                bucket["changed"] += 1
+
+    def summary(self) -> str:
+        """One-line summary of review decisions and yield."""
+        stats = self.stats
+        line = (
+            f"mode={self.mode} reviewed={stats['reviewed']}/{stats['considered']} "
+            f"changed={stats['changed']}"
+        )
+        if stats["by_trigger"]:
+            triggers = ", ".join(
+                f"{name} {b['changed']}/{b['reviewed']}"
+                for name, b in sorted(stats["by_trigger"].items())
+            )
+            line += f" (changed/reviewed by trigger: {triggers})"
+        return line
@@ -0,0 +1,680 @@
+"""
+Rule-Based Operator - Deterministic Extraction Without an LLM
+
+A drop-in replacement for LegalOperator that builds a ChunkExtraction from
+regular expressions only. It is several orders of magnitude faster and
+costs nothing, which makes it suitable for a first pass over the whole
+corpus (or as the fallback when no API key is configured).
+
+What it extracts:
+- Parties: "Applicant: John Smith", "John Smith (the husband)",
+  "John Smith (Applicant/Husband)" and the case name of the citation
+  ("Smith & Smith [2024] FamCA 123", "R v Jones")
+- Judges: "JUDGE: Wilson J", "Before: Justice Williams", "Wilson J"
+- Court: citation court code resolved through HIERARCHY_MAP
+- Dates: the formats of extract_dates_from_text, searched only around month
+  names and numeric date separators
+- Locations: extract_locations_from_text
+- Assets: dollar amounts (reconciler money pattern) in a sentence naming an
+  asset; purchase prices are kept apart from the current value
+- Questions: who/when/where/how much templates, answered where possible
+
+Recall is far below the LLM operator; precision is favoured so rule-based
+workspaces can be refined later by LLM passes.
+"""
+
+import re
+import sys
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.logic.gsw_schema import (
+    Actor, ActorType, State, VerbPhrase, PredictiveQuestion,
+    SpatioTemporalLink, ChunkExtraction, QuestionType, LinkType,
+    OntologyContext
+)
+from src.gsw.legal_spacetime import extract_locations_from_text
+from src.gsw.reflexion import ReflexionPolicy
+from src.ingestion.classification_config import HIERARCHY_MAP
+
+
+# ============================================================================
+# PATTERNS
+# ============================================================================
+
+# Capitalised words on one line ("John Smith", "Maria de Souza")
+_NAME = r"[A-Z][A-Za-z0-9'\-]+(?:[ \t]+(?:[A-Z][A-Za-z0-9'\-]+|de|van|von|di|le))*"
+
+PARTY_ROLES = {
+    "applicant": "Applicant",
+    "appellant": "Appellant",
+    "plaintiff": "Plaintiff",
+    "claimant": "Claimant",
+    "respondent": "Respondent",
+    "defendant": "Defendant",
+    "accused": "Accused",
+}
+
+# Relationship terms used as aliases ("the husband")
+RELATIONSHIP_ROLES = {
+    "husband": "Husband",
+    "wife": "Wife",
+    "father": "Father",
+    "mother": "Mother",
+    "child": "Child",
+}
+
+# Labels are found from their separator: a scan for ":" is far cheaper than
+# trying a case-insensitive label pattern at every position of the text.
+# "Applicant: John Smith" / "RESPONDENT - Jane Smith" (label read lowercased)
+PARTY_LABEL_PATTERN = re.compile(r"\b(" + "|".join(PARTY_ROLES) + r")s?[ \t]*$")
+PARTY_LABEL_SEPARATORS = (":", "-", "–")
+LABELLED_NAME_PATTERN = re.compile(r"[ \t]*(" + _NAME + r")")
+
+# "(the husband)" / "(respondent)" / "(Applicant/Husband)" after a party name
+_ROLE_TERM = r"(?:the\s+)?(?:" + "|".join(list(PARTY_ROLES) + list(RELATIONSHIP_ROLES)) + r")"
+PARTY_PAREN_PATTERN = re.compile(
+    r"\((?i:(" + _ROLE_TERM + r"(?:[ \t]*/[ \t]*" + _ROLE_TERM + r")*))\)"
+)
+# The name right before such a parenthesis, on the same line
+NAME_BEFORE_PATTERN = re.compile(r"(" + _NAME + r")[ \t]*$")
+
+# "Smith & Smith [2024] FamCA 123" / "R v Jones [2019] NSWCCA 12"
+CITATION_PATTERN = re.compile(
+    r"(" + _NAME + r")[ \t]+(?:&|v\.?|and)[ \t]+(" + _NAME + r")[ \t]+\[(\d{4})\][ \t]+([A-Za-z]+)[ \t]+(\d+)"
+)
+CITATION_CODE_PATTERN = re.compile(r"\[(\d{4})\]\s+([A-Za-z]+)\s+(\d+)")
+
+# "JUDGE: Wilson J", "Before: Justice Williams", "CORAM: The Hon. Judge Lee"
+JUDGE_LABEL_PATTERN = re.compile(r"\b(?:judges?|before|coram|magistrate)[ \t]*$")
+JUDGE_NAME_PATTERN = re.compile(
+    r"[ \t]*((?i:(?:the[ \t]+)?(?:hon(?:ourable)?\.?[ \t]+)?(?:chief[ \t]+)?(?:justice|judge|magistrate)[ \t]+)?)"
+    r"(" + _NAME + r")"
+)
+# "Wilson J", "Payne JJA" - judicial suffixes
+JUDGE_SUFFIXES = r"CJ|ACJ|JJA|JA|JJ|J|P|FM|DCJ"
+JUDGE_SUFFIX_PATTERN = re.compile(r"([A-Z][a-z]{2,})[ \t]+(" + JUDGE_SUFFIXES + r")\b")
+
+# The date formats of extract_dates_from_text, matched on lowercased text.
+# Every date contains a month name or a numeric separator, so the pattern is
+# only tried in a short window around those anchors.
+_MONTHS = "january|february|march|april|may|june|july|august|september|october|november|december"
+DATE_PATTERN = re.compile(
+    r"\b(?:\d{1,2}\s+(?:" + _MONTHS + r")\s+\d{4}"
+    r"|(?:" + _MONTHS + r")\s+\d{1,2},?\s+\d{4}"
+    r"|\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}/\d{1,2}/\d{4})"
+)
+DATE_ANCHORS = _MONTHS.split("|") + ["-", "/"]
+DATE_WINDOW = (8, 24)   # Characters searched before and after an anchor
+
+# Same money pattern the reconciler uses to answer value questions
+MONEY_PATTERN = re.compile(r"\$[\d,]+(?:\.\d{2})?(?:\s*(?:million|m))?", re.IGNORECASE)
+
+ASSET_KEYWORDS = [
+    "matrimonial home", "home", "house", "property", "superannuation",
+    "vehicle", "car", "shares", "account", "business", "mortgage", "savings",
+]
+ASSET_PATTERN = re.compile(r"\b(" + "|".join(ASSET_KEYWORDS) + r")\b")
+
+# Words in an amount's clause marking it as what was paid, not what it is worth
+PURCHASE_PATTERN = re.compile(r"\b(?:purchas|bought|paid|acquir)")
+SENTENCE_BREAK_PATTERN = re.compile(r"[.;]\s|\n\s*\n")
+CLAUSE_BREAK_PATTERN = re.compile(r",\s|\band\b")
+
+# Events recognised in the words leading up to a date ("separated on ...")
+EVENT_KEYWORDS = [
+    # (keyword, event, RelationshipStatus value or None)
+    ("separat", "separation", "Separated"),
+    ("married", "marriage", "Married"),
+    ("marriage", "marriage", "Married"),
+    ("divorce", "divorce", "Divorced"),
+    ("cohabit", "cohabitation", "Cohabiting"),
+    ("hearing", "hearing", None),
+    ("judgment", "judgment", None),
+    ("filed", "filing", None),
+]
+
+_DATE_FORMATS = ["%d %B %Y", "%B %d %Y", "%B %d, %Y", "%Y-%m-%d", "%d/%m/%Y"]
+
+# Capitalised words the "in/at X" location pattern picks up that are not places
+_LOCATION_STOPWORDS = {
+    "the", "this", "that", "all", "any", "first", "least", "which", "paragraph",
+    "para", "page", "section", "schedule", "court", "trial", "hearing", "law",
+    "common", "its", "his", "her", "their", "some", "no", "one", "time",
+    "january", "february", "march", "april", "may", "june", "july", "august",
+    "september", "october", "november", "december",
+}
+
+
+def lower_in_place(text: str) -> str:
+    """text.lower() with every character at its original offset."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters ("İ") lowercase to two
+        lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    return lowered
+
+
+def find_all(text: str, needle: str, end: Optional[int] = None) -> Iterator[int]:
+    """Offsets of every occurrence of needle in text[:end]."""
+    end = len(text) if end is None else end
+    pos = text.find(needle, 0, end)
+    while pos != -1:
+        yield pos
+        pos = text.find(needle, pos + 1, end)
+
+
+def find_dates(lowered: str) -> Iterator[Tuple[int, int]]:
+    """Spans of the dates in lowercased text, in text order."""
+    anchors = sorted(pos for anchor in DATE_ANCHORS for pos in find_all(lowered, anchor))
+    before, after = DATE_WINDOW
+    end = 0
+    for pos in anchors:
+        if pos < end:
+            continue
+        match = DATE_PATTERN.search(lowered, max(end, pos - before), pos + after)
+        if match:
+            yield match.span()
+            end = match.end()
+
+
+def find_labels(
+    text: str,
+    lowered: str,
+    label_pattern: re.Pattern,
+    value_pattern: re.Pattern,
+    separators: Tuple[str, ...] = (":",),
+    end: Optional[int] = None
+) -> Iterator[Tuple[re.Match, re.Match]]:
+    """(label, value) matches around each separator: "LABEL: value"."""
+    for separator in separators:
+        for pos in find_all(lowered, separator, end):
+            label = label_pattern.search(lowered, max(0, pos - 24), pos)
+            if label:
+                value = value_pattern.match(text, pos + 1)
+                if value:
+                    yield label, value
+
+
+@lru_cache(maxsize=4096)
+def normalize_date(value: str) -> Optional[str]:
+    """Convert a matched date string to ISO format (None if unparseable)."""
+    cleaned = re.sub(r"\s+", " ", value.strip())
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(cleaned, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def date_event(date: str, context: str) -> Optional[str]:
+    """Event a date belongs to, judged from its own sentence before the date."""
+    lead_in = context.split(date, 1)[0].lower()
+    lead_in = re.split(r"[.;]\s", lead_in)[-1]
+    for keyword, event, _ in EVENT_KEYWORDS:
+        if keyword in lead_in:
+            return event
+    return None
+
+
+# ============================================================================
+# RULE-BASED OPERATOR
+# ============================================================================
+
+class RuleBasedOperator:
+    """
+    Deterministic LegalOperator backend.
+
+    Exposes the same extract / extract_packed / review_extraction interface
+    as LegalOperator so the pipeline can swap it in without other changes.
+    """
+
+    def __init__(self, max_dates: int = 20, max_locations: int = 10):
+        """
+        Args:
+            max_dates: Maximum temporal actors per document
+            max_locations: Maximum location actors per document
+        """
+        self.model = "rule-based"
+        self.stream = False
+        self.max_dates = max_dates
+        self.max_locations = max_locations
+        # No LLM, nothing to review
+        self.reflexion = ReflexionPolicy(mode="off")
+
+    def extract(
+        self,
+        text: str,
+        situation: str = "",
+        background_context: str = "",
+        ontology_context: Optional[OntologyContext] = None,
+        chunk_id: Optional[str] = None,
+        document_id: str = "",
+        on_element: Optional[Callable[[str, Any], None]] = None,
+        model: Optional[str] = None
+    ) -> ChunkExtraction:
+        """
+        Extract structured information from legal text using rules.
+
+        Args mirror LegalOperator.extract; ontology_context and model are
+        ignored and on_element is called for every element once extraction
+        finishes.
+        """
+        if chunk_id is None:
+            chunk_id = f"chunk_{uuid4().hex[:8]}"
+
+        extraction = ChunkExtraction(
+            chunk_id=chunk_id,
+            source_document_id=document_id,
+            situation=situation,
+            background_context=background_context,
+            model_used=self.model
+        )
+
+        # The situation usually carries the citation ("Legal case: X v Y [2024] ...")
+        header = f"{situation}\n{text[:3000]}"
+        lowered = lower_in_place(text)
+
+        parties = self._extract_parties(header, text, lowered, chunk_id)
+        judges = self._extract_judges(text, lowered, chunk_id)
+        court = self._extract_court(header, chunk_id)
+        dates = self._extract_dates(text, lowered, chunk_id)
+        locations = self._extract_locations(text, chunk_id, parties + judges)
+        assets = self._extract_assets(text, lowered, chunk_id)
+
+        extraction.actors = parties + judges + ([court] if court else []) + dates + locations + assets
+
+        self._add_event_states(parties, dates)
+        extraction.verb_phrases = self._build_verbs(parties, court, chunk_id)
+        extraction.questions = self._build_questions(parties, court, dates, locations, assets, chunk_id)
+        extraction.spatio_temporal_links = self._build_links(parties, court, dates, locations, chunk_id)
+
+        if on_element:
+            for key in ("actors", "verb_phrases", "questions", "spatio_temporal_links"):
+                for element in getattr(extraction, key):
+                    on_element(key, element)
+
+        return extraction
+
+    def extract_packed(
+        self,
+        documents: List[Dict[str, Any]],
+        ontology_context: Optional[OntologyContext] = None,
+        model: Optional[str] = None
+    ) -> List[ChunkExtraction]:
+        """Extract each document in turn (packing saves nothing without an LLM)."""
+        return [
+            self.extract(
+                text=doc.get("text", ""),
+                situation=doc.get("situation", ""),
+                background_context=doc.get("background_context", ""),
+                chunk_id=doc.get("chunk_id"),
+                document_id=doc.get("document_id", "")
+            )
+            for doc in documents
+        ]
+
+    def review_extraction(
+        self,
+        extraction: ChunkExtraction,
+        original_text: str
+    ) -> ChunkExtraction:
+        """No reflexion for rule-based output."""
+        return extraction
+
+    # =========================================================================
+    # Entity extraction
+    # =========================================================================
+
+    def _extract_parties(self, header: str, text: str, lowered: str, chunk_id: str) -> List[Actor]:
+        """Parties from labels, parenthesised roles and the case name."""
+        parties: Dict[str, Actor] = {}
+
+        def add(name: str, role: Optional[str] = None, alias: Optional[str] = None,
+                key: Optional[str] = None) -> None:
+            name = name.strip()
+            if len(name) < 2 or name.lower() in PARTY_ROLES:
+                return
+            key = key or name.lower()
+            actor = parties.get(key)
+            if actor is None:
+                actor = Actor(
+                    name=name,
+                    actor_type=ActorType.PERSON,
+                    source_chunk_ids=[chunk_id]
+                )
+                parties[key] = actor
+            if role and role not in actor.roles:
+                actor.roles.append(role)
+            if alias and alias not in actor.aliases:
+                actor.aliases.append(alias)
+
+        labels = find_labels(text, lowered, PARTY_LABEL_PATTERN, LABELLED_NAME_PATTERN,
+                             PARTY_LABEL_SEPARATORS, end=10000)
+        for label, name in sorted(labels, key=lambda pair: pair[0].start()):
+            role = PARTY_ROLES[label.group(1)]
+            add(name.group(1), role, f"the {role.lower()}")
+
+        # Find the cheap "(role)" part first, then the name in front of it
+        body = text[:10000]
+        for match in PARTY_PAREN_PATTERN.finditer(body):
+            line_start = body.rfind("\n", 0, match.start()) + 1
+            name = NAME_BEFORE_PATTERN.search(body, line_start, match.start())
+            if not name:
+                continue
+            for term in re.split(r"\s*/\s*", match.group(1).lower()):
+                term = re.sub(r"^the\s+", "", term)
+                role = PARTY_ROLES.get(term) or RELATIONSHIP_ROLES.get(term)
+                add(name.group(1), role, f"the {term}")
+
+        citation = CITATION_PATTERN.search(header)
+        if citation:
+            first, second = citation.group(1), citation.group(2)
+            # "R v Jones" - the Crown prosecutes
+            if first in ("R", "The Queen", "The King"):
+                add("The Crown", "Prosecutor")
+                add(second, "Accused", "the accused")
+            elif not parties:
+                # "Smith & Smith": two parties sharing a surname
+                add(first, "Applicant", "the applicant", key="citation:applicant")
+                add(second, "Respondent", "the respondent", key="citation:respondent")
+
+        return list(parties.values())
+
+    def _extract_judges(self, text: str, lowered: str, chunk_id: str) -> List[Actor]:
+        """Judicial officers from labels and suffixes ("Wilson J") near the top."""
+        judges: Dict[str, Actor] = {}
+
+        for _, match in find_labels(text, lowered, JUDGE_LABEL_PATTERN, JUDGE_NAME_PATTERN, end=5000):
+            name = re.sub(r"\s+(?:" + JUDGE_SUFFIXES + r")$", "", match.group(2).strip())
+            title = re.sub(r"\s+", " ", match.group(1).strip())
+            judges.setdefault(name.lower(), Actor(
+                name=name, actor_type=ActorType.PERSON, roles=["Judge"],
+                aliases=[f"{title} {name}"] if title else [],
+                source_chunk_ids=[chunk_id]
+            ))
+
+        for match in JUDGE_SUFFIX_PATTERN.finditer(text, 0, 5000):
+            name = match.group(1)
+            # Whole words only ("McWilliams J" is not "Williams")
+            if name.lower() in judges or text[match.start() - 1:match.start()].isalnum():
+                continue
+            judges[name.lower()] = Actor(
+                name=name, actor_type=ActorType.PERSON, roles=["Judge"],
+                aliases=[f"{name} {match.group(2)}"], source_chunk_ids=[chunk_id]
+            )
+
+        return list(judges.values())[:5]
+
+    def _extract_court(self, header: str, chunk_id: str) -> Optional[Actor]:
+        """Court from the citation's medium-neutral code (HIERARCHY_MAP)."""
+        match = CITATION_CODE_PATTERN.search(header)
+        if not match:
+            return None
+
+        code = match.group(2)
+        info = HIERARCHY_MAP.get(code)
+        if info:
+            name = f"{info['court']} ({info['jurisdiction']})"
+            states = [State(
+                entity_id="", name="CourtWeight", value=str(info["weight"]),
+                source_chunk_id=chunk_id
+            )]
+        else:
+            name = code
+            states = []
+
+        court = Actor(
+            name=name,
+            actor_type=ActorType.ORGANIZATION,
+            aliases=[code],
+            roles=["Court"],
+            source_chunk_ids=[chunk_id],
+            metadata={"court_code": code, "citation_year": match.group(1)}
+        )
+        for state in states:
+            court.add_state(state)
+        return court
+
+    def _extract_dates(self, text: str, lowered: str, chunk_id: str) -> List[Actor]:
+        """Temporal actors, one per distinct date, in text order."""
+        dates: Dict[str, Actor] = {}
+        for start, end in find_dates(lowered):
+            raw = text[start:end]
+            context = text[max(0, start - 50):end + 50].strip()
+            iso = normalize_date(raw)
+            key = iso or raw.lower()
+            if key in dates:
+                continue
+            dates[key] = Actor(
+                name=raw,
+                actor_type=ActorType.TEMPORAL,
+                source_chunk_ids=[chunk_id],
+                metadata={
+                    "iso_date": iso,
+                    "event": date_event(raw, context),
+                    "context": context
+                }
+            )
+            if len(dates) >= self.max_dates:
+                break
+        return list(dates.values())
+
+    def _extract_locations(
+        self,
+        text: str,
+        chunk_id: str,
+        people: List[Actor]
+    ) -> List[Actor]:
+        """Location actors, skipping obvious non-places and party names."""
+        person_words = {w.lower() for p in people for w in p.name.split()}
+        locations: Dict[str, Actor] = {}
+
+        for found in extract_locations_from_text(text[:20000]):
+            name = found["location"].strip().rstrip(",")
+            first_word = name.split()[0].lower() if name.split() else ""
+            if (
+                not name
+                or first_word in _LOCATION_STOPWORDS
+                or first_word in person_words
+                or "court" in name.lower()  # courts come from the citation
+                or name.lower() in locations
+            ):
+                continue
+            locations[name.lower()] = Actor(
+                name=name,
+                actor_type=ActorType.LOCATION,
+                source_chunk_ids=[chunk_id],
+                metadata={"context": found["context"]}
+            )
+            if len(locations) >= self.max_locations:
+                break
+
+        return list(locations.values())
+
+    def _extract_assets(self, text: str, lowered: str, chunk_id: str) -> List[Actor]:
+        """
+        Asset actors for dollar amounts in a sentence naming an asset.
+
+        An amount belongs to the asset named last before it in its sentence.
+        Amounts whose own clause says they were paid ("purchased ... for
+        $850,000") become PurchasePrice states; the rest are Value states,
+        the latest of which is the asset's current value.
+        """
+        assets: Dict[str, Actor] = {}
+
+        for match in MONEY_PATTERN.finditer(text):
+            window = lowered[max(0, match.start() - 200):match.start()]
+            if not any(keyword in window for keyword in ASSET_KEYWORDS):
+                continue
+            sentence = SENTENCE_BREAK_PATTERN.split(window)[-1]
+            keywords = ASSET_PATTERN.findall(sentence)
+            if not keywords:
+                continue
+            keyword = keywords[-1]
+            clause = CLAUSE_BREAK_PATTERN.split(sentence)[-1]
+            state_name = "PurchasePrice" if PURCHASE_PATTERN.search(clause) else "Value"
+
+            actor = assets.get(keyword)
+            if actor is None:
+                actor = Actor(
+                    name=f"the {keyword}",
+                    actor_type=ActorType.ASSET,
+                    source_chunk_ids=[chunk_id]
+                )
+                assets[keyword] = actor
+            value = match.group().strip()
+            if len(actor.states) < 3 and all(s.value != value for s in actor.states):
+                actor.add_state(State(
+                    entity_id=actor.id, name=state_name, value=value,
+                    source_chunk_id=chunk_id
+                ))
+
+        return list(assets.values())
+
+    def _add_event_states(self, parties: List[Actor], dates: List[Actor]) -> None:
+        """RelationshipStatus states for the parties from dated events."""
+        statuses = {event: value for _, event, value in EVENT_KEYWORDS if value}
+        people = [p for p in parties if "Judge" not in p.roles][:2]
+
+        for date in dates:
+            value = statuses.get(date.metadata.get("event"))
+            if not value:
+                continue
+            for person in people:
+                if any(s.name == "RelationshipStatus" and s.value == value for s in person.states):
+                    continue
+                person.add_state(State(
+                    entity_id=person.id,
+                    name="RelationshipStatus",
+                    value=value,
+                    start_date=date.metadata.get("iso_date") or date.name,
+                    source_chunk_id=person.source_chunk_ids[0]
+                ))
+
+    # =========================================================================
+    # Verbs, questions, links
+    # =========================================================================
+
+    def _first_with_role(self, parties: List[Actor], roles: Tuple[str, ...]) -> Optional[Actor]:
+        return next((p for p in parties if any(r in roles for r in p.roles)), None)
+
+    def _build_verbs(
+        self,
+        parties: List[Actor],
+        court: Optional[Actor],
+        chunk_id: str
+    ) -> List[VerbPhrase]:
+        """Implicit "brought proceedings" verb between the main parties."""
+        applicant = self._first_with_role(parties, ("Applicant", "Appellant", "Plaintiff", "Claimant", "Prosecutor"))
+        respondent = self._first_with_role(parties, ("Respondent", "Defendant", "Accused"))
+        if not applicant or not respondent:
+            return []
+
+        return [VerbPhrase(
+            verb="brought proceedings against",
+            agent_id=applicant.id,
+            patient_ids=[respondent.id],
+            spatial_id=court.id if court else None,
+            is_implicit=True,
+            source_chunk_id=chunk_id,
+            metadata={"method": "rule_based"}
+        )]
+
+    def _build_questions(
+        self,
+        parties: List[Actor],
+        court: Optional[Actor],
+        dates: List[Actor],
+        locations: List[Actor],
+        assets: List[Actor],
+        chunk_id: str
+    ) -> List[PredictiveQuestion]:
+        """Template questions, answered from the extracted entities."""
+        questions = []
+
+        def ask(text, qtype, target=None, answer=None, answer_id=None):
+            questions.append(PredictiveQuestion(
+                question_text=text,
+                question_type=qtype,
+                target_entity_id=target,
+                answerable=answer is not None,
+                answer_text=answer,
+                answer_entity_id=answer_id,
+                source_chunk_id=chunk_id,
+                metadata={"method": "rule_based"}
+            ))
+
+        for role in ("Applicant", "Respondent"):
+            party = self._first_with_role(parties, (role,))
+            ask(
+                f"Who is the {role.lower()}?", QuestionType.WHO,
+                answer=party.name if party else None,
+                answer_id=party.id if party else None
+            )
+
+        ask(
+            "Which court heard the matter?", QuestionType.WHERE,
+            answer=court.name if court else None,
+            answer_id=court.id if court else None
+        )
+
+        separation = next(
+            (d for d in dates if d.metadata.get("event") == "separation"),
+            None
+        )
+        ask(
+            "When did the parties separate?", QuestionType.WHEN,
+            answer=separation.name if separation else None,
+            answer_id=separation.id if separation else None
+        )
+
+        for asset in assets:
+            current = asset.get_current_state("Value")
+            value = current.value if current else None
+            ask(f"What is the value of {asset.name}?", QuestionType.HOW_MUCH,
+                target=asset.id, answer=value)
+
+        return questions
+
+    def _build_links(
+        self,
+        parties: List[Actor],
+        court: Optional[Actor],
+        dates: List[Actor],
+        locations: List[Actor],
+        chunk_id: str
+    ) -> List[SpatioTemporalLink]:
+        """Bind parties to the court and to dates/places mentioned with an event."""
+        person_ids = [p.id for p in parties]
+        if not person_ids:
+            return []
+
+        links = []
+        if court:
+            links.append(SpatioTemporalLink(
+                linked_entity_ids=person_ids + [court.id],
+                tag_type=LinkType.SPATIAL,
+                tag_value=court.name,
+                source_chunk_id=chunk_id,
+                metadata={"method": "rule_based"}
+            ))
+
+        for date in dates:
+            if date.metadata.get("event"):
+                links.append(SpatioTemporalLink(
+                    linked_entity_ids=person_ids + [date.id],
+                    tag_type=LinkType.TEMPORAL,
+                    tag_value=date.metadata.get("iso_date") or date.name,
+                    source_chunk_id=chunk_id,
+                    metadata={"method": "rule_based"}
+                ))
+
+        return links
@@ -0,0 +1,425 @@
+"""
+Telemetry - Per-Call LLM Ledger (Tokens, Latency, Cost)
+
+Every chat completion made by a GSW component is recorded as one line in
+an append-only JSONL ledger:
+
+    {"ts": "...", "stage": "operator", "model": "google/gemini-2.0-flash-001",
+     "prompt_tokens": 5120, "completion_tokens": 1830, "latency_ms": 8412.3,
+     "retries": 1, "cache_hit": false, "outcome": "ok", "cost_usd": 0.001244,
+     "document_id": "...", "domain": "family"}
+
+The document and domain are taken from a context variable set by the
+pipeline around each document, so components do not need to pass them.
+
+Configuration (environment):
+    GSW_TELEMETRY_LEDGER   Ledger path used when no ledger has been set
+                           explicitly with set_ledger()
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# ============================================================================
+# PRICING
+# ============================================================================
+
+# USD per 1M tokens: (prompt, completion). OpenRouter list prices.
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "google/gemini-2.0-flash-001": (0.10, 0.40),
+    "google/gemini-2.0-flash": (0.10, 0.40),
+    "google/gemini-2.0-flash-lite-001": (0.075, 0.30),
+    "google/gemini-2.5-flash": (0.30, 2.50),
+    "google/gemini-2.5-pro": (1.25, 10.00),
+    "openai/gpt-4o-mini": (0.15, 0.60),
+    "openai/gpt-4o": (2.50, 10.00),
+    "anthropic/claude-3.5-haiku": (0.80, 4.00),
+    "anthropic/claude-3.5-sonnet": (3.00, 15.00),
+}
+
+# Latency histogram bucket upper bounds (ms)
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+def estimate_cost(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cached_tokens: int = 0
+) -> Optional[float]:
+    """
+    Estimate the USD cost of a call.
+
+    Cached prompt tokens are billed at a quarter of the prompt price.
+    Returns None for models missing from MODEL_PRICING.
+    """
+    prices = MODEL_PRICING.get(model)
+    if prices is None:
+        return None
+    prompt_price, completion_price = prices
+    uncached = max(0, prompt_tokens - cached_tokens)
+    cost = (
+        uncached * prompt_price
+        + cached_tokens * prompt_price * 0.25
+        + completion_tokens * completion_price
+    ) / 1_000_000
+    return round(cost, 8)
+
+
+# ============================================================================
+# CALL RECORD
+# ============================================================================
+
+@dataclass
+class LLMCall:
+    """One chat completion as recorded in the ledger."""
+    stage: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_ms: float = 0.0
+    retries: int = 0
+    cache_hit: bool = False
+    coalesced: bool = False                # Shared an identical in-flight request
+    outcome: str = "ok"                    # ok | truncated | http_<status> | error
+    usage_estimated: bool = False          # Provider returned no usage block
+    cost_usd: Optional[float] = None
+    document_id: Optional[str] = None
+    domain: Optional[str] = None
+    cascade_step: Optional[int] = None     # 0 = first cascade model, n = nth escalation
+    error: Optional[str] = None
+    ts: str = field(default_factory=lambda: time.strftime("%Y-%m-%dT%H:%M:%S"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# ============================================================================
+# CONTEXT
+# ============================================================================
+
+_call_context: ContextVar[Dict[str, Any]] = ContextVar(
+    "gsw_telemetry_context", default={}
+)
+
+
+@contextmanager
+def telemetry_context(
+    document_id: Optional[str] = None,
+    domain: Optional[str] = None,
+    cascade_step: Optional[int] = None
+) -> Iterator[None]:
+    """Attribute LLM calls made inside the block to a document/domain (and cascade step)."""
+    current = dict(_call_context.get())
+    if document_id is not None:
+        current["document_id"] = document_id
+    if domain is not None:
+        current["domain"] = domain
+    if cascade_step is not None:
+        current["cascade_step"] = cascade_step
+    token = _call_context.set(current)
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+def current_context() -> Dict[str, Any]:
+    """Document/domain/cascade attribution for the current call."""
+    return dict(_call_context.get())
+
+
+# ============================================================================
+# LEDGER
+# ============================================================================
+
+class TelemetryLedger:
+    """Append-only JSONL ledger of LLM calls."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def record(self, call: LLMCall) -> None:
+        """Append one call (thread-safe, one line per call)."""
+        line = json.dumps(call.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Load all recorded calls (skips corrupt lines)."""
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return records
+
+
+_active_ledger: Optional[TelemetryLedger] = None
+_ledger_explicit = False
+
+
+def set_ledger(ledger: Optional[TelemetryLedger]) -> Optional[TelemetryLedger]:
+    """
+    Set the process-wide ledger (None disables recording).
+
+    Returns the previously active ledger so callers can restore it.
+    """
+    global _active_ledger, _ledger_explicit
+    previous = _active_ledger
+    _active_ledger = ledger
+    _ledger_explicit = True
+    return previous
+
+
+def get_ledger() -> Optional[TelemetryLedger]:
+    """Active ledger - falls back to GSW_TELEMETRY_LEDGER if none was set."""
+    if _ledger_explicit:
+        return _active_ledger
+    env_path = os.getenv("GSW_TELEMETRY_LEDGER")
+    return TelemetryLedger(Path(env_path)) if env_path else None
+
+
+def record_call(call: LLMCall) -> LLMCall:
+    """Fill in attribution and cost, then append to the active ledger."""
+    context = current_context()
+    if call.document_id is None:
+        call.document_id = context.get("document_id")
+    if call.domain is None:
+        call.domain = context.get("domain")
+    if call.cascade_step is None:
+        call.cascade_step = context.get("cascade_step")
+    if call.cost_usd is None:
+        call.cost_usd = estimate_cost(
+            call.model, call.prompt_tokens, call.completion_tokens, call.cached_tokens
+        )
+
+    ledger = get_ledger()
+    if ledger is not None:
+        try:
+            ledger.record(call)
+        except OSError as e:
+            print(f"[Telemetry Warning] Could not write ledger: {e}")
+    return call
+
+
+# ============================================================================
+# SUMMARY
+# ============================================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = math.ceil(pct / 100.0 * len(ordered)) - 1
+    return ordered[min(max(index, 0), len(ordered) - 1)]
+
+
+def latency_histogram(latencies_ms: List[float]) -> List[Tuple[str, int]]:
+    """Bucket latencies into LATENCY_BUCKETS_MS (plus an overflow bucket)."""
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for value in latencies_ms:
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+
+    labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+    return list(zip(labels, counts))
+
+
+def _new_bucket() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "cached_tokens": 0,
+        "completion_tokens": 0,
+        "cost_usd": 0.0,
+        "retries": 0,
+        "cache_hits": 0,
+        "coalesced": 0,
+        "failures": 0,
+        "unpriced_calls": 0,
+    }
+
+
+def _accumulate(bucket: Dict[str, Any], record: Dict[str, Any]) -> None:
+    bucket["calls"] += 1
+    bucket["prompt_tokens"] += record.get("prompt_tokens") or 0
+    bucket["cached_tokens"] += record.get("cached_tokens") or 0
+    bucket["completion_tokens"] += record.get("completion_tokens") or 0
+    bucket["retries"] += record.get("retries") or 0
+    bucket["cache_hits"] += 1 if record.get("cache_hit") else 0
+    bucket["coalesced"] += 1 if record.get("coalesced") else 0
+    if record.get("outcome") not in ("ok", "truncated"):
+        bucket["failures"] += 1
+    if record.get("cost_usd") is None:
+        bucket["unpriced_calls"] += 1
+    else:
+        bucket["cost_usd"] += record["cost_usd"]
+
+
+def summarize_ledger(
+    records: List[Dict[str, Any]],
+    domain: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Aggregate ledger records.
+
+    Args:
+        records: Records from TelemetryLedger.read()
+        domain: Only include calls attributed to this domain
+
+    Returns:
+        Dict with "total", "by_stage", "by_model", "by_domain",
+        "by_document", per-stage "latency" (p50/p95/histogram) and
+        "cascade" (calls per cascade step)
+    """
+    if domain:
+        records = [r for r in records if r.get("domain") == domain]
+
+    total = _new_bucket()
+    by_stage: Dict[str, Dict[str, Any]] = defaultdict(_new_bucket)
+    by_model: Dict[str, Dict[str, Any]] = defaultdict(_new_bucket)
+    by_cascade_step: Dict[int, Dict[str, Any]] = defaultdict(_new_bucket)
+    by_domain: Dict[str, Dict[str, Any]] = defaultdict(_new_bucket)
+    by_document: Dict[str, Dict[str, Any]] = defaultdict(_new_bucket)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+
+    for record in records:
+        stage = record.get("stage") or "unknown"
+        _accumulate(total, record)
+        _accumulate(by_stage[stage], record)
+        _accumulate(by_model[record.get("model") or "unknown"], record)
+        if record.get("cascade_step") is not None:
+            _accumulate(by_cascade_step[record["cascade_step"]], record)
+        _accumulate(by_domain[record.get("domain") or "(none)"], record)
+        if record.get("document_id"):
+            _accumulate(by_document[record["document_id"]], record)
+        latencies[stage].append(record.get("latency_ms") or 0.0)
+
+    for domain_name, bucket in by_domain.items():
+        docs = {
+            r.get("document_id") for r in records
+            if (r.get("domain") or "(none)") == domain_name and r.get("document_id")
+        }
+        bucket["documents"] = len(docs)
+        bucket["cost_per_document"] = bucket["cost_usd"] / len(docs) if docs else None
+
+    latency = {
+        stage: {
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "histogram": latency_histogram(values),
+        }
+        for stage, values in latencies.items()
+    }
+
+    return {
+        "total": total,
+        "by_stage": dict(by_stage),
+        "by_model": dict(by_model),
+        "by_domain": dict(by_domain),
+        "by_document": dict(by_document),
+        "latency": latency,
+        "cascade": dict(sorted(by_cascade_step.items())),
+    }
+
+
+def cached_share(bucket: Dict[str, Any]) -> float:
+    """Fraction of a bucket's prompt tokens served from the provider's prefix cache."""
+    prompt = bucket.get("prompt_tokens") or 0
+    return (bucket.get("cached_tokens") or 0) / prompt if prompt else 0.0
+
+
+def format_summary(summary: Dict[str, Any], top_documents: int = 10) -> str:
+    """Render a ledger summary as a plain-text report."""
+    lines = []
+    total = summary["total"]
+    lines.append(
+        f"Calls: {total['calls']} | Tokens: {total['prompt_tokens']:,} in / "
+        f"{total['completion_tokens']:,} out | Cost: ${total['cost_usd']:.4f}"
+    )
+    lines.append(
+        f"Prompt-prefix cache: {total['cached_tokens']:,} of {total['prompt_tokens']:,} "
+        f"prompt tokens ({cached_share(total) * 100:.1f}%)"
+    )
+    lines.append(
+        f"Retries: {total['retries']} | Cache hits: {total['cache_hits']} | "
+        f"Coalesced: {total.get('coalesced', 0)} | Failures: {total['failures']}"
+        + (f" | Unpriced calls: {total['unpriced_calls']}" if total["unpriced_calls"] else "")
+    )
+
+    lines.append("\nBy stage:")
+    for stage, bucket in sorted(summary["by_stage"].items()):
+        stats = summary["latency"].get(stage, {})
+        lines.append(
+            f"  {stage:<10} calls={bucket['calls']:<6} cost=${bucket['cost_usd']:.4f} "
+            f"cached={cached_share(bucket) * 100:.0f}% "
+            f"p50={stats.get('p50_ms', 0)}ms p95={stats.get('p95_ms', 0)}ms"
+        )
+
+    lines.append("\nBy model:")
+    for model, bucket in sorted(summary.get("by_model", {}).items()):
+        lines.append(f"  {model:<36} calls={bucket['calls']:<6} cost=${bucket['cost_usd']:.4f}")
+
+    cascade = summary.get("cascade") or {}
+    if cascade:
+        first = cascade.get(0, {}).get("calls", 0)
+        escalated = sum(b["calls"] for step, b in cascade.items() if step > 0)
+        rate = escalated / first * 100 if first else 0.0
+        lines.append(f"\nCascade: {first} first-model calls, {escalated} escalations ({rate:.1f}%)")
+        for step, bucket in cascade.items():
+            lines.append(f"  step {step}  calls={bucket['calls']:<6} cost=${bucket['cost_usd']:.4f}")
+
+    lines.append("\nBy domain:")
+    for domain_name, bucket in sorted(summary["by_domain"].items()):
+        per_doc = bucket.get("cost_per_document")
+        per_doc_str = f"${per_doc:.5f}/doc" if per_doc is not None else "n/a"
+        lines.append(
+            f"  {domain_name:<20} docs={bucket.get('documents', 0):<6} "
+            f"cost=${bucket['cost_usd']:.4f} ({per_doc_str})"
+        )
+
+    if summary["by_document"]:
+        lines.append(f"\nTop {top_documents} documents by cost:")
+        ranked = sorted(
+            summary["by_document"].items(),
+            key=lambda item: item[1]["cost_usd"],
+            reverse=True
+        )[:top_documents]
+        for document_id, bucket in ranked:
+            lines.append(
+                f"  {document_id:<30} calls={bucket['calls']:<4} cost=${bucket['cost_usd']:.5f}"
+            )
+
+    lines.append("\nLatency histograms:")
+    for stage, stats in sorted(summary["latency"].items()):
+        lines.append(f"  {stage}")
+        peak = max((count for _, count in stats["histogram"]), default=0) or 1
+        for label, count in stats["histogram"]:
+            bar = "#" * int(round(30 * count / peak))
+            lines.append(f"    {label:>9} {count:>6} {bar}")
+
+    return "\n".join(lines)
@@ -0,0 +1,202 @@
+"""
+Document Triage - Route Documents to the Cheapest Adequate Extractor
+
+Not every document deserves a full-model extraction. Triage scores each
+domain document before the operator runs and routes it to one of:
+
+- skip:   procedural one-liners with nothing to extract
+- rules:  legislation and low-value documents (RuleBasedOperator, no LLM)
+- cheap:  mid-value documents (a cheaper model)
+- full:   long, high-court, clearly classified judgments with parties
+
+Score features (each 0..1):
+- length:      text length, saturating at LENGTH_SATURATION chars
+- court:       HIERARCHY_MAP weight of the citation's court code
+- confidence:  share of the top category in _classification.all_matches
+- parties:     party labels / case name found by the rule-based patterns
+
+Decisions and the estimated savings against an all-full-model run are
+tracked in DocumentTriage.stats.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.gsw.rule_based_operator import (
+    CITATION_CODE_PATTERN, CITATION_PATTERN, PARTY_LABEL_PATTERN, PARTY_PAREN_PATTERN
+)
+from src.gsw.telemetry import estimate_cost
+from src.ingestion.classification_config import HIERARCHY_MAP
+
+
+TRIAGE_ROUTES = ("skip", "rules", "cheap", "full")
+
+DEFAULT_FULL_MODEL = "google/gemini-2.0-flash-001"
+DEFAULT_CHEAP_MODEL = "google/gemini-2.0-flash-lite-001"
+
+LEGISLATION_TYPES = {"primary_legislation", "secondary_legislation", "bill"}
+
+LENGTH_SATURATION = 20000      # Characters at which the length feature is 1.0
+UNKNOWN_COURT_WEIGHT = 5       # HIERARCHY_MAP-style weight for unlisted courts
+
+FEATURE_WEIGHTS = {
+    "length": 0.4,
+    "court": 0.25,
+    "confidence": 0.15,
+    "parties": 0.2,
+}
+
+# Token estimates for savings reporting (operator prompt is ~10K chars)
+PROMPT_OVERHEAD_TOKENS = 2500
+MAX_INPUT_CHARS = 30000
+
+
+@dataclass
+class TriageDecision:
+    """Routing decision for one document."""
+    route: str
+    score: float
+    model: Optional[str] = None
+    reasons: List[str] = field(default_factory=list)
+    features: Dict[str, float] = field(default_factory=dict)
+
+
+def estimate_extraction_tokens(text_length: int) -> Dict[str, int]:
+    """Rough prompt/completion tokens of one operator call."""
+    input_chars = min(text_length, MAX_INPUT_CHARS)
+    return {
+        "prompt": PROMPT_OVERHEAD_TOKENS + input_chars // 4,
+        "completion": min(8000, 500 + input_chars // 10),
+    }
+
+
+class DocumentTriage:
+    """
+    Scores documents and picks skip / rules / cheap / full.
+    """
+
+    def __init__(
+        self,
+        cheap_model: str = DEFAULT_CHEAP_MODEL,
+        full_model: str = DEFAULT_FULL_MODEL,
+        min_chars: int = 400,
+        rules_threshold: float = 0.3,
+        full_threshold: float = 0.6
+    ):
+        """
+        Args:
+            cheap_model: Model for the "cheap" route
+            full_model: Model for the "full" route (the operator's model)
+            min_chars: Documents shorter than this are skipped
+            rules_threshold: Scores below this go to rule-based extraction
+            full_threshold: Scores at or above this get the full model
+        """
+        self.cheap_model = cheap_model
+        self.full_model = full_model
+        self.min_chars = min_chars
+        self.rules_threshold = rules_threshold
+        self.full_threshold = full_threshold
+
+        self.stats: Dict[str, Any] = {
+            "documents": 0,
+            "routes": {route: 0 for route in TRIAGE_ROUTES},
+            "estimated_cost_full": 0.0,
+            "estimated_cost_routed": 0.0,
+        }
+
+    def features(self, doc: Dict[str, Any]) -> Dict[str, float]:
+        """Compute the 0..1 score features of a domain document."""
+        text = doc.get("text", "") or ""
+        citation = doc.get("citation", "") or ""
+
+        court_weight = UNKNOWN_COURT_WEIGHT
+        match = CITATION_CODE_PATTERN.search(citation)
+        if match and match.group(2) in HIERARCHY_MAP:
+            court_weight = HIERARCHY_MAP[match.group(2)]["weight"]
+
+        # Share of the winning category among all matches (0.5 if unclassified)
+        confidence = 0.5
+        matches = (doc.get("_classification") or {}).get("all_matches") or []
+        total = sum(score for _, score in matches)
+        if total > 0:
+            confidence = matches[0][1] / total
+
+        head = text[:10000]
+        has_parties = bool(
+            CITATION_PATTERN.search(citation)
+            or PARTY_LABEL_PATTERN.search(head)
+            or PARTY_PAREN_PATTERN.search(head)
+        )
+
+        return {
+            "length": min(1.0, len(text) / LENGTH_SATURATION),
+            "court": court_weight / 10,
+            "confidence": round(confidence, 3),
+            "parties": 1.0 if has_parties else 0.0,
+        }
+
+    def route(self, doc: Dict[str, Any]) -> TriageDecision:
+        """
+        Decide how a document should be extracted.
+
+        Args:
+            doc: Domain JSONL document (text, citation, type, _classification)
+
+        Returns:
+            TriageDecision with route, score and the model to use
+        """
+        text = doc.get("text", "") or ""
+        features = self.features(doc)
+        score = round(sum(FEATURE_WEIGHTS[k] * v for k, v in features.items()), 3)
+        reasons = []
+
+        if len(re.sub(r"\s+", " ", text).strip()) < self.min_chars:
+            route = "skip"
+            reasons.append("too_short")
+        elif doc.get("type") in LEGISLATION_TYPES:
+            route = "rules"
+            reasons.append("legislation")
+        elif score < self.rules_threshold:
+            route = "rules"
+            reasons.append("low_score")
+        elif score < self.full_threshold:
+            route = "cheap"
+        else:
+            route = "full"
+
+        if not features["parties"]:
+            reasons.append("no_parties")
+
+        model = {"cheap": self.cheap_model, "full": self.full_model}.get(route)
+        decision = TriageDecision(
+            route=route, score=score, model=model, reasons=reasons, features=features
+        )
+        self._record(decision, len(text))
+        return decision
+
+    def _record(self, decision: TriageDecision, text_length: int) -> None:
+        """Track route counts and estimated cost against the all-full baseline."""
+        tokens = estimate_extraction_tokens(text_length)
+        full_cost = estimate_cost(self.full_model, tokens["prompt"], tokens["completion"]) or 0.0
+        routed_cost = 0.0
+        if decision.model:
+            routed_cost = estimate_cost(decision.model, tokens["prompt"], tokens["completion"]) or 0.0
+
+        self.stats["documents"] += 1
+        self.stats["routes"][decision.route] += 1
+        self.stats["estimated_cost_full"] += full_cost
+        self.stats["estimated_cost_routed"] += routed_cost
+
+    def summary(self) -> str:
+        """One-line summary of routing decisions and estimated savings."""
+        stats = self.stats
+        routes = " ".join(f"{route}={stats['routes'][route]}" for route in TRIAGE_ROUTES)
+        full = stats["estimated_cost_full"]
+        routed = stats["estimated_cost_routed"]
+        saved = full - routed
+        pct = (saved / full * 100) if full else 0.0
+        return (
+            f"{routes} | est. cost ${routed:.4f} vs ${full:.4f} all-full "
+            f"(saved ${saved:.4f}, {pct:.0f}%)"
+        )
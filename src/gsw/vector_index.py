@@ -0,0 +1,325 @@
+"""
+Vector Index - Actor Embeddings in a Persisted Approximate Nearest-Neighbour Index
+
+VectorReconciler (legal_reconciler.py) embeds each actor's name, aliases and
+roles and looks up similar workspace actors here instead of comparing a new
+actor with every existing one.
+
+Encoders are pluggable; anything with a name, a dim and
+encode(texts) -> vectors works:
+
+- HashingEncoder (default): character n-grams and words hashed into a
+  fixed number of signed dimensions, L2-normalized. Runs on CPU with no
+  model download; vectors are sparse ({dimension: weight}).
+- SentenceTransformerEncoder: a sentence-transformers model (optional
+  dependency, e.g. BAAI/bge-m3), encoded in batches on CPU.
+
+VectorIndex is a random-hyperplane LSH index (cosine similarity): each of
+LSH_TABLES tables hashes a vector to LSH_BITS sign bits. A query probes its
+own bucket plus the bucket across its least certain bit in every table,
+and the candidates are re-ranked by exact cosine. A query restricted to a
+small set of ids (the actors of one document partition) scans that set
+exactly instead. Hyperplanes are regenerated from the seed, so the saved
+file holds only the vectors, the texts they were computed from (to skip
+re-embedding unchanged actors) and the encoder name (an index built by
+another encoder is discarded on load).
+
+Configuration (environment):
+    GSW_VECTOR_ENCODER   "hashing" (default) or a sentence-transformers
+                         model name (e.g. BAAI/bge-m3)
+    GSW_VECTOR_DIM       Dimensions of the hashing encoder (default: 1024)
+"""
+
+import json
+import math
+import os
+import random
+import re
+import zlib
+from pathlib import Path
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+
+from src.gsw.candidates import char_ngrams
+from src.logic.gsw_schema import Actor
+
+
+HASHING_DIM = 1024
+LSH_TABLES = 8
+LSH_BITS = 8
+EXACT_SCAN_LIMIT = 2000        # Scan an allowed set this small instead of probing
+ENCODE_BATCH = 256             # Texts per encoder call
+ROLE_WEIGHT = 0.5              # Weight of role words relative to name features
+
+SparseVector = Dict[int, float]
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def actor_text(actor: Actor) -> str:
+    """Text embedded for an actor: name, aliases and roles."""
+    return " | ".join([actor.name] + list(actor.aliases) + [f"role: {r}" for r in actor.roles])
+
+
+def cosine(a: SparseVector, b: SparseVector) -> float:
+    """Dot product of two L2-normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(i, 0.0) for i, v in a.items())
+
+
+def normalize(vector: SparseVector) -> SparseVector:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if not norm:
+        return {}
+    return {i: v / norm for i, v in vector.items()}
+
+
+# ============================================================================
+# ENCODERS
+# ============================================================================
+
+class HashingEncoder:
+    """
+    Signed feature hashing of character n-grams and words (no model needed).
+    """
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def encode(self, texts: List[str]) -> List[SparseVector]:
+        """Embed a batch of texts as L2-normalized sparse vectors."""
+        return [self._encode_one(text) for text in texts]
+
+    def _encode_one(self, text: str) -> SparseVector:
+        vector: SparseVector = {}
+        for part in text.split(" | "):
+            weight = 1.0
+            if part.startswith("role: "):
+                part, weight = part[6:], ROLE_WEIGHT
+            features = char_ngrams(part) + [f"w:{w}" for w in _WORD.findall(part.lower())]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                index = h % self.dim
+                sign = 1.0 if (h // self.dim) & 1 else -1.0
+                vector[index] = vector.get(index, 0.0) + sign * weight
+        return normalize({i: v for i, v in vector.items() if v})
+
+
+class SentenceTransformerEncoder:
+    """
+    Dense embeddings from a sentence-transformers model, on CPU.
+    """
+
+    def __init__(self, model: str = "BAAI/bge-m3", device: str = "cpu"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "sentence-transformers is required for model encoders "
+                "(pip install sentence-transformers), or use GSW_VECTOR_ENCODER=hashing"
+            ) from e
+        self.model = SentenceTransformer(model, device=device)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = model
+
+    def encode(self, texts: List[str]) -> List[SparseVector]:
+        """Embed a batch of texts (normalized by the model)."""
+        embeddings = self.model.encode(texts, batch_size=ENCODE_BATCH, normalize_embeddings=True)
+        return [{i: float(v) for i, v in enumerate(row) if v} for row in embeddings]
+
+
+def encoder_from_env(name: Optional[str] = None):
+    """Encoder named by the argument or GSW_VECTOR_ENCODER (default: hashing)."""
+    name = name or os.getenv("GSW_VECTOR_ENCODER", "hashing")
+    if name == "hashing":
+        return HashingEncoder(int(os.getenv("GSW_VECTOR_DIM", HASHING_DIM)))
+    return SentenceTransformerEncoder(name)
+
+
+# ============================================================================
+# LSH INDEX
+# ============================================================================
+
+class VectorIndex:
+    """
+    Random-hyperplane LSH over sparse unit vectors, with exact re-ranking.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        encoder_name: str = "",
+        tables: int = LSH_TABLES,
+        bits: int = LSH_BITS,
+        seed: int = 0
+    ):
+        """
+        Args:
+            dim: Vector dimensions
+            encoder_name: Encoder the vectors come from (checked on load)
+            tables: Hash tables (more: better recall, slower inserts)
+            bits: Sign bits per table (more: smaller buckets)
+            seed: Seed of the hyperplanes
+        """
+        self.dim = dim
+        self.encoder_name = encoder_name
+        self.tables = tables
+        self.bits = bits
+        self.seed = seed
+
+        # Hyperplane coefficients by dimension: planes[i][p] for plane p
+        rng = random.Random(seed)
+        count = tables * bits
+        self._planes = [[rng.gauss(0.0, 1.0) for _ in range(count)] for _ in range(dim)]
+
+        self.vectors: Dict[str, SparseVector] = {}
+        self.texts: Dict[str, str] = {}
+        self._keys: Dict[str, List[int]] = {}               # item id -> bucket per table
+        self._buckets: List[Dict[int, set]] = [{} for _ in range(tables)]
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def add(self, item_id: str, vector: SparseVector, text: str = "") -> None:
+        """Insert or replace an item."""
+        self.remove(item_id)
+        keys, _ = self._hash(vector)
+        self.vectors[item_id] = vector
+        self.texts[item_id] = text
+        self._keys[item_id] = keys
+        for table, key in enumerate(keys):
+            self._buckets[table].setdefault(key, set()).add(item_id)
+
+    def remove(self, item_id: str) -> None:
+        """Drop an item (no-op if absent)."""
+        keys = self._keys.pop(item_id, None)
+        if keys is None:
+            return
+        for table, key in enumerate(keys):
+            bucket = self._buckets[table].get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._buckets[table][key]
+        self.vectors.pop(item_id, None)
+        self.texts.pop(item_id, None)
+
+    def search(
+        self,
+        vector: SparseVector,
+        k: int = 10,
+        allowed: Optional[Collection[str]] = None,
+        min_score: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Approximate nearest neighbours of a vector.
+
+        Args:
+            vector: Query vector
+            k: Results to return
+            allowed: Only consider these ids (e.g. the actors of one partition)
+            min_score: Drop results below this cosine similarity
+
+        Returns:
+            (id, cosine) pairs, best first
+        """
+        if allowed is not None and len(allowed) <= EXACT_SCAN_LIMIT:
+            # A small partition is cheaper (and exact) to scan than to probe
+            candidates = [i for i in allowed if i in self.vectors]
+        else:
+            keys, margins = self._hash(vector)
+            candidates = set()
+            for table, key in enumerate(keys):
+                buckets = self._buckets[table]
+                # Own bucket, plus the bucket across the least certain hyperplane
+                flip = min(range(self.bits), key=lambda b: margins[table][b])
+                for probe in (key, key ^ (1 << flip)):
+                    candidates.update(buckets.get(probe, ()))
+            if allowed is not None:
+                candidates = [i for i in candidates if i in allowed]
+
+        scored = []
+        for item_id in candidates:
+            score = cosine(vector, self.vectors[item_id])
+            if score >= min_score:
+                scored.append((item_id, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:k]
+
+    def _hash(self, vector: SparseVector) -> Tuple[List[int], List[List[float]]]:
+        """Bucket key per table, and each bit's distance from its hyperplane."""
+        projections = [0.0] * (self.tables * self.bits)
+        planes = self._planes
+        for i, value in vector.items():
+            projections = [p + c * value for p, c in zip(projections, planes[i])]
+        keys, margins = [], []
+        for table in range(self.tables):
+            part = projections[table * self.bits:(table + 1) * self.bits]
+            key = 0
+            for bit, projection in enumerate(part):
+                if projection > 0:
+                    key |= 1 << bit
+            keys.append(key)
+            margins.append([abs(p) for p in part])
+        return keys, margins
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Write the vectors and their texts as JSON (buckets are rebuilt on load)."""
+        data = {
+            "encoder": self.encoder_name,
+            "dim": self.dim,
+            "tables": self.tables,
+            "bits": self.bits,
+            "seed": self.seed,
+            "items": {
+                item_id: {
+                    "text": self.texts.get(item_id, ""),
+                    "indices": list(vector),
+                    "values": [round(v, 6) for v in vector.values()],
+                }
+                for item_id, vector in self.vectors.items()
+            },
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, dim: int, encoder_name: str) -> "VectorIndex":
+        """
+        Load an index, or start an empty one if the file is missing,
+        unreadable or was built by a different encoder.
+        """
+        if not path.exists():
+            return cls(dim, encoder_name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[Vectors Warning] Ignoring unreadable {path}: {e}")
+            return cls(dim, encoder_name)
+        if data.get("encoder") != encoder_name or data.get("dim") != dim:
+            print(f"[Vectors] {path.name} was built by {data.get('encoder')}, re-embedding with {encoder_name}")
+            return cls(dim, encoder_name)
+
+        index = cls(dim, encoder_name, data.get("tables", LSH_TABLES),
+                    data.get("bits", LSH_BITS), data.get("seed", 0))
+        for item_id, item in data.get("items", {}).items():
+            index.add(item_id, dict(zip(item["indices"], item["values"])), item.get("text", ""))
+        return index
+
+
+def encode_batched(encoder, texts: Iterable[str], batch_size: int = ENCODE_BATCH) -> List[SparseVector]:
+    """Encode texts in batches of batch_size."""
+    texts = list(texts)
+    vectors: List[SparseVector] = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(encoder.encode(texts[start:start + batch_size]))
+    return vectors
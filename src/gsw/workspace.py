@@ -203,7 +203,8 @@ class WorkspaceManager:
                     ],
                     "spatio_temporal_link_ids": a.spatio_temporal_link_ids,
                     "involved_cases": a.involved_cases,
-                    "source_chunk_ids": a.source_chunk_ids
+                    "source_chunk_ids": a.source_chunk_ids,
+                    "metadata": a.metadata
                 }
                 for aid, a in workspace.actors.items()
             },
@@ -283,9 +284,10 @@ class WorkspaceManager:
                 states=states,
                 spatio_temporal_link_ids=adata.get("spatio_temporal_link_ids", []),
                 involved_cases=adata.get("involved_cases", []),
-                source_chunk_ids=adata.get("source_chunk_ids", [])
+                source_chunk_ids=adata.get("source_chunk_ids", []),
+                metadata=adata.get("metadata", {})
             )
-            workspace.actors[aid] = actor
+            workspace.add_actor(actor)
 
         # Verb phrases
         for vid, vdata in data.get("verb_phrases", {}).items():
@@ -8,7 +8,7 @@ Based on: arXiv:2511.07587 - Functional Structure of Episodic Memory
 """
 
 from pydantic import BaseModel, Field, PrivateAttr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Set
 from enum import Enum
 from uuid import uuid4
 from datetime import datetime
@@ -162,11 +162,64 @@ class Actor(BaseModel):
     source_chunk_ids: List[str] = Field(default_factory=list)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
+    # Set views of the list fields for O(1) membership checks when merging
+    # (private, not serialized). The lists only grow, so a view is synced
+    # from the length it was built at; a replaced list is re-read in full.
+    _key_sets: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
     def add_state(self, state: State) -> None:
         """Add a new state to this actor."""
         state.entity_id = self.id
         self.states.append(state)
 
+    def merge_state(self, state: State) -> bool:
+        """Add a state unless one with the same name and value exists."""
+        if (state.name, state.value) in self._key_set("states"):
+            return False
+        self.add_state(state)
+        return True
+
+    def add_alias(self, alias: str) -> bool:
+        """Add an alias unless it is the name or already an alias."""
+        if alias == self.name:
+            return False
+        return self._append_unique("aliases", alias)
+
+    def add_role(self, role: str) -> bool:
+        """Add a role unless already present."""
+        return self._append_unique("roles", role)
+
+    def add_source_chunk(self, chunk_id: str) -> bool:
+        """Record a source chunk unless already recorded."""
+        return self._append_unique("source_chunk_ids", chunk_id)
+
+    def add_link(self, link_id: str) -> bool:
+        """Record a spatio-temporal link unless already recorded."""
+        return self._append_unique("spatio_temporal_link_ids", link_id)
+
+    def add_case(self, case_id: str) -> bool:
+        """Record an involved case unless already recorded."""
+        return self._append_unique("involved_cases", case_id)
+
+    def _append_unique(self, field: str, value: str) -> bool:
+        if value in self._key_set(field):
+            return False
+        getattr(self, field).append(value)
+        return True
+
+    def _key_set(self, field: str) -> Set[Any]:
+        values = getattr(self, field)
+        key_sets = self._key_sets
+        list_id, count, keys = key_sets.get(field, (None, 0, None))
+        if list_id != id(values) or count > len(values):
+            count, keys = 0, set()
+        if field == "states":
+            keys.update((s.name, s.value) for s in values[count:])
+        else:
+            keys.update(values[count:])
+        key_sets[field] = (id(values), len(values), keys)
+        return keys
+
     def get_current_state(self, state_name: str) -> Optional[State]:
         """Get the most recent state of a given type."""
         matching = [s for s in self.states if s.name == state_name and s.end_date is None]
@@ -199,6 +252,7 @@ class ChunkExtraction(BaseModel):
     extracted_at: str = Field(default_factory=lambda: datetime.now().isoformat())
     model_used: str = ""
     raw_llm_response: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)  # parse/truncation flags
 
     def get_actor_by_name(self, name: str) -> Optional[Actor]:
         """Find actor by name (case-insensitive)."""
@@ -247,23 +301,86 @@ class GlobalWorkspace(BaseModel):
 
     # Index structures for fast lookup (private, not serialized)
     _name_to_actor_id: Dict[str, str] = PrivateAttr(default_factory=dict)
+    # Normalized name/alias -> actor ids, lowercased role -> actor ids (and
+    # its earliest holder), and insertion order (used to pick the first
+    # match like a scan would)
+    _name_index: Dict[str, Set[str]] = PrivateAttr(default_factory=dict)
+    _role_index: Dict[str, Set[str]] = PrivateAttr(default_factory=dict)
+    _role_first: Dict[str, str] = PrivateAttr(default_factory=dict)
+    _actor_order: Dict[str, int] = PrivateAttr(default_factory=dict)
 
     def model_post_init(self, __context) -> None:
         """Rebuild index after loading from JSON."""
+        self._rebuild_actor_index()
+
+    def _rebuild_actor_index(self) -> None:
         self._name_to_actor_id = {}
-        for actor_id, actor in self.actors.items():
-            self._name_to_actor_id[actor.name.lower()] = actor_id
-            for alias in actor.aliases:
-                self._name_to_actor_id[alias.lower()] = actor_id
+        self._name_index = {}
+        self._role_index = {}
+        self._role_first = {}
+        self._actor_order = {}
+        for actor in self.actors.values():
+            self._index_actor(actor)
+
+    def _index_actor(self, actor: Actor) -> None:
+        self._name_to_actor_id[actor.name.lower()] = actor.id
+        for alias in actor.aliases:
+            self._name_to_actor_id[alias.lower()] = actor.id
+
+        self._actor_order.setdefault(actor.id, len(self._actor_order))
+        for key in [actor.name] + list(actor.aliases):
+            self._name_index.setdefault(key.lower().strip(), set()).add(actor.id)
+        order = self._actor_order[actor.id]
+        for role in actor.roles:
+            key = role.lower()
+            self._role_index.setdefault(key, set()).add(actor.id)
+            first = self._role_first.get(key)
+            if first is None or order < self._actor_order[first]:
+                self._role_first[key] = actor.id
 
     def add_actor(self, actor: Actor) -> str:
         """Add or merge an actor into the workspace."""
         self.actors[actor.id] = actor
-        self._name_to_actor_id[actor.name.lower()] = actor.id
-        for alias in actor.aliases:
-            self._name_to_actor_id[alias.lower()] = actor.id
+        self._index_actor(actor)
         return actor.id
 
+    def reindex_actor(self, actor: Actor) -> None:
+        """Index names, aliases and roles added to a workspace actor in place."""
+        self._index_actor(actor)
+
+    def remove_actors(self, actor_ids: Iterable[str]) -> int:
+        """Remove actors (references are left to the caller) and rebuild the index once."""
+        removed = 0
+        for actor_id in actor_ids:
+            if self.actors.pop(actor_id, None) is not None:
+                removed += 1
+        self._rebuild_actor_index()
+        return removed
+
+    def actor_ids_by_name(self, name: str) -> Set[str]:
+        """Ids of actors whose name or an alias equals name (case-insensitive)."""
+        self._check_actor_index()
+        return set(self._name_index.get(name.lower().strip(), ()))
+
+    def actor_ids_by_role(self, role: str) -> Set[str]:
+        """Ids of actors with the given role (case-insensitive)."""
+        self._check_actor_index()
+        return set(self._role_index.get(role.lower(), ()))
+
+    def first_actor_id_by_role(self, role: str) -> Optional[str]:
+        """Id of the earliest added actor with the given role (case-insensitive)."""
+        self._check_actor_index()
+        return self._role_first.get(role.lower())
+
+    def actor_order(self, actor_id: str) -> int:
+        """Position of an actor in insertion order."""
+        return self._actor_order.get(actor_id, len(self._actor_order))
+
+    def _check_actor_index(self) -> None:
+        """Rebuild the index if actors were assigned directly to the dict."""
+        if len(self._actor_order) != len(self.actors):
+            self._rebuild_actor_index()
+
     def add_verb_phrase(self, verb: VerbPhrase) -> str:
         """Add a verb phrase to the workspace."""
         self.verb_phrases[verb.id] = verb
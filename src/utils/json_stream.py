@@ -0,0 +1,231 @@
+"""
+Incremental JSON Parsing for Streamed LLM Output
+
+The Operator asks the model for one large JSON object whose interesting
+content lives in top-level arrays ("actors", "verb_phrases", "questions",
+"spatio_temporal_links"). Waiting for the whole completion before parsing
+means a truncated response loses everything after the first syntax error.
+
+IncrementalJSONParser consumes the response text piece by piece and emits
+each top-level array element the moment its closing bracket arrives.
+Whatever was complete when the stream stops is kept, so a response cut off
+by max_tokens still yields every finished actor, verb and question.
+
+Example:
+    parser = IncrementalJSONParser()
+    for delta in stream:
+        for key, element in parser.feed(delta):
+            print(key, element["id"])
+    data = parser.finish()   # {"actors": [...], "situation_summary": "..."}
+"""
+
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class IncrementalJSONParser:
+    """
+    Tolerant, incremental parser for a single top-level JSON object.
+
+    Emits (key, element) for every element of a top-level array as soon as
+    it is complete. Top-level scalar and object values are collected but not
+    emitted. Text before the opening brace (e.g. a ```json fence) and after
+    the closing brace is ignored.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+
+        # Lexer state
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._started = False
+        self._closed = False
+
+        # Top-level object state
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._value_start = -1     # Start of a top-level scalar/object value
+        self._elem_start = -1      # Start of the current array element
+
+        self.data: Dict[str, Any] = {}
+        self.errors = 0
+
+    @property
+    def complete(self) -> bool:
+        """True once the top-level object has been closed."""
+        return self._closed
+
+    @property
+    def truncated(self) -> bool:
+        """True if the object was opened but never closed."""
+        return self._started and not self._closed
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Consume more response text.
+
+        Returns:
+            List of (array_key, element) for elements completed by this text
+        """
+        self._buffer += text
+        events: List[Tuple[str, Any]] = []
+        buf = self._buffer
+
+        while self._pos < len(buf) and not self._closed:
+            i = self._pos
+            c = buf[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._on_string_end(i)
+                continue
+
+            if not self._started:
+                if c == "{":
+                    self._started = True
+                    self._stack.append("{")
+                    self._expect_key = True
+                continue
+
+            depth = len(self._stack)
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                if depth == 2 and self._stack[1] == "[" and self._elem_start < 0:
+                    self._elem_start = i
+                elif depth == 1 and not self._expect_key and self._value_start < 0:
+                    self._value_start = i
+
+            elif c in "{[":
+                if depth == 1 and not self._expect_key:
+                    if c == "[":
+                        self.data[self._key] = []
+                    else:
+                        self._value_start = i
+                elif depth == 2 and self._stack[1] == "[" and self._elem_start < 0:
+                    self._elem_start = i
+                self._stack.append(c)
+
+            elif c in "}]":
+                if depth == 2 and self._stack[1] == "[" and self._elem_start >= 0:
+                    # Scalar element terminated by the closing bracket
+                    self._emit_element(buf[self._elem_start:i], events)
+                if depth == 1 and self._value_start >= 0:
+                    self._store_value(buf[self._value_start:i])
+                self._stack.pop()
+                depth = len(self._stack)
+                if depth == 0:
+                    self._closed = True
+                elif depth == 2 and self._stack[1] == "[" and self._elem_start >= 0:
+                    self._emit_element(buf[self._elem_start:i + 1], events)
+                elif depth == 1 and self._value_start >= 0:
+                    self._store_value(buf[self._value_start:i + 1])
+
+            elif c == ",":
+                if depth == 1:
+                    if self._value_start >= 0:
+                        self._store_value(buf[self._value_start:i])
+                    self._expect_key = True
+                elif depth == 2 and self._stack[1] == "[" and self._elem_start >= 0:
+                    self._emit_element(buf[self._elem_start:i], events)
+
+            elif c == ":":
+                if depth == 1:
+                    self._expect_key = False
+
+            elif not c.isspace():
+                # Start of a bare scalar (number, true, false, null)
+                if depth == 1 and not self._expect_key and self._value_start < 0:
+                    self._value_start = i
+                elif depth == 2 and self._stack[1] == "[" and self._elem_start < 0:
+                    self._elem_start = i
+
+        return events
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Return everything parsed so far.
+
+        Complete top-level values and all completed array elements are
+        included; a trailing partial element is dropped.
+        """
+        return self.data
+
+    def _on_string_end(self, end: int) -> None:
+        """Handle the closing quote of a string token."""
+        depth = len(self._stack)
+        if depth == 1 and self._expect_key:
+            try:
+                self._key = json.loads(self._buffer[self._string_start:end + 1])
+            except json.JSONDecodeError:
+                self._key = self._buffer[self._string_start + 1:end]
+
+    def _emit_element(self, fragment: str, events: List[Tuple[str, Any]]) -> None:
+        """Parse a completed array element and record it."""
+        self._elem_start = -1
+        fragment = fragment.strip()
+        if not fragment:
+            return
+        try:
+            element = json.loads(fragment)
+        except json.JSONDecodeError:
+            self.errors += 1
+            return
+        if self._key is not None:
+            self.data.setdefault(self._key, []).append(element)
+            events.append((self._key, element))
+
+    def _store_value(self, fragment: str) -> None:
+        """Parse a completed top-level value and record it."""
+        self._value_start = -1
+        fragment = fragment.strip()
+        if not fragment or self._key is None:
+            return
+        try:
+            self.data[self._key] = json.loads(fragment)
+        except json.JSONDecodeError:
+            self.errors += 1
+
+
+def parse_partial_json(text: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Salvage every complete top-level value from possibly truncated JSON.
+
+    Returns:
+        (data, truncated)
+    """
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.finish(), parser.truncated
+
+
+def iter_sse_data(lines: Iterator[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield decoded JSON payloads from an OpenAI-compatible SSE stream.
+
+    Skips comments (": OPENROUTER PROCESSING"), blank keep-alives and
+    undecodable events; stops at the "[DONE]" sentinel.
+    """
+    for line in lines:
+        if not line or line.startswith(":"):
+            continue
+        if not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if payload == "[DONE]":
+            break
+        try:
+            yield json.loads(payload)
+        except json.JSONDecodeError:
+            continue
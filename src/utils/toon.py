@@ -16,7 +16,7 @@ Example:
     a1,John,person
 """
 
-from typing import List, Any, Dict, Optional, Union
+from typing import List, Any, Dict, Optional, Tuple, Union
 import re
 
 
@@ -280,75 +280,166 @@ class ToonEncoder:
         return "\n".join(blocks)
 
 
+class ToonDecodeError(ValueError):
+    """Raised when a string contains no decodable TOON table."""
+
+
+# Columns of the extraction tables that may hold commas
+FREE_TEXT_COLUMNS = {
+    "Summary": ["text"],
+    "Actors": ["name", "aliases", "roles"],
+    "States": ["name", "value"],
+    "VerbPhrases": ["verb"],
+    "Questions": ["question", "answer"],
+    "Links": ["value"],
+}
+
+
 class ToonDecoder:
     """
     TOON Decoder - Parse TOON format back to structured data.
+
+    Tolerant of what LLMs actually emit: markdown fences, a trailing ":"
+    after headers, row counts that do not match the header, unquoted
+    commas in the last column, doubled-quote escapes and output cut off
+    mid-table.
     """
 
-    HEADER_PATTERN = re.compile(r'^(\w+)\[(\d+)\]\{([^}]*)\}$')
+    HEADER_PATTERN = re.compile(r'^(\w+)\s*\[\s*(\d+)\s*\]\s*\{([^}]*)\}\s*:?\s*$')
 
     @staticmethod
-    def decode(toon_str: str) -> Dict[str, List[Dict]]:
+    def decode(toon_str: str, strict: bool = False) -> Dict[str, List[Dict]]:
         """
         Decode TOON string to dictionary of tables.
 
+        Rows are read until the next header, blank line or comment, so a
+        miscounted header does not swallow or drop rows.
+
+        Args:
+            toon_str: TOON text (may be wrapped in a code fence)
+            strict: Raise ToonDecodeError if no table is found
+
         Returns:
             Dict mapping table names to list of row dicts
         """
-        result = {}
-        lines = toon_str.strip().split("\n")
+        tables, _ = ToonDecoder.decode_with_report(toon_str)
+        if strict and not tables:
+            raise ToonDecodeError("No TOON table found")
+        return tables
 
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+    @staticmethod
+    def decode_with_report(toon_str: str) -> Tuple[Dict[str, List[Dict]], Dict[str, Any]]:
+        """
+        Decode TOON and report irregularities.
 
-            # Skip comments and empty lines
-            if not line or line.startswith("#"):
-                i += 1
+        Returns:
+            (tables, report) - report has "count_mismatch" (tables whose
+            row count differs from the header), "truncated" (True if
+            the text ends before the last table's declared row count; the
+            final, possibly partial, row is dropped in that case) and
+            "surplus_rows" (table -> indices of rows with more values than
+            columns, folded into the last column)
+        """
+        result: Dict[str, List[Dict]] = {}
+        report: Dict[str, Any] = {"count_mismatch": [], "truncated": False, "surplus_rows": {}}
+        lines = toon_str.strip().split("\n")
+
+        name = None
+        declared = 0
+        headers: List[str] = []
+        rows: List[Dict] = []
+
+        def close_table(at_end: bool) -> None:
+            if name is None:
+                return
+            if len(rows) != declared:
+                report["count_mismatch"].append(name)
+                if at_end and len(rows) < declared:
+                    report["truncated"] = True
+                    if rows:
+                        rows.pop()
+            result[name] = rows
+
+        for raw_line in lines:
+            line = raw_line.strip()
+
+            if line.startswith("```"):
                 continue
 
-            # Try to match header
             match = ToonDecoder.HEADER_PATTERN.match(line)
             if match:
+                close_table(at_end=False)
                 name = match.group(1)
-                count = int(match.group(2))
+                declared = int(match.group(2))
                 headers = [h.strip() for h in match.group(3).split(",")]
-
-                # Read data rows
                 rows = []
-                for j in range(count):
-                    if i + 1 + j < len(lines):
-                        row_line = lines[i + 1 + j]
-                        values = ToonDecoder._parse_row(row_line, len(headers))
-                        row_dict = dict(zip(headers, values))
-                        rows.append(row_dict)
-
-                result[name] = rows
-                i += count + 1
-            else:
-                i += 1
+                continue
+
+            if not line or line.startswith("#"):
+                if name is not None:
+                    close_table(at_end=False)
+                    name = None
+                continue
 
-        return result
+            if name is not None:
+                values = ToonDecoder._split_fields(line)
+                if len(values) > len(headers):
+                    report["surplus_rows"].setdefault(name, []).append(len(rows))
+                rows.append(dict(zip(headers, ToonDecoder._fit_row(values, len(headers)))))
+
+        close_table(at_end=True)
+        return result, report
 
     @staticmethod
     def _parse_row(line: str, expected_cols: int) -> List[str]:
-        """Parse a TOON row handling quoted values."""
+        """
+        Parse a TOON row handling quoted values.
+
+        A quote opens a quoted value only at the start of a field; inside
+        it "" is a literal quote. Quotes elsewhere are kept as text.
+        Surplus values are joined back into the last column (unquoted
+        commas in free text); missing values are padded with "".
+        """
+        return ToonDecoder._fit_row(ToonDecoder._split_fields(line), expected_cols)
+
+    @staticmethod
+    def _split_fields(line: str) -> List[str]:
+        """Split a TOON row at unquoted commas, unescaping quoted values."""
         values = []
-        current = ""
+        current = []
         in_quotes = False
+        i = 0
 
-        for char in line:
-            if char == '"' and not in_quotes:
+        while i < len(line):
+            char = line[i]
+            if in_quotes:
+                if char == '"' and i + 1 < len(line) and line[i + 1] == '"':
+                    current.append('"')
+                    i += 1
+                elif char == '"':
+                    in_quotes = False
+                else:
+                    current.append(char)
+            elif char == '"' and not "".join(current).strip():
+                current = []
                 in_quotes = True
-            elif char == '"' and in_quotes:
-                in_quotes = False
-            elif char == ',' and not in_quotes:
-                values.append(current)
-                current = ""
+            elif char == ',':
+                values.append("".join(current))
+                current = []
             else:
-                current += char
+                current.append(char)
+            i += 1
+
+        values.append("".join(current))
+        return values
+
+    @staticmethod
+    def _fit_row(values: List[str], expected_cols: int) -> List[str]:
+        """Fold surplus values into the last column and pad missing ones."""
+        if expected_cols and len(values) > expected_cols:
+            values = values[:expected_cols - 1] + [",".join(values[expected_cols - 1:])]
 
-        values.append(current)
+        values = [value.strip() for value in values]
 
         # Pad if needed
         while len(values) < expected_cols:
@@ -356,6 +447,134 @@ class ToonDecoder:
 
         return values
 
+    # =========================================================================
+    # GSW-Specific Decoders
+    # =========================================================================
+
+    @staticmethod
+    def decode_extraction(toon_str: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Decode operator TOON output into the operator's JSON structure.
+
+        Expects the tables Summary, Actors, States, VerbPhrases, Questions
+        and Links (see LEGAL_OPERATOR_TOON_FORMAT in the operator). Only
+        Actors is required.
+
+        Returns:
+            (data, report) - data has the same keys as the JSON output
+            ("situation_summary", "actors", "verb_phrases", "questions",
+            "spatio_temporal_links"); report as in decode_with_report, plus
+            "ambiguous_rows" (rows with surplus values that could not be
+            folded back safely, e.g. "Questions[2]")
+
+        Raises:
+            ToonDecodeError: If there is no Actors table
+        """
+        tables, report = ToonDecoder.decode_with_report(toon_str)
+        if "Actors" not in tables:
+            raise ToonDecodeError("TOON output has no Actors table")
+
+        def split(value: str) -> List[str]:
+            return [v.strip() for v in (value or "").split("|") if v.strip()]
+
+        def flag(value: str) -> bool:
+            return (value or "").strip().lower() in ("1", "true", "yes", "y")
+
+        def compact(item: Dict[str, Any]) -> Dict[str, Any]:
+            # Missing values are left out so the operator's defaults apply
+            return {k: v for k, v in item.items() if v is not None}
+
+        actors = []
+        by_id = {}
+        for row in tables["Actors"]:
+            actor = compact({
+                "id": row.get("id") or None,
+                "name": row.get("name") or "Unknown",
+                "actor_type": row.get("type") or "person",
+                "aliases": split(row.get("aliases", "")),
+                "roles": split(row.get("roles", "")),
+                "states": [],
+            })
+            if "id" in actor:
+                by_id[actor["id"]] = actor
+            actors.append(actor)
+
+        for row in tables.get("States", []):
+            actor = by_id.get(row.get("actor", ""))
+            if actor is None:
+                continue
+            actor["states"].append({
+                "name": row.get("name") or "Unknown",
+                "value": row.get("value", ""),
+                "start_date": row.get("start") or None,
+                "end_date": row.get("end") or None,
+            })
+
+        verb_phrases = [
+            compact({
+                "id": row.get("id") or None,
+                "verb": row.get("verb", ""),
+                "agent_id": row.get("agent") or None,
+                "patient_ids": split(row.get("patients", "")),
+                "temporal_id": row.get("temporal") or None,
+                "spatial_id": row.get("spatial") or None,
+                "is_implicit": flag(row.get("implicit", "")),
+            })
+            for row in tables.get("VerbPhrases", [])
+            if row.get("verb")
+        ]
+
+        questions = [
+            compact({
+                "id": row.get("id") or None,
+                "question_text": row.get("question", ""),
+                "question_type": row.get("type") or "what",
+                "target_entity_id": row.get("about") or None,
+                "answerable": flag(row.get("answered", "")),
+                "answer_text": row.get("answer") or None,
+                "answer_entity_id": row.get("answer_id") or None,
+            })
+            for row in tables.get("Questions", [])
+            if row.get("question")
+        ]
+
+        links = [
+            compact({
+                "id": row.get("id") or None,
+                "linked_entity_ids": split(row.get("entities", "")),
+                "tag_type": row.get("type") or "temporal",
+                "tag_value": row.get("value") or None,
+            })
+            for row in tables.get("Links", [])
+            if row.get("entities")
+        ]
+
+        # Surplus values were folded into the last column. That is only
+        # right if the last column is the row's one non-empty free-text
+        # value; otherwise an unquoted comma may have shifted the columns
+        ambiguous = []
+        for table, indices in report["surplus_rows"].items():
+            rows = tables.get(table, [])
+            for i in indices:
+                if i >= len(rows):
+                    continue
+                columns = list(rows[i])
+                free_text = FREE_TEXT_COLUMNS.get(table, [])
+                others = [c for c in free_text if c != columns[-1] and rows[i].get(c)]
+                if columns[-1] not in free_text or others:
+                    ambiguous.append(f"{table}[{i}]")
+        report["ambiguous_rows"] = ambiguous
+
+        summary_rows = tables.get("Summary") or [{}]
+        data = {
+            "situation_summary": summary_rows[0].get("text", ""),
+            "actors": actors,
+            "verb_phrases": verb_phrases,
+            "questions": questions,
+            "spatio_temporal_links": links,
+        }
+        return data, report
+
 
 def measure_compression(json_str: str, toon_str: str) -> Dict[str, Any]:
     """